@@ -1,63 +1,98 @@
+import asyncio
 import chainlit as cl
+import logging
 import os
-from myrag_chatbot.chatbot.chatbot_engine import ChatbotEngine
-from myrag_chatbot.loaders.loaders import load_documents
-from myrag_chatbot.splitter.splitter import split_documents
-from myrag_chatbot.embedder.embedder import create_embeddings
-from myrag_chatbot.retriever.retriever import create_retriever
-from langchain_community.vectorstores import Chroma
+from myrag_chatbot.ingestion.jobs import DONE, FAILED, QUEUED, IngestionJob
+from myrag_chatbot.metrics.exporters import configure_from_env
+from myrag_chatbot.registry.registry import EngineConfig, get_registry
 from dotenv import load_dotenv
 from typing import Optional, List
 
 load_dotenv()
+# Log debug hanya jika diminta (MYRAG_VERBOSE=1); format log di setiap permintaan ada biayanya
+logging.basicConfig(level=logging.DEBUG if os.getenv("MYRAG_VERBOSE") == "1" else logging.WARNING)
+logger = logging.getLogger("chainlit_app")
+# Endpoint /metrics (MYRAG_METRICS_PORT) atau file Prometheus (MYRAG_METRICS_FILE), jika diatur
+configure_from_env()
 # Konfigurasi
 DOCUMENT_PATH = "/Users/antoniomorabito/Documents/aiproject/myrag_chatbot/chainlit_app/black-beauty-obooko.pdf"
 CHROMA_DB_PATH = "/Users/antoniomorabito/Documents/aiproject/myrag_chatbot/src/myrag_chatbot/db"
+EMBEDDING_CACHE_PATH = "/Users/antoniomorabito/Documents/aiproject/myrag_chatbot/src/myrag_chatbot/db/embedding_cache"
 LLM_MODEL = "ollama"
 EMBEDDING_MODEL = "ollama"
 TEMPERATURE = 0.2
 USE_INTERNET_SEARCH = True
 RETRIEVER_TYPE = "reranking"
+ENGINE_CONFIG = EngineConfig(
+    llm_model=LLM_MODEL,
+    embedding_model=EMBEDDING_MODEL,
+    retriever_type=RETRIEVER_TYPE,
+    persist_directory=CHROMA_DB_PATH,
+    embedding_cache_dir=EMBEDDING_CACHE_PATH,
+    temperature=TEMPERATURE,
+    use_internet_search=USE_INTERNET_SEARCH,
+)
+# Interval pembaruan pesan progres ingestion (detik)
+UPLOAD_PROGRESS_INTERVAL = 1.0
 @cl.on_chat_start
 async def main():
-    print("[DEBUG] Memulai sesi chat...")
+    logger.debug("Memulai sesi chat...")
     try:
-        # Load dokumen
-        documents = load_documents(DOCUMENT_PATH)
-        await cl.Message(content=f"Berhasil memuat {len(documents)} dokumen.").send()
-        # Split dokumen menjadi chunk
-        text_chunks = split_documents(documents, chunk_size=1000, chunk_overlap=100)
-        await cl.Message(content=f"Berhasil memecah dokumen menjadi {len(text_chunks)} bagian.").send()
-        # Buat embeddings
-        embeddings = create_embeddings(EMBEDDING_MODEL)
-        print("[DEBUG] Embeddings berhasil dibuat")
-        # Buat retriever
-        retriever = create_retriever(
-            embeddings, text_chunks,
-            retriever_type=RETRIEVER_TYPE,
-            persist_directory=CHROMA_DB_PATH
-        )
-        print("[DEBUG] Retriever berhasil dibuat")
-        # Init chatbot engine
-        chatbot = ChatbotEngine(
-            retriever=retriever,
-            llm_model=LLM_MODEL,
-            temperature=TEMPERATURE,
-            use_internet_search=USE_INTERNET_SEARCH
-        )
+        # Embeddings, vectorstore, reranker, dan engine dibuat sekali per proses lalu dipakai bersama
+        chatbot = await cl.make_async(get_registry().session)(ENGINE_CONFIG)
+        # Indeks dokumen secara inkremental: file yang tidak berubah dilewati
+        result = await cl.make_async(chatbot.ingest_file)(DOCUMENT_PATH, chunk_size=1000, chunk_overlap=100)
+        if result["status"] == "indexed":
+            await cl.Message(
+                content=f"Berhasil mengindeks dokumen: {result['added']} bagian baru, "
+                        f"{result['deleted']} bagian lama dihapus ({result['total']} bagian total)."
+            ).send()
         cl.user_session.set("chatbot_engine", chatbot)
-        cl.user_session.set("embeddings", embeddings)
-        print("[DEBUG] Chatbot engine siap.")
+        logger.debug("Chatbot engine siap.")
     except Exception as e:
         await cl.Message(content=f"Gagal memulai chatbot: {e}").send()
-        print("[ERROR]", e)
+        logger.error("Gagal memulai chatbot: %s", e)
         
 
 
+def _remove_upload(job: IngestionJob) -> None:
+    if os.path.exists(job.file_path):
+        os.remove(job.file_path)  # Remove the file after processing
+
+
+def _job_summary(job: IngestionJob) -> str:
+    name = os.path.basename(job.file_path)
+    if job.status == FAILED:
+        return f"Gagal memproses dokumen {name}: {job.error}"
+    if job.status == DONE:
+        result = job.result or {}
+        return (f"Berhasil menambahkan dokumen {name} ke database "
+                f"({result.get('added', 0)} bagian baru, {result.get('deleted', 0)} bagian lama dihapus).")
+    if job.status == QUEUED:
+        return f"Dokumen {name} menunggu giliran diindeks..."
+    pages = f"halaman {job.pages_read}/{job.pages_total}, " if job.pages_total else ""
+    return (f"Mengindeks {name}: {job.progress:.0%} ({pages}{job.chunks_added} bagian baru tersimpan). "
+            f"Bagian yang sudah tersimpan sudah bisa ditanyakan.")
+
+
+async def _report_progress(job: IngestionJob, message: cl.Message) -> None:
+    """Memperbarui pesan progres sampai pekerjaan ingestion selesai, tanpa menahan handler pesan."""
+    last = None
+    while True:
+        finished = job.finished
+        summary = _job_summary(job)
+        if summary != last:
+            message.content = summary
+            await message.update()
+            last = summary
+        if finished:
+            return
+        await asyncio.sleep(UPLOAD_PROGRESS_INTERVAL)
+
+
 @cl.on_message
 async def handle_message(message: cl.Message):
     chatbot_engine = cl.user_session.get("chatbot_engine")
-    embeddings = cl.user_session.get("embeddings")
     if message.content and message.content.startswith("/upload"):
         # Extract the file path from the command
         file_path = message.content.split(" ")[1]
@@ -65,32 +100,30 @@ async def handle_message(message: cl.Message):
             await cl.Message(content=f"File not found: {file_path}").send()
             return
 
-        await cl.Message(content=f"Memproses file: {os.path.basename(file_path)}").send()
-
         try:
-            # Load dan proses dokumen
-            documents = load_documents(file_path)
-            text_chunks = split_documents(documents)
-            vectorstore = Chroma.from_documents(
-                documents=text_chunks,
-                embedding=embeddings,
-                persist_directory=CHROMA_DB_PATH
-            )
-            retriever = create_retriever(
-                embeddings=embeddings,
-                documents=text_chunks,
-                retriever_type=RETRIEVER_TYPE,
-                persist_directory=CHROMA_DB_PATH
-            )
-            chatbot_engine.retriever = retriever
-            vectorstore.persist()
-            await cl.Message(content=f"Berhasil menambahkan dokumen ke database.").send()
+            # Load, split, dan upsert berjalan di antrean latar; chat tetap bisa dipakai selama proses
+            job = chatbot_engine.submit_ingestion(file_path, on_done=_remove_upload)
         except Exception as e:
+            # Pekerjaan tidak diantrekan (mis. antrean penuh), jadi on_done tidak akan menghapus file
+            os.remove(file_path)
             await cl.Message(content=f"Gagal memproses dokumen: {e}").send()
-        finally:
-            if os.path.exists(file_path):
-                os.remove(file_path)  # Remove the file after processing
+            return
+        progress = cl.Message(content=_job_summary(job))
+        await progress.send()
+        jobs = cl.user_session.get("ingestion_jobs") or []
+        jobs.append(job)
+        cl.user_session.set("ingestion_jobs", jobs)
+        # Disimpan agar task tidak dibersihkan garbage collector sebelum selesai
+        cl.user_session.set(f"ingestion_task_{job.job_id}",
+                            asyncio.create_task(_report_progress(job, progress)))
+    elif message.content and message.content.strip() == "/status":
+        jobs = cl.user_session.get("ingestion_jobs") or []
+        content = "\n".join(_job_summary(job) for job in jobs) or "Tidak ada dokumen yang sedang diindeks."
+        await cl.Message(content=content).send()
     else:
-        response = chatbot_engine.ask(message.content)
-        await cl.Message(content=response).send()
-
+        # Stream token ke UI begitu dihasilkan oleh LLM
+        response = cl.Message(content="")
+        async for event in chatbot_engine.astream_with_sources(message.content):
+            if event["type"] == "token":
+                await response.stream_token(event["content"])
+        await response.send()
@@ -0,0 +1,176 @@
+# src/myrag_chatbot/benchmark/corpus.py
+import os
+import random
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+# Kosakata ASCII agar teks PDF bisa ditulis dengan font standar tanpa encoding khusus
+VOCABULARY = (
+    "data sistem layanan pengguna laporan proses jaringan server aplikasi dokumen kebijakan "
+    "keamanan akses modul integrasi pembayaran transaksi pelanggan produk gudang stok "
+    "pengiriman jadwal rapat anggaran proyek tim divisi kantor cabang wilayah target "
+    "kinerja evaluasi audit kontrak vendor lisensi perangkat basis cadangan pemulihan "
+    "insiden prosedur standar panduan pelatihan karyawan absensi gaji cuti klaim asuransi"
+).split()
+TEAMS = ["Alpha", "Borneo", "Cendana", "Dahlia", "Elang", "Flamboyan", "Garuda", "Halimun"]
+CITIES = ["Jakarta", "Bandung", "Surabaya", "Medan", "Makassar", "Denpasar", "Semarang", "Palembang"]
+
+
+@dataclass
+class BenchmarkQuery:
+    """Pertanyaan benchmark beserta kata kunci yang harus ada di chunk yang relevan."""
+    question: str
+    expected: str
+
+
+@dataclass
+class SyntheticCorpus:
+    paths: List[str] = field(default_factory=list)
+    queries: List[BenchmarkQuery] = field(default_factory=list)
+    total_bytes: int = 0
+
+
+def _paragraph(rng: random.Random, words: int) -> str:
+    sentences = []
+    remaining = words
+    while remaining > 0:
+        length = min(remaining, rng.randint(8, 16))
+        sentence = " ".join(rng.choice(VOCABULARY) for _ in range(length))
+        sentences.append(sentence.capitalize() + ".")
+        remaining -= length
+    return " ".join(sentences)
+
+
+def _fact(index: int, rng: random.Random) -> Tuple[str, BenchmarkQuery]:
+    code = f"PRD-{index:05d}"
+    team, city = rng.choice(TEAMS), rng.choice(CITIES)
+    sentence = f"Kode produk {code} dikelola oleh tim {team} di kantor {city}."
+    return sentence, BenchmarkQuery(question=f"Siapa yang mengelola kode produk {code}?", expected=code)
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _wrap(text: str, width: int = 90) -> List[str]:
+    lines, current = [], ""
+    for word in text.split():
+        if current and len(current) + 1 + len(word) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        lines.append(current)
+    return lines
+
+
+def write_pdf(path: str, pages: List[str]) -> None:
+    """
+    Menulis PDF minimal (satu font standar Helvetica, teks ASCII) tanpa dependensi tambahan.
+
+    Args:
+        path: Lokasi file PDF.
+        pages: Teks per halaman; baris dibungkus otomatis.
+    """
+    objects: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # /Pages diisi setelah nomor objek halaman diketahui
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_numbers = []
+    for text in pages:
+        lines = _wrap(text)
+        stream = "BT /F1 10 Tf 12 TL 40 800 Td " + " ".join(f"({_pdf_escape(line)}) Tj T*" for line in lines) + " ET"
+        content = stream.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        content_number = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_number
+        )
+        page_numbers.append(len(objects))
+    kids = " ".join(f"{number} 0 R" for number in page_numbers).encode("ascii")
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_numbers))
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref_offset = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        output += b"%010d 00000 n \n" % offset
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    with open(path, "wb") as f:
+        f.write(output)
+
+
+def generate_corpus(
+    directory: str,
+    n_txt: int = 20,
+    n_pdf: int = 5,
+    paragraphs_per_file: int = 20,
+    words_per_paragraph: int = 120,
+    pages_per_pdf: int = 4,
+    seed: int = 42,
+) -> SyntheticCorpus:
+    """
+    Membuat korpus TXT dan PDF sintetis yang deterministik.
+
+    Setiap file berisi paragraf acak dari kosakata tetap dan beberapa "fakta" unik
+    (kode produk) sehingga setiap pertanyaan benchmark punya jawaban yang diketahui.
+
+    Args:
+        directory: Direktori output.
+        n_txt: Jumlah file TXT.
+        n_pdf: Jumlah file PDF.
+        paragraphs_per_file: Jumlah paragraf per file (dibagi rata ke halaman untuk PDF).
+        words_per_paragraph: Jumlah kata per paragraf.
+        pages_per_pdf: Jumlah halaman per PDF.
+        seed: Seed random agar korpus sama di setiap run.
+
+    Returns:
+        SyntheticCorpus berisi path file, pertanyaan, dan total ukuran byte.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    corpus = SyntheticCorpus()
+    fact_index = 0
+
+    def _paragraphs(count: int) -> List[str]:
+        nonlocal fact_index
+        paragraphs = []
+        for _ in range(count):
+            paragraph = _paragraph(rng, words_per_paragraph)
+            if rng.random() < 0.5:
+                sentence, query = _fact(fact_index, rng)
+                fact_index += 1
+                corpus.queries.append(query)
+                paragraph = f"{paragraph} {sentence}"
+            paragraphs.append(paragraph)
+        return paragraphs
+
+    for index in range(n_txt):
+        path = os.path.join(directory, f"dokumen_{index:04d}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n\n".join(_paragraphs(paragraphs_per_file)))
+        corpus.paths.append(path)
+
+    for index in range(n_pdf):
+        per_page = max(1, paragraphs_per_file // pages_per_pdf)
+        pages = [" ".join(_paragraphs(per_page)) for _ in range(pages_per_pdf)]
+        path = os.path.join(directory, f"laporan_{index:04d}.pdf")
+        write_pdf(path, pages)
+        corpus.paths.append(path)
+
+    corpus.total_bytes = sum(os.path.getsize(path) for path in corpus.paths)
+    return corpus
+
+
+if __name__ == '__main__':
+    # Contoh penggunaan
+    corpus = generate_corpus("benchmark_corpus", n_txt=2, n_pdf=1)
+    print(f"{len(corpus.paths)} file, {corpus.total_bytes} byte, {len(corpus.queries)} pertanyaan")
+    print(f"Contoh pertanyaan: {corpus.queries[0].question}")
@@ -0,0 +1,197 @@
+# src/myrag_chatbot/benchmark/fake_llm_server.py
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+class FakeLLMServer:
+    """
+    Server HTTP lokal yang meniru API Ollama dan API OpenAI-compatible.
+
+    Dipakai untuk menguji routing LLM tanpa model sungguhan. Endpoint yang didukung:
+    `/api/generate` dan `/api/tags` (Ollama, streaming NDJSON) serta `/v1/chat/completions`
+    (OpenAI, streaming SSE). Kejenuhan server ditiru dengan `max_concurrency`: permintaan
+    yang melebihi batas menunggu giliran, seperti antrean di satu mesin Ollama.
+    """
+
+    def __init__(
+        self,
+        ttft: float = 0.05,
+        token_delay: float = 0.0,
+        answer: str = "Ini jawaban dari server tiruan.",
+        fail: bool = False,
+        max_concurrency: Optional[int] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """
+        Args:
+            ttft: Waktu sampai token pertama (detik).
+            token_delay: Jeda antar token.
+            answer: Teks jawaban; setiap kata dikirim sebagai satu token.
+            fail: Jika True, setiap permintaan generate dijawab HTTP 500.
+            max_concurrency: Jumlah permintaan yang diproses bersamaan; None berarti tanpa batas.
+            host: Alamat bind.
+            port: Port; 0 memilih port bebas.
+        """
+        self.ttft = ttft
+        self.token_delay = token_delay
+        self.answer = answer
+        self.fail = fail
+        self._slots = threading.Semaphore(max_concurrency) if max_concurrency else None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _tokens(self):
+        words = self.answer.split()
+        return [word if index == 0 else f" {word}" for index, word in enumerate(words)]
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, payload: dict) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _write_chunk(self, data: bytes) -> None:
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def _read_body(self) -> dict:
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                return json.loads(raw) if raw else {}
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._send_json(200, {"models": [{"name": "fake:latest"}]})
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                body = self._read_body()
+                if self.path not in ("/api/generate", "/api/chat", "/v1/chat/completions"):
+                    self._send_json(404, {"error": "not found"})
+                    return
+                with server._lock:
+                    server.requests += 1
+                if server._slots is not None:
+                    server._slots.acquire()
+                try:
+                    self._generate(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Klien (router) membatalkan permintaan yang kalah
+                    self.close_connection = True
+                finally:
+                    if server._slots is not None:
+                        server._slots.release()
+
+            def _generate(self, body: dict) -> None:
+                time.sleep(server.ttft)
+                if server.fail:
+                    self._send_json(500, {"error": "server tiruan gagal"})
+                    return
+                openai = self.path.startswith("/v1/")
+                stream = body.get("stream", not openai)
+                model = body.get("model", "fake")
+                tokens = server._tokens()
+                if not stream:
+                    time.sleep(server.token_delay * len(tokens))
+                    text = "".join(tokens)
+                    if openai:
+                        self._send_json(200, {"object": "chat.completion", "model": model, "choices": [
+                            {"index": 0, "message": {"role": "assistant", "content": text},
+                             "finish_reason": "stop"}]})
+                    elif self.path == "/api/chat":
+                        self._send_json(200, {"model": model, "message": {"role": "assistant", "content": text},
+                                              "done": True})
+                    else:
+                        self._send_json(200, {"model": model, "response": text, "done": True})
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream" if openai else "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for index, token in enumerate(tokens):
+                    if index and server.token_delay:
+                        time.sleep(server.token_delay)
+                    self._write_chunk(self._format_token(token, model, openai))
+                if openai:
+                    self._write_chunk(b"data: [DONE]\n\n")
+                else:
+                    self._write_chunk(json.dumps({"model": model, "response": "", "done": True,
+                                                  "done_reason": "stop"}).encode("utf-8") + b"\n")
+                self._write_chunk(b"")
+
+            def _format_token(self, token: str, model: str, openai: bool) -> bytes:
+                if openai:
+                    payload = {"object": "chat.completion.chunk", "model": model,
+                               "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]}
+                    return f"data: {json.dumps(payload)}\n\n".encode("utf-8")
+                if self.path == "/api/chat":
+                    payload = {"model": model, "message": {"role": "assistant", "content": token}, "done": False}
+                else:
+                    payload = {"model": model, "response": token, "done": False}
+                return json.dumps(payload).encode("utf-8") + b"\n"
+
+        return Handler
+
+    def start(self) -> str:
+        """Menjalankan server di thread latar dan mengembalikan base URL-nya."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-llm-server", daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeLLMServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+if __name__ == '__main__':
+    from myrag_chatbot.chatbot.router import LLMRouter
+    from myrag_chatbot.chatbot.llm_providers import create_llm
+
+    with FakeLLMServer(ttft=1.5) as slow, FakeLLMServer(ttft=0.05) as fast:
+        router = LLMRouter(
+            [("lambat", create_llm("ollama", model="fake", base_url=slow.base_url)),
+             ("cepat", create_llm("ollama", model="fake", base_url=fast.base_url))],
+            ttft_timeout=0.3,
+        )
+        for _ in range(3):
+            start = time.perf_counter()
+            print(repr(router.invoke("Halo")), f"{time.perf_counter() - start:.2f}s")
+        print(router.stats())
@@ -0,0 +1,158 @@
+# src/myrag_chatbot/benchmark/fakes.py
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+
+from myrag_chatbot.chatbot.llm_providers import register_llm_provider
+from myrag_chatbot.embedder.embedder import register_embedding_provider
+from myrag_chatbot.retriever.bm25_index import tokenize
+
+FAKE_PROVIDER = "fake"
+
+
+def _token_slot(token: str, dimension: int) -> Tuple[int, float]:
+    digest = hashlib.md5(token.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "little") % dimension, 1.0 if digest[4] & 1 else -1.0
+
+
+class HashEmbeddings(Embeddings):
+    """
+    Embedding deterministik tanpa model: setiap token di-hash ke satu dimensi (feature hashing).
+
+    Teks dengan kata yang sama menghasilkan vektor yang mirip, sehingga hasil retrieval
+    tetap bermakna untuk benchmark. `delay_per_call` dan `delay_per_text` meniru latensi
+    provider sungguhan; `max_concurrent_calls` meniru server dengan jumlah slot terbatas.
+    """
+
+    def __init__(self, dimension: int = 256, delay_per_call: float = 0.0, delay_per_text: float = 0.0,
+                 max_concurrent_calls: Optional[int] = None):
+        self.dimension = dimension
+        self.delay_per_call = delay_per_call
+        self.delay_per_text = delay_per_text
+        self._slots = threading.Semaphore(max_concurrent_calls) if max_concurrent_calls else None
+        self.calls = 0
+        self.texts_embedded = 0
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for token in tokenize(text):
+            slot, sign = _token_slot(token, self.dimension)
+            vector[slot] += sign
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector.tolist()
+
+    def _simulate_latency(self, count: int) -> None:
+        self.calls += 1
+        self.texts_embedded += count
+        delay = self.delay_per_call + self.delay_per_text * count
+        if not delay:
+            return
+        if self._slots is None:
+            time.sleep(delay)
+            return
+        with self._slots:
+            time.sleep(delay)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self._simulate_latency(len(texts))
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self._simulate_latency(1)
+        return self._embed(text)
+
+
+class FakeLLM(LLM):
+    """
+    LLM tiruan dengan latensi yang bisa diatur.
+
+    `delay` adalah waktu sampai token pertama, `token_delay` jeda antar token saat streaming.
+    Jawaban disusun dari kata-kata prompt sehingga deterministik.
+    """
+
+    delay: float = 0.05
+    token_delay: float = 0.0
+    answer_tokens: int = 32
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-benchmark"
+
+    def _tokens(self, prompt: str) -> List[str]:
+        words = prompt.split()
+        question = words[-self.answer_tokens:] if words else ["jawaban"]
+        return [f"{word} " for word in question]
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None,
+              run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> str:
+        tokens = self._tokens(prompt)
+        time.sleep(self.delay + self.token_delay * len(tokens))
+        return "".join(tokens)
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None,
+                     run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> str:
+        tokens = self._tokens(prompt)
+        await asyncio.sleep(self.delay + self.token_delay * len(tokens))
+        return "".join(tokens)
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> Iterator[GenerationChunk]:
+        time.sleep(self.delay)
+        for token in self._tokens(prompt):
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            yield GenerationChunk(text=token)
+
+    async def _astream(self, prompt: str, stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs: Any) -> AsyncIterator[GenerationChunk]:
+        await asyncio.sleep(self.delay)
+        for token in self._tokens(prompt):
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield GenerationChunk(text=token)
+
+
+class FakeCrossEncoder:
+    """Pengganti sentence-transformers CrossEncoder: skor = jumlah token query yang muncul di chunk."""
+
+    def __init__(self, delay_per_pair: float = 0.0):
+        self.delay_per_pair = delay_per_pair
+
+    def predict(self, pairs: Sequence[Tuple[str, str]], batch_size: int = 32,
+                show_progress_bar: bool = False) -> List[float]:
+        if self.delay_per_pair:
+            time.sleep(self.delay_per_pair * len(pairs))
+        scores = []
+        for query, passage in pairs:
+            passage_tokens = set(tokenize(passage))
+            scores.append(float(sum(token in passage_tokens for token in set(tokenize(query)))))
+        return scores
+
+
+def register_fake_providers(llm_delay: float = 0.05, token_delay: float = 0.0,
+                            embedding_dimension: int = 256) -> None:
+    """
+    Mendaftarkan provider "fake" untuk LLM dan embedding, sehingga EngineConfig(llm_model="fake",
+    embedding_model="fake") bisa dipakai tanpa Ollama atau API key.
+    """
+    register_llm_provider(
+        FAKE_PROVIDER,
+        lambda temperature, delay=llm_delay, token_delay=token_delay, **_: FakeLLM(delay=delay, token_delay=token_delay),
+    )
+    register_embedding_provider(
+        FAKE_PROVIDER,
+        lambda: HashEmbeddings(dimension=embedding_dimension),
+        model_name=f"hash-{embedding_dimension}",
+        batch_queries=True,
+    )
@@ -0,0 +1,387 @@
+# src/myrag_chatbot/benchmark/harness.py
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStore
+
+from myrag_chatbot.benchmark.corpus import BenchmarkQuery, generate_corpus
+from myrag_chatbot.benchmark.fakes import FAKE_PROVIDER, FakeCrossEncoder, HashEmbeddings, register_fake_providers
+from myrag_chatbot.benchmark.report import compare_reports, latency_summary, run_metadata
+from myrag_chatbot.chatbot.chatbot_engine import ChatbotEngine
+from myrag_chatbot.chatbot.web_search import CachedWebSearch, StubSearchBackend
+from myrag_chatbot.embedder.batcher import MicroBatchingEmbeddings
+from myrag_chatbot.ingestion.bulk import bulk_ingest
+from myrag_chatbot.ingestion.manifest import IngestionManifest
+from myrag_chatbot.loaders.loaders import load_documents
+from myrag_chatbot.retriever.bm25_index import BM25Index, IndexedVectorStore
+from myrag_chatbot.retriever.reranker import CrossEncoderReranker
+from myrag_chatbot.retriever.retriever import create_retriever, create_vectorstore, lexical_index_path
+from myrag_chatbot.splitter.splitter import iter_chunk_refs, split_documents
+
+RETRIEVER_TYPES = ["similarity", "mmr", "hybrid", "reranking"]
+
+
+def _split_peak_bytes(split, documents: List[Document]) -> int:
+    """Puncak alokasi memori selama `split(documents)` dan hasilnya masih dipegang."""
+    tracemalloc.start()
+    try:
+        chunks = split(documents)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del chunks
+    return peak
+
+
+def bench_load_split(paths: Sequence[str], chunk_size: int, chunk_overlap: int) -> Dict[str, object]:
+    """
+    Throughput load_documents dan split_documents, diukur terpisah.
+
+    Mode offset (`iter_chunk_refs`) diukur juga, termasuk puncak memori kedua mode.
+    """
+    start = time.perf_counter()
+    documents = [doc for path in paths for doc in load_documents(path)]
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    chunks = split_documents(documents, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    split_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    refs = list(iter_chunk_refs(documents, chunk_size=chunk_size, chunk_overlap=chunk_overlap))
+    offset_split_seconds = time.perf_counter() - start
+
+    split_peak = _split_peak_bytes(
+        lambda docs: split_documents(docs, chunk_size=chunk_size, chunk_overlap=chunk_overlap), documents)
+    offset_peak = _split_peak_bytes(
+        lambda docs: list(iter_chunk_refs(docs, chunk_size=chunk_size, chunk_overlap=chunk_overlap)), documents)
+
+    characters = sum(len(doc.page_content) for doc in documents)
+    return {
+        "files": len(paths),
+        "documents": len(documents),
+        "chunks": len(chunks),
+        "load_seconds": load_seconds,
+        "split_seconds": split_seconds,
+        "load_files_per_second": len(paths) / load_seconds if load_seconds else 0.0,
+        "split_chars_per_second": characters / split_seconds if split_seconds else 0.0,
+        "split_chunks_per_second": len(chunks) / split_seconds if split_seconds else 0.0,
+        "split_peak_bytes": split_peak,
+        "offset_chunks": len(refs),
+        "offset_split_seconds": offset_split_seconds,
+        "offset_split_peak_bytes": offset_peak,
+        "_chunks": chunks,
+    }
+
+
+def bench_embed(embeddings: Embeddings, chunks: Sequence[Document], batch_size: int) -> Dict[str, float]:
+    """Throughput embed_documents saja (tanpa vectorstore)."""
+    texts = [chunk.page_content for chunk in chunks]
+    start = time.perf_counter()
+    for offset in range(0, len(texts), batch_size):
+        embeddings.embed_documents(texts[offset:offset + batch_size])
+    seconds = time.perf_counter() - start
+    return {
+        "texts": len(texts),
+        "seconds": seconds,
+        "texts_per_second": len(texts) / seconds if seconds else 0.0,
+    }
+
+
+def bench_query_embedding(questions: Sequence[str], users: int, call_delay: float = 0.01,
+                          server_slots: int = 2, max_wait_seconds: float = 0.005) -> Dict[str, float]:
+    """
+    Throughput embed_query dengan `users` thread: langsung ke provider vs lewat MicroBatchingEmbeddings.
+
+    Provider tiruan punya latensi tetap per panggilan (`call_delay`) dan hanya melayani
+    `server_slots` panggilan bersamaan, seperti satu server Ollama yang jenuh.
+    """
+    def _run(embeddings: Embeddings) -> float:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=users) as pool:
+            list(pool.map(embeddings.embed_query, questions))
+        return time.perf_counter() - start
+
+    direct_provider = HashEmbeddings(delay_per_call=call_delay, max_concurrent_calls=server_slots)
+    direct = _run(direct_provider)
+    batched_provider = HashEmbeddings(delay_per_call=call_delay, max_concurrent_calls=server_slots)
+    batcher = MicroBatchingEmbeddings(batched_provider, max_wait_seconds=max_wait_seconds)
+    batched = _run(batcher)
+    batcher.close()
+    return {
+        "queries": len(questions),
+        "users": users,
+        "direct_queries_per_second": len(questions) / direct if direct else 0.0,
+        "batched_queries_per_second": len(questions) / batched if batched else 0.0,
+        "direct_provider_calls": direct_provider.calls,
+        "batched_provider_calls": batched_provider.calls,
+    }
+
+
+def bench_ingest(paths: Sequence[str], vectorstore: VectorStore, manifest: IngestionManifest,
+                 batch_size: int, chunk_size: int, chunk_overlap: int, workers: int) -> Dict[str, float]:
+    """Throughput ingestion end-to-end (parse, split, embed, upsert) lewat bulk_ingest."""
+    return bulk_ingest(
+        paths, vectorstore, manifest,
+        batch_size=batch_size, chunk_size=chunk_size, chunk_overlap=chunk_overlap, workers=workers,
+    )
+
+
+def _hit(docs: Sequence[Document], query: BenchmarkQuery) -> bool:
+    return any(query.expected in doc.page_content for doc in docs)
+
+
+def bench_retrieval(retriever: BaseRetriever, queries: Sequence[BenchmarkQuery], repeats: int = 3,
+                    warmup: int = 3) -> Dict[str, float]:
+    """
+    Latensi retrieval per query (p50/p95/p99) dan hit rate (chunk dengan jawaban ada di hasil).
+
+    Pengulangan query yang sama ikut mengukur efek cache (embedding, skor rerank).
+    """
+    for query in queries[:warmup]:
+        retriever.invoke(query.question)
+    samples, hits = [], 0
+    for _ in range(repeats):
+        for query in queries:
+            start = time.perf_counter()
+            docs = retriever.invoke(query.question)
+            samples.append(time.perf_counter() - start)
+            hits += _hit(docs, query)
+    summary = latency_summary(samples)
+    summary["hit_rate"] = hits / len(samples) if samples else 0.0
+    return summary
+
+
+def bench_ask_threads(engine: ChatbotEngine, questions: Sequence[str], users: int) -> Dict[str, float]:
+    """Latensi ChatbotEngine.ask dengan `users` thread yang bertanya bersamaan."""
+    def _timed(question: str) -> float:
+        start = time.perf_counter()
+        engine.ask(question)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        samples = list(pool.map(_timed, questions))
+    wall = time.perf_counter() - start
+    summary = latency_summary(samples)
+    summary["requests_per_second"] = len(samples) / wall if wall else 0.0
+    return summary
+
+
+async def bench_ask_async(engine: ChatbotEngine, questions: Sequence[str], users: int) -> Dict[str, float]:
+    """Latensi ChatbotEngine.aask dengan `users` sesi async yang bertanya bersamaan."""
+    queue: asyncio.Queue = asyncio.Queue()
+    for question in questions:
+        queue.put_nowait(question)
+    samples: List[float] = []
+
+    async def _user() -> None:
+        while not queue.empty():
+            question = queue.get_nowait()
+            start = time.perf_counter()
+            await engine.aask(question)
+            samples.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_user() for _ in range(users)))
+    wall = time.perf_counter() - start
+    summary = latency_summary(samples)
+    summary["requests_per_second"] = len(samples) / wall if wall else 0.0
+    return summary
+
+
+async def bench_ask_many(engine: ChatbotEngine, questions: Sequence[str], max_concurrency: int) -> Dict[str, float]:
+    """Throughput ChatbotEngine.aask_many dibandingkan aask yang dipanggil berurutan."""
+    start = time.perf_counter()
+    for question in questions:
+        await engine.aask(question)
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    answered = [index async for index, _ in engine.aask_many(questions, max_concurrency=max_concurrency)]
+    batch = time.perf_counter() - start
+    return {
+        "questions": len(answered),
+        "max_concurrency": max_concurrency,
+        "serial_seconds": serial,
+        "batch_seconds": batch,
+        "batch_questions_per_second": len(answered) / batch if batch else 0.0,
+        "speedup": serial / batch if batch else 0.0,
+    }
+
+
+def run_benchmark(
+    work_dir: str,
+    n_txt: int = 20,
+    n_pdf: int = 5,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 100,
+    batch_size: int = 64,
+    workers: int = 1,
+    vector_backend: str = "numpy",
+    retriever_types: Sequence[str] = RETRIEVER_TYPES,
+    retrieval_repeats: int = 3,
+    concurrency: Sequence[int] = (1, 4, 16),
+    questions_per_user: int = 5,
+    llm_delay: float = 0.05,
+    embedding_delay: float = 0.0,
+    web_search_delay: Optional[float] = None,
+    web_search_deadline: Optional[float] = 3.0,
+    seed: int = 42,
+) -> dict:
+    """
+    Menjalankan seluruh benchmark offline dan mengembalikan laporan (dict yang bisa di-JSON-kan).
+
+    Semua komponen eksternal diganti tiruan deterministik: HashEmbeddings, FakeLLM (provider
+    "fake"), dan FakeCrossEncoder, sehingga angka hanya mencerminkan kode di repo ini.
+    Jika `web_search_delay` diisi, pencarian internet memakai StubSearchBackend dengan latensi itu.
+    """
+    register_fake_providers(llm_delay=llm_delay)
+    report: dict = {"meta": run_metadata(
+        n_txt=n_txt, n_pdf=n_pdf, chunk_size=chunk_size, chunk_overlap=chunk_overlap,
+        batch_size=batch_size, workers=workers, vector_backend=vector_backend,
+        retrieval_repeats=retrieval_repeats, concurrency=list(concurrency),
+        questions_per_user=questions_per_user, llm_delay=llm_delay,
+        embedding_delay=embedding_delay, web_search_delay=web_search_delay,
+        web_search_deadline=web_search_deadline, seed=seed,
+    )}
+
+    corpus = generate_corpus(os.path.join(work_dir, "corpus"), n_txt=n_txt, n_pdf=n_pdf, seed=seed)
+    report["corpus"] = {"files": len(corpus.paths), "bytes": corpus.total_bytes, "queries": len(corpus.queries)}
+    print(f"[INFO] Korpus: {len(corpus.paths)} file, {corpus.total_bytes} byte, {len(corpus.queries)} pertanyaan")
+
+    load_split = bench_load_split(corpus.paths, chunk_size, chunk_overlap)
+    chunks = load_split.pop("_chunks")
+    report["load_split"] = load_split
+
+    embeddings = HashEmbeddings(delay_per_text=embedding_delay)
+    report["embed"] = bench_embed(embeddings, chunks, batch_size)
+    report["query_embedding"] = bench_query_embedding(
+        [query.question for query in corpus.queries] * 4, users=max(concurrency))
+
+    persist_directory = os.path.join(work_dir, "db")
+    base = create_vectorstore(embeddings, persist_directory=persist_directory, backend=vector_backend)
+    vectorstore = IndexedVectorStore(base, BM25Index(lexical_index_path(persist_directory, vector_backend)))
+    manifest = IngestionManifest(os.path.join(persist_directory, "ingestion_manifest.json"))
+    report["ingest"] = bench_ingest(corpus.paths, vectorstore, manifest, batch_size, chunk_size,
+                                    chunk_overlap, workers)
+    print(f"[INFO] Ingestion: {report['ingest']['chunks_added']} chunk")
+
+    report["retrieval"] = {}
+    retrievers: Dict[str, BaseRetriever] = {}
+    for retriever_type in retriever_types:
+        retrievers[retriever_type] = create_retriever(
+            embeddings,
+            retriever_type=retriever_type,
+            persist_directory=persist_directory,
+            vectorstore=vectorstore,
+            backend=vector_backend,
+            reranker=CrossEncoderReranker(cross_encoder=FakeCrossEncoder()) if retriever_type == "reranking" else None,
+        )
+        report["retrieval"][retriever_type] = bench_retrieval(
+            retrievers[retriever_type], corpus.queries, repeats=retrieval_repeats
+        )
+        print(f"[INFO] Retrieval {retriever_type}: p50={report['retrieval'][retriever_type]['p50_ms']:.2f} ms")
+
+    # Answer cache dimatikan agar setiap pertanyaan benar-benar melewati retrieval dan LLM
+    web_search = None
+    if web_search_delay is not None:
+        web_search = CachedWebSearch(StubSearchBackend(delay=web_search_delay), deadline_seconds=web_search_deadline)
+    engine = ChatbotEngine(
+        retriever=retrievers[retriever_types[0]],
+        llm_model=FAKE_PROVIDER,
+        answer_cache=None,
+        use_internet_search=web_search is not None,
+        web_search=web_search,
+    )
+    report["ask"] = {"threads": {}, "async": {}}
+    for users in concurrency:
+        questions = [corpus.queries[i % len(corpus.queries)].question for i in range(users * questions_per_user)]
+        report["ask"]["threads"][str(users)] = bench_ask_threads(engine, questions, users)
+        report["ask"]["async"][str(users)] = asyncio.run(bench_ask_async(engine, questions, users))
+        print(f"[INFO] Ask dengan {users} pengguna: p95={report['ask']['async'][str(users)]['p95_ms']:.1f} ms")
+
+    questions = [query.question for query in corpus.queries]
+    report["ask_many"] = asyncio.run(bench_ask_many(engine, questions, max(concurrency)))
+    print(f"[INFO] Ask batch: {report['ask_many']['speedup']:.1f}x lebih cepat dari serial")
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point: `python -m myrag_chatbot.benchmark.harness --output hasil.json`."""
+    parser = argparse.ArgumentParser(description="Benchmark offline ingestion, retrieval, dan ask.")
+    parser.add_argument("--output", default="benchmarks/latest.json", help="File JSON hasil benchmark.")
+    parser.add_argument("--compare", help="Laporan JSON sebelumnya sebagai pembanding.")
+    parser.add_argument("--work-dir", help="Direktori korpus dan index (default: direktori sementara).")
+    parser.add_argument("--txt-files", type=int, default=20)
+    parser.add_argument("--pdf-files", type=int, default=5)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--vector-backend", choices=["chroma", "numpy"], default="numpy")
+    parser.add_argument("--retriever-type", action="append", choices=RETRIEVER_TYPES, dest="retriever_types")
+    parser.add_argument("--repeats", type=int, default=3, help="Pengulangan query retrieval.")
+    parser.add_argument("--users", type=int, action="append", help="Jumlah pengguna bersamaan (boleh berulang).")
+    parser.add_argument("--questions-per-user", type=int, default=5)
+    parser.add_argument("--llm-delay", type=float, default=0.05, help="Latensi FakeLLM (detik).")
+    parser.add_argument("--embedding-delay", type=float, default=0.0, help="Latensi per teks HashEmbeddings (detik).")
+    parser.add_argument("--web-search-delay", type=float, default=None,
+                        help="Aktifkan pencarian internet tiruan dengan latensi ini (detik).")
+    parser.add_argument("--web-search-deadline", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    def _run(work_dir: str) -> dict:
+        return run_benchmark(
+            work_dir,
+            n_txt=args.txt_files,
+            n_pdf=args.pdf_files,
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            vector_backend=args.vector_backend,
+            retriever_types=args.retriever_types or RETRIEVER_TYPES,
+            retrieval_repeats=args.repeats,
+            concurrency=args.users or (1, 4, 16),
+            questions_per_user=args.questions_per_user,
+            llm_delay=args.llm_delay,
+            embedding_delay=args.embedding_delay,
+            web_search_delay=args.web_search_delay,
+            web_search_deadline=args.web_search_deadline,
+            seed=args.seed,
+        )
+
+    if args.work_dir:
+        report = _run(args.work_dir)
+    else:
+        with tempfile.TemporaryDirectory() as work_dir:
+            report = _run(work_dir)
+
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"[INFO] Hasil benchmark ditulis ke {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        for line in compare_reports(baseline, report):
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# src/myrag_chatbot/benchmark/report.py
+import datetime
+import math
+import subprocess
+import sys
+from typing import Dict, List, Optional, Sequence
+
+
+def git_commit() -> Optional[str]:
+    """Hash commit pendek dari working tree saat ini, atau None jika bukan repo git."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_metadata(**params: object) -> Dict[str, object]:
+    """Metadata run benchmark agar hasil dari versi berbeda bisa dibandingkan."""
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "python": sys.version.split()[0],
+        "params": params,
+    }
+
+
+def percentile(sorted_samples: Sequence[float], q: float) -> float:
+    """Persentil dengan interpolasi linear dari sampel yang sudah terurut."""
+    if not sorted_samples:
+        return float("nan")
+    position = (len(sorted_samples) - 1) * q
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_samples) - 1)
+    return sorted_samples[lower] + (sorted_samples[upper] - sorted_samples[lower]) * (position - lower)
+
+
+def latency_summary(samples_seconds: Sequence[float]) -> Dict[str, float]:
+    """Ringkasan latensi (milidetik): p50, p95, p99, rata-rata, maksimum."""
+    ordered = sorted(sample * 1000 for sample in samples_seconds)
+    return {
+        "count": len(ordered),
+        "p50_ms": percentile(ordered, 0.50),
+        "p95_ms": percentile(ordered, 0.95),
+        "p99_ms": percentile(ordered, 0.99),
+        "mean_ms": sum(ordered) / len(ordered) if ordered else float("nan"),
+        "max_ms": ordered[-1] if ordered else float("nan"),
+    }
+
+
+def flatten_metrics(report: dict, prefix: str = "") -> Dict[str, float]:
+    """Meratakan angka di laporan menjadi {"bagian.sub.metrik": nilai}; metadata dilewati."""
+    flat: Dict[str, float] = {}
+    for key, value in report.items():
+        if not prefix and key == "meta":
+            continue
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten_metrics(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def compare_reports(baseline: dict, current: dict) -> List[str]:
+    """
+    Membandingkan dua laporan benchmark.
+
+    Returns:
+        Baris teks "metrik: lama -> baru (+x.x%)" untuk setiap metrik yang ada di keduanya.
+    """
+    before = flatten_metrics(baseline)
+    after = flatten_metrics(current)
+    lines = []
+    for name in sorted(before.keys() & after.keys()):
+        old, new = before[name], after[name]
+        delta = f" ({(new - old) / old * 100:+.1f}%)" if old else ""
+        lines.append(f"{name}: {old:.3f} -> {new:.3f}{delta}")
+    return lines
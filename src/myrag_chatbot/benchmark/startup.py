@@ -0,0 +1,151 @@
+# src/myrag_chatbot/benchmark/startup.py
+import argparse
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+from myrag_chatbot.benchmark.report import git_commit
+
+DEFAULT_MODULES = [
+    "myrag_chatbot.chatbot.chatbot_engine",
+    "myrag_chatbot.embedder.embedder",
+    "myrag_chatbot.retriever.retriever",
+    "myrag_chatbot.registry.registry",
+]
+
+# Setiap pengukuran dijalankan di interpreter baru agar yang terukur benar-benar cold import
+_IMPORT_SNIPPET = """
+import importlib, sys, time
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+print((time.perf_counter() - start) * 1000)
+"""
+
+_SESSION_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+from myrag_chatbot.registry.registry import ComponentRegistry, EngineConfig
+imported = time.perf_counter()
+registry = ComponentRegistry()
+config = EngineConfig(**json.loads(sys.argv[1]))
+if "fake" in (config.llm_model, config.embedding_model):
+    from myrag_chatbot.benchmark.fakes import register_fake_providers
+    register_fake_providers()
+registry.session(config)
+first = time.perf_counter()
+registry.session(config)
+second = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_session_ms": (first - imported) * 1000,
+    "second_session_ms": (second - first) * 1000,
+}))
+"""
+
+
+def _run(snippet: str, *args: str) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", snippet, *args],
+        capture_output=True, text=True, check=True,
+    )
+    return result.stdout.strip().splitlines()[-1]
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        "median_ms": statistics.median(samples),
+        "min_ms": min(samples),
+        "max_ms": max(samples),
+        "samples": len(samples),
+    }
+
+
+def measure_imports(modules: List[str], repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    """Waktu cold import per modul (milidetik), diukur di subprocess terpisah."""
+    results = {"python_startup": _summary([float(_run(_IMPORT_SNIPPET, "sys")) for _ in range(repeat)])}
+    for module in modules:
+        results[module] = _summary([float(_run(_IMPORT_SNIPPET, module)) for _ in range(repeat)])
+    return results
+
+
+def measure_first_session(config: Dict[str, object], repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    """Waktu import registry, sesi pertama (membangun komponen), dan sesi kedua (handle saja)."""
+    runs = [json.loads(_run(_SESSION_SNIPPET, json.dumps(config))) for _ in range(repeat)]
+    return {key: _summary([run[key] for run in runs]) for key in runs[0]}
+
+
+def _last_record(history_path: str) -> Optional[dict]:
+    if not os.path.exists(history_path):
+        return None
+    last = None
+    with open(history_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                last = json.loads(line)
+    return last
+
+
+def _print_comparison(record: dict, previous: Optional[dict]) -> None:
+    def _rows(data: dict, section: str):
+        for name, summary in data.get(section, {}).items():
+            yield f"{section}:{name}", summary["median_ms"]
+
+    previous_values = dict(_rows(previous, "imports")) if previous else {}
+    previous_values.update(dict(_rows(previous, "session")) if previous else {})
+    for section in ("imports", "session"):
+        for name, median in _rows(record, section):
+            before = previous_values.get(name)
+            delta = f" ({(median - before) / before * 100:+.1f}% vs {previous['git_commit']})" if before else ""
+            print(f"{name:<55} {median:9.1f} ms{delta}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point: `python -m myrag_chatbot.benchmark.startup`."""
+    parser = argparse.ArgumentParser(description="Benchmark waktu import dan sesi pertama.")
+    parser.add_argument("--history", default="benchmarks/startup_history.jsonl",
+                        help="File JSONL tempat hasil setiap run ditambahkan.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--module", action="append", dest="modules", help="Modul tambahan yang diukur.")
+    parser.add_argument("--skip-session", action="store_true", help="Jangan ukur sesi pertama.")
+    parser.add_argument("--llm-model", default="ollama")
+    parser.add_argument("--embedding-model", default="ollama")
+    parser.add_argument("--retriever-type", default="similarity")
+    parser.add_argument("--vector-backend", default="chroma")
+    parser.add_argument("--persist-directory", default=None,
+                        help="Default: direktori sementara yang kosong.")
+    args = parser.parse_args(argv)
+
+    record = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "python": sys.version.split()[0],
+        "imports": measure_imports(DEFAULT_MODULES + (args.modules or []), repeat=args.repeat),
+    }
+    if not args.skip_session:
+        with tempfile.TemporaryDirectory() as tmp:
+            config = {
+                "llm_model": args.llm_model,
+                "embedding_model": args.embedding_model,
+                "retriever_type": args.retriever_type,
+                "vector_backend": args.vector_backend,
+                "persist_directory": args.persist_directory or tmp,
+            }
+            record["session_config"] = config
+            record["session"] = measure_first_session(config, repeat=max(1, args.repeat // 2))
+
+    previous = _last_record(args.history)
+    _print_comparison(record, previous)
+    directory = os.path.dirname(args.history)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.history, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+# src/myrag_chatbot/chatbot/answer_cache.py
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+def normalize_question(question: str) -> str:
+    """Normalisasi teks pertanyaan: huruf kecil, tanpa tanda baca, spasi tunggal."""
+    text = unicodedata.normalize("NFKC", question).casefold()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+class AnswerCache:
+    """
+    Cache jawaban untuk pertanyaan yang sama atau mirip.
+
+    Lookup pertama dilakukan pada teks pertanyaan yang dinormalisasi (exact match).
+    Jika tidak ada dan `embeddings` diberikan, lookup dilanjutkan dengan cosine similarity
+    antara embedding pertanyaan dan embedding pertanyaan yang sudah dijawab. Entri
+    memiliki TTL dan dibuang dengan LRU jika cache penuh.
+
+    Setiap `clear()` menaikkan `generation`. Jawaban yang disimpan dengan generation
+    lama (dihitung sebelum isi koleksi berubah) dibuang, bukan disimpan.
+    """
+
+    def __init__(
+        self,
+        embeddings: Optional[Embeddings] = None,
+        similarity_threshold: float = 0.92,
+        ttl_seconds: float = 3600.0,
+        max_entries: int = 1024,
+    ):
+        """
+        Args:
+            embeddings: Embeddings untuk lookup semantik. None berarti hanya exact match.
+            similarity_threshold: Batas minimum cosine similarity agar dianggap pertanyaan yang sama.
+            ttl_seconds: Umur maksimum entri dalam detik.
+            max_entries: Jumlah maksimum entri (LRU).
+        """
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+        self._lock = threading.RLock()
+        self._generation = 0
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        # Matriks vektor ternormalisasi, dibangun ulang hanya setelah entri berubah
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[str] = []
+        # Memo kecil agar get() lalu put() untuk pertanyaan yang sama tidak meng-embed dua kali
+        self._vector_memo: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    @staticmethod
+    def _unit(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def _remember_vector(self, key: str, vector: np.ndarray) -> None:
+        self._vector_memo[key] = vector
+        self._vector_memo.move_to_end(key)
+        while len(self._vector_memo) > 256:
+            self._vector_memo.popitem(last=False)
+
+    def _purge_expired(self, now: float) -> None:
+        expired = [key for key, entry in self._entries.items() if entry["expires_at"] <= now]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrix = None
+
+    def _semantic_lookup(self, vector: np.ndarray) -> Optional[str]:
+        candidates = [key for key, entry in self._entries.items() if entry["vector"] is not None]
+        if not candidates:
+            return None
+        if self._matrix is None or self._matrix_keys != candidates:
+            self._matrix = np.stack([self._entries[key]["vector"] for key in candidates])
+            self._matrix_keys = candidates
+        scores = self._matrix @ vector
+        best = int(np.argmax(scores))
+        if scores[best] >= self.similarity_threshold:
+            return self._matrix_keys[best]
+        return None
+
+    def _get(self, key: str, vector: Optional[np.ndarray]) -> Optional[dict]:
+        with self._lock:
+            self._purge_expired(time.monotonic())
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return entry["result"]
+            if vector is not None:
+                self._remember_vector(key, vector)
+                match = self._semantic_lookup(vector)
+                if match is not None:
+                    self._entries.move_to_end(match)
+                    self.semantic_hits += 1
+                    return self._entries[match]["result"]
+            self.misses += 1
+            return None
+
+    @property
+    def generation(self) -> int:
+        """Nomor versi isi cache; diambil sebelum retrieval lalu diteruskan ke put()."""
+        return self._generation
+
+    def _put(self, key: str, result: dict, vector: Optional[np.ndarray], generation: Optional[int]) -> None:
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                # Koleksi berubah selama jawaban ini dibuat; jawabannya bisa sudah usang
+                return
+            self._entries[key] = {
+                "result": result,
+                "vector": vector,
+                "expires_at": time.monotonic() + self.ttl_seconds,
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def _memo_vector(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            return self._vector_memo.get(key)
+
+    def get(self, question: str) -> Optional[dict]:
+        """Mengambil jawaban tersimpan untuk pertanyaan ini atau pertanyaan yang mirip."""
+        key = normalize_question(question)
+        with self._lock:
+            if key in self._entries or self.embeddings is None:
+                return self._get(key, None)
+        vector = self._memo_vector(key)
+        if vector is None:
+            vector = self._unit(self.embeddings.embed_query(question))
+        return self._get(key, vector)
+
+    async def aget(self, question: str) -> Optional[dict]:
+        """Versi async dari get()."""
+        key = normalize_question(question)
+        with self._lock:
+            if key in self._entries or self.embeddings is None:
+                return self._get(key, None)
+        vector = self._memo_vector(key)
+        if vector is None:
+            vector = self._unit(await self.embeddings.aembed_query(question))
+        return self._get(key, vector)
+
+    def put(self, question: str, result: dict, generation: Optional[int] = None) -> None:
+        """
+        Menyimpan jawaban untuk pertanyaan ini.
+
+        Args:
+            question: Pertanyaan.
+            result: Jawaban dan sumbernya.
+            generation: Nilai `generation` saat retrieval dimulai. Jika cache sudah
+                dikosongkan sejak itu, jawaban tidak disimpan.
+        """
+        key = normalize_question(question)
+        vector = self._memo_vector(key)
+        if vector is None and self.embeddings is not None:
+            vector = self._unit(self.embeddings.embed_query(question))
+        self._put(key, result, vector, generation)
+
+    async def aput(self, question: str, result: dict, generation: Optional[int] = None) -> None:
+        """Versi async dari put()."""
+        key = normalize_question(question)
+        vector = self._memo_vector(key)
+        if vector is None and self.embeddings is not None:
+            vector = self._unit(await self.embeddings.aembed_query(question))
+        self._put(key, result, vector, generation)
+
+    def clear(self) -> None:
+        """Mengosongkan cache (dipanggil ketika isi koleksi berubah)."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._matrix = None
+            self._matrix_keys = []
+
+    def stats(self) -> Dict[str, float]:
+        total = self.exact_hits + self.semantic_hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": (self.exact_hits + self.semantic_hits) / total if total else 0.0,
+            "entries": len(self._entries),
+        }
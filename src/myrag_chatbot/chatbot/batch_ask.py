@@ -0,0 +1,126 @@
+# src/myrag_chatbot/chatbot/batch_ask.py
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from typing import IO, Dict, List, Optional, Tuple
+
+from myrag_chatbot.chatbot.chatbot_engine import ChatbotEngine
+
+logger = logging.getLogger(__name__)
+
+
+def read_questions(path: str) -> List[Tuple[Optional[str], str]]:
+    """
+    Membaca file pertanyaan.
+
+    File `.jsonl` berisi satu objek per baris dengan kunci "question" (dan "id" opsional);
+    format lain dibaca sebagai satu pertanyaan per baris. Baris kosong dilewati.
+
+    Returns:
+        Daftar (id atau None, pertanyaan).
+    """
+    items: List[Tuple[Optional[str], str]] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            if path.endswith(".jsonl"):
+                record = json.loads(line)
+                if "question" not in record:
+                    raise ValueError(f"Baris {line_number} tidak memiliki kunci 'question'.")
+                items.append((record.get("id"), record["question"]))
+            else:
+                items.append((None, line))
+    return items
+
+
+async def run_batch(
+    engine: ChatbotEngine,
+    items: List[Tuple[Optional[str], str]],
+    output: IO[str],
+    max_concurrency: int = 4,
+    batch_size: int = 64,
+    include_sources: bool = True,
+) -> Dict[str, float]:
+    """
+    Menjawab semua pertanyaan dan menulis hasilnya ke `output` sebagai JSONL saat selesai.
+
+    Returns:
+        Statistik: jumlah pertanyaan, jumlah gagal, durasi, dan throughput.
+    """
+    start = time.perf_counter()
+    errors = 0
+    questions = [question for _, question in items]
+    async for index, result in engine.aask_many(questions, max_concurrency=max_concurrency, batch_size=batch_size):
+        record = {"index": index}
+        if items[index][0] is not None:
+            record["id"] = items[index][0]
+        record.update(result)
+        if not include_sources:
+            record.pop("sources", None)
+        errors += "error" in result
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        output.flush()
+    elapsed = time.perf_counter() - start
+    return {
+        "questions": len(items),
+        "errors": errors,
+        "elapsed_seconds": elapsed,
+        "questions_per_second": len(items) / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point CLI: `myrag-ask-batch pertanyaan.jsonl --output jawaban.jsonl`."""
+    from myrag_chatbot.registry.registry import EngineConfig, get_registry
+
+    parser = argparse.ArgumentParser(description="Menjawab file pertanyaan secara offline (JSONL).")
+    parser.add_argument("questions", help="File .jsonl ({\"question\": ..., \"id\": ...}) atau teks per baris.")
+    parser.add_argument("--output", default=None, help="File JSONL hasil (default: stdout).")
+    parser.add_argument("--persist-directory", default=EngineConfig.persist_directory)
+    parser.add_argument("--llm-model", default=EngineConfig.llm_model)
+    parser.add_argument("--embedding-model", default=EngineConfig.embedding_model)
+    parser.add_argument("--vector-backend", default=EngineConfig.vector_backend, choices=["chroma", "numpy"])
+    parser.add_argument("--retriever-type", default=EngineConfig.retriever_type,
+                        choices=["similarity", "mmr", "hybrid", "reranking"])
+    parser.add_argument("--embedding-cache-dir", default=None)
+    parser.add_argument("--concurrency", type=int, default=4, help="Permintaan LLM bersamaan.")
+    parser.add_argument("--batch-size", type=int, default=64, help="Pertanyaan per retrieval batch.")
+    parser.add_argument("--no-answer-cache", action="store_true", help="Jangan memakai answer cache.")
+    parser.add_argument("--no-sources", action="store_true", help="Jangan tulis sumber ke hasil.")
+    parser.add_argument("--verbose", action="store_true", help="Tampilkan log debug.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+
+    config = EngineConfig(
+        llm_model=args.llm_model,
+        embedding_model=args.embedding_model,
+        retriever_type=args.retriever_type,
+        vector_backend=args.vector_backend,
+        persist_directory=args.persist_directory,
+        embedding_cache_dir=args.embedding_cache_dir,
+        answer_cache=not args.no_answer_cache,
+    )
+    engine = get_registry().engine(config)
+    items = read_questions(args.questions)
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        stats = asyncio.run(run_batch(
+            engine, items, output,
+            max_concurrency=args.concurrency,
+            batch_size=args.batch_size,
+            include_sources=not args.no_sources,
+        ))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    sys.stderr.write(json.dumps(stats, indent=2) + "\n")
+
+
+if __name__ == '__main__':
+    main()
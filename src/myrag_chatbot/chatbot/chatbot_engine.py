@@ -1,25 +1,22 @@
-import os
-from typing import Optional, List
-from langchain.chains import RetrievalQA
-from langchain.prompts import PromptTemplate
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, Optional, List, Sequence, Tuple
+from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
 from langchain_core.retrievers import BaseRetriever
-from langchain_community.tools.tavily_search import TavilySearchResults
-from langchain_openai import ChatOpenAI
-from langchain_community.llms import Ollama
-from langchain.schema import Document
+from langchain_core.documents import Document
+from langchain_core.runnables import Runnable
+from langchain_core.vectorstores import VectorStoreRetriever
+from myrag_chatbot.chatbot.answer_cache import AnswerCache, normalize_question
+from myrag_chatbot.chatbot.context import ContextPacker, PackedContext, context_budget_for
+from myrag_chatbot.chatbot.llm_providers import create_llm
+from myrag_chatbot.chatbot.web_search import CachedWebSearch, create_web_search
+from myrag_chatbot.metrics.metrics import MetricsRegistry, get_metrics
 from dotenv import load_dotenv
 import logging
 
-# Setup logging
-logging.basicConfig(level=logging.DEBUG, format='[%(levelname)s] %(message)s')
-
-# Optional: Google Gemini
-try:
-    from langchain_google_genai import GenerativeModel, GoogleGenerativeAIEmbeddings
-except ImportError:
-    GenerativeModel = None
-    GoogleGenerativeAIEmbeddings = None
-    logging.warning("langchain_google_genai not found. Gemini functionality will be disabled.")
+# Logging tidak dikonfigurasi di sini; aplikasi yang memakai engine yang menentukan level log
+logger = logging.getLogger(__name__)
 
 load_dotenv()  # Load environment variables
 
@@ -29,16 +26,26 @@ class ChatbotEngine:
         retriever: BaseRetriever,
         llm_model: str = "ollama",
         temperature: float = 0.2,
-        use_internet_search: bool = False
+        use_internet_search: bool = False,
+        answer_cache: Optional[AnswerCache] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        context_budget: Optional[int] = None,
+        web_search: Optional[CachedWebSearch] = None,
+        llm: Optional[Runnable] = None
     ):
-        logging.debug("Menginisialisasi ChatbotEngine...")
+        logger.debug("Menginisialisasi ChatbotEngine...")
         self.retriever = retriever
         self.llm_model = llm_model
         self.temperature = temperature
         self.use_internet_search = use_internet_search
+        self.answer_cache = answer_cache
+        self.metrics = metrics or get_metrics()
+        # Konteks dibatasi per model: prompt yang lebih pendek berarti prefill LLM yang lebih cepat
+        self.context_packer = ContextPacker(max_tokens=context_budget or context_budget_for(llm_model))
 
-        self.llm = self._select_llm()
-        self.internet_search = self._setup_internet_search()
+        # `llm` bisa berupa LLMRouter yang membagi permintaan ke beberapa backend
+        self.llm = llm if llm is not None else self._select_llm()
+        self.internet_search = web_search if web_search is not None else self._setup_internet_search()
 
         self.prompt = PromptTemplate(
             input_variables=["context", "question"],
@@ -50,113 +57,371 @@ Jika informasi tidak mencukupi, jawab berdasarkan pengetahuan umummu.
 Pertanyaan: {question}""",
         )
 
-        self.qa_chain = RetrievalQA.from_chain_type(
-            llm=self.llm,
-            retriever=self.retriever,
-            chain_type="stuff",
-            chain_type_kwargs={"prompt": self.prompt},
-        )
+        # Dokumen diambil sekali per pertanyaan lalu dimasukkan langsung ke prompt,
+        # jadi chain tidak perlu melakukan retrieval sendiri
+        self.answer_chain = self.prompt | self.llm | StrOutputParser()
 
-        logging.debug("ChatbotEngine berhasil diinisialisasi.")
+        logger.debug("ChatbotEngine berhasil diinisialisasi.")
 
     def _select_llm(self):
-        logging.debug(f"Memilih model LLM: {self.llm_model}")
-        if self.llm_model == "openai":
-            openai_api_key = os.getenv("OPENAI_API_KEY")
-            if not openai_api_key:
-                raise ValueError("OPENAI_API_KEY harus diatur di environment variables.")
-            logging.debug("Menggunakan model OpenAI (gpt-3.5-turbo)")
-            return ChatOpenAI(
-                model_name="gpt-3.5-turbo",
-                temperature=self.temperature,
-                openai_api_key=openai_api_key,
-            )
-        elif self.llm_model == "ollama":
-            logging.debug("Menggunakan model Ollama (llama3.2:latest)")
-            return Ollama(model="llama3.2:latest", temperature=self.temperature)
-        elif self.llm_model == "gemini":
-            google_api_key = os.getenv("GOOGLE_API_KEY")
-            if not google_api_key:
-                raise ValueError("GOOGLE_API_KEY harus diatur di environment variables.")
-            if GenerativeModel is None:
-                raise ValueError("langchain_google_genai tidak tersedia.")
-            logging.debug("Menggunakan model Gemini (gemini-pro)")
-            return GenerativeModel(
-                model_name="gemini-pro",
-                temperature=self.temperature,
-                api_key=google_api_key
-            )
-        else:
-            raise ValueError(f"Model LLM tidak didukung: {self.llm_model}")
-
-    def _setup_internet_search(self) -> Optional[TavilySearchResults]:
+        logger.debug("Memilih model LLM: %s", self.llm_model)
+        # SDK provider hanya diimpor untuk provider yang dipilih
+        return create_llm(self.llm_model, self.temperature)
+
+    def _setup_internet_search(self) -> Optional[CachedWebSearch]:
         if self.use_internet_search:
-            tavily_api_key = os.getenv("TAVILY_API_KEY")
-            if not tavily_api_key:
-                logging.warning("TAVILY_API_KEY tidak ditemukan. Pencarian internet dinonaktifkan.")
-                return None
-            logging.debug("Pencarian internet (Tavily) diaktifkan.")
-            return TavilySearchResults(max_results=3, api_key=tavily_api_key)
-        logging.debug("Pencarian internet tidak diaktifkan.")
+            # Tavily dengan cache hasil dan batas waktu per permintaan
+            return create_web_search("tavily")
+        logger.debug("Pencarian internet tidak diaktifkan.")
         return None
 
-    def ask(self, question: str) -> str:
-        logging.debug(f"Pertanyaan diterima: {question}")
-        context_sources: List[str] = []
-
-        # Ambil konteks dari RAG
-        logging.debug("Mengambil dokumen relevan dari retriever...")
-        rag_results = self.retriever.get_relevant_documents(question)
-        logging.debug(f"Jumlah dokumen dari retriever: {len(rag_results)}")
-        rag_context = "\n".join([doc.page_content for doc in rag_results])
-        context_sources.append(f"Informasi dari dokumen:\n{rag_context}")
-
-        # Internet Search jika aktif
-        if self.use_internet_search and self.internet_search:
-            try:
-                logging.debug("Melakukan pencarian internet...")
-                web_results = self.internet_search.run(question)
-                if web_results:
-                    logging.debug("Hasil pencarian internet berhasil diperoleh.")
-                    context_sources.append(f"Informasi dari internet:\n{web_results}")
-            except Exception as e:
-                logging.error(f"Error saat pencarian internet: {e}")
+    def _retrieve(self, question: str) -> List[Document]:
+        logger.debug("Mengambil dokumen relevan dari retriever...")
+        with self.metrics.span("retrieval"):
+            rag_results = self.retriever.invoke(question)
+        logger.debug("Jumlah dokumen dari retriever: %d", len(rag_results))
+        return rag_results
 
-        # Gabungkan semua konteks
-        final_context = "\n\n".join(context_sources)
-        logging.debug("Menjalankan QA Chain dengan konteks yang disiapkan...")
+    def _retrieve_many(self, questions: Sequence[str]) -> List[List[Document]]:
+        """
+        Retrieval untuk banyak pertanyaan sekaligus.
 
-        result = self.qa_chain({
-            "query": question,
-            "input_documents": rag_results if rag_results else []
-        })
+        Untuk retriever similarity biasa, semua pertanyaan di-embed dalam satu panggilan
+        batch lalu dicari dengan `batch_similarity_search_by_vector` jika vectorstore
+        menyediakannya (NumpyVectorStore). Retriever lain memakai `batch` bawaan LangChain.
+        """
+        logger.debug("Mengambil dokumen untuk %d pertanyaan sekaligus...", len(questions))
+        retriever = self.retriever
+        with self.metrics.span("retrieval_batch"):
+            if not (isinstance(retriever, VectorStoreRetriever) and retriever.search_type == "similarity"):
+                return retriever.batch(list(questions))
+            vectorstore = retriever.vectorstore
+            vectors = self._embed_questions(vectorstore.embeddings, questions)
+            # Semua search_kwargs (filter, n_probe, ...) diteruskan, supaya hasilnya sama dengan ask()
+            search_kwargs = dict(retriever.search_kwargs)
+            k = search_kwargs.pop("k", 4)
+            batch_search = getattr(vectorstore, "batch_similarity_search_by_vector", None)
+            if batch_search is not None:
+                return [[doc for doc, _ in hits] for hits in batch_search(vectors, k=k, **search_kwargs)]
+            return [vectorstore.similarity_search_by_vector(vector, k=k, **search_kwargs) for vector in vectors]
 
-        logging.debug("Jawaban berhasil diperoleh.")
-        return result["result"]
+    @staticmethod
+    def _embed_questions(embeddings: Any, questions: Sequence[str]) -> List[List[float]]:
+        # embed_queries (CachedEmbeddings) tahu apakah provider boleh di-batch lewat embed_documents;
+        # tanpanya setiap pertanyaan di-embed dengan embed_query agar vektornya tetap vektor query
+        embed_queries = getattr(embeddings, "embed_queries", None)
+        if embed_queries is not None:
+            return embed_queries(list(questions))
+        return [embeddings.embed_query(question) for question in questions]
 
-    def ask_with_sources(self, question: str) -> dict:
-        answer = self.ask(question)
-        sources = []
+    def _warm_question_embeddings(self, questions: Sequence[str]) -> None:
+        # Satu panggilan batch mengisi cache embedding pertanyaan sebelum lookup answer cache
+        embeddings = self.answer_cache.embeddings if self.answer_cache is not None else None
+        embed_queries = getattr(embeddings, "embed_queries", None)
+        if embed_queries is not None:
+            embed_queries(list(questions))
+
+    def _search_web(self, question: str) -> Optional[Any]:
+        if not (self.use_internet_search and self.internet_search):
+            return None
+        logger.debug("Melakukan pencarian internet...")
+        # Error dan batas waktu ditangani CachedWebSearch; hasilnya None dan jawaban memakai dokumen saja
+        with self.metrics.span("web_search"):
+            web_results = self.internet_search.search(question)
+        if web_results:
+            logger.debug("Hasil pencarian internet berhasil diperoleh.")
+            return web_results
+        return None
+
+    async def _aretrieve(self, question: str) -> List[Document]:
+        logger.debug("Mengambil dokumen relevan dari retriever (async)...")
+        with self.metrics.span("retrieval"):
+            rag_results = await self.retriever.ainvoke(question)
+        logger.debug("Jumlah dokumen dari retriever: %d", len(rag_results))
+        return rag_results
+
+    async def _asearch_web(self, question: str) -> Optional[Any]:
+        if not (self.use_internet_search and self.internet_search):
+            return None
+        logger.debug("Melakukan pencarian internet (async)...")
+        with self.metrics.span("web_search"):
+            web_results = await self.internet_search.asearch(question)
+        if web_results:
+            logger.debug("Hasil pencarian internet berhasil diperoleh.")
+            return web_results
+        return None
+
+    def _build_context(self, rag_results: List[Document], web_results: Optional[Any]) -> PackedContext:
+        with self.metrics.span("prompt_build"):
+            packed = self.context_packer.pack(rag_results, web_results)
+        self.metrics.inc("myrag_context_tokens_total", packed.tokens, model=self.llm_model)
+        if packed.dropped_documents:
+            self.metrics.inc("myrag_context_dropped_documents_total", packed.dropped_documents)
+        return packed
 
+    def _build_sources(self, packed: PackedContext) -> List[dict]:
+        # Sumber yang dikembalikan sama dengan yang benar-benar masuk ke prompt
+        sources = []
         # Sumber dari dokumen
-        rag_results = self.retriever.get_relevant_documents(question)
-        for doc in rag_results:
+        for doc in packed.documents:
             sources.append({
                 "source_type": "document",
                 "content": doc.page_content,
                 "metadata": doc.metadata
             })
-
         # Sumber dari internet
-        if self.use_internet_search and self.internet_search:
+        for web_result in packed.web_results:
+            sources.append({
+                "source_type": "internet_search",
+                "content": web_result,
+            })
+        return sources
+
+    def _record_cache_lookup(self, hit: bool) -> None:
+        self.metrics.inc("myrag_cache_requests_total", cache="answer", result="hit" if hit else "miss")
+
+    def _record_generation(self, start: float, first_token: Optional[float], tokens: int) -> None:
+        if first_token is not None:
+            # TTFT per backend dicatat LLMRouter; ini TTFT jawaban seperti yang dilihat pengguna
+            self.metrics.observe("myrag_answer_ttft_seconds", first_token - start, model=self.llm_model)
+        self.metrics.inc("myrag_llm_output_tokens_total", tokens, model=self.llm_model)
+
+    def _generate(self, context: str, question: str) -> str:
+        """Menjalankan answer chain secara streaming agar waktu token pertama ikut terukur."""
+        start = time.perf_counter()
+        first_token: Optional[float] = None
+        answer_parts: List[str] = []
+        with self.metrics.span("llm"):
+            for token in self.answer_chain.stream({"context": context, "question": question}):
+                if token:
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                    answer_parts.append(token)
+        # Potongan stream dipakai sebagai perkiraan jumlah token output
+        self._record_generation(start, first_token, len(answer_parts))
+        return "".join(answer_parts)
+
+    async def _agenerate(self, context: str, question: str) -> AsyncIterator[str]:
+        start = time.perf_counter()
+        first_token: Optional[float] = None
+        tokens = 0
+        with self.metrics.span("llm"):
+            async for token in self.answer_chain.astream({"context": context, "question": question}):
+                if token:
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                    tokens += 1
+                    yield token
+        self._record_generation(start, first_token, tokens)
+
+    def _answer(self, question: str) -> dict:
+        """Satu jalur eksekusi per pertanyaan: retrieval sekali, pencarian internet sekali."""
+        logger.debug("Pertanyaan diterima: %s", question)
+        with self.metrics.span("request"):
+            if self.answer_cache is not None:
+                cached = self.answer_cache.get(question)
+                self._record_cache_lookup(cached is not None)
+                if cached is not None:
+                    logger.debug("Jawaban diambil dari answer cache.")
+                    return cached
+            generation = self._cache_generation()
+            rag_results = self._retrieve(question)
+            web_results = self._search_web(question)
+
+            # Konteks yang dikirim ke LLM dan sumber yang dikembalikan berasal dari hasil yang sama
+            packed = self._build_context(rag_results, web_results)
+            logger.debug("Menjalankan answer chain dengan konteks yang disiapkan (%d token)...", packed.tokens)
+            answer = self._generate(packed.text, question)
+
+            logger.debug("Jawaban berhasil diperoleh.")
+            result = {"answer": answer, "sources": self._build_sources(packed)}
+            if self.answer_cache is not None:
+                self.answer_cache.put(question, result, generation)
+            return result
+
+    def ask(self, question: str) -> str:
+        return self._answer(question)["answer"]
+
+    def ask_with_sources(self, question: str) -> dict:
+        return self._answer(question)
+
+    def _cache_generation(self) -> Optional[int]:
+        # Diambil sebelum retrieval: jawaban dari index yang sudah berubah tidak masuk cache
+        return self.answer_cache.generation if self.answer_cache is not None else None
+
+    async def _acached(self, question: str) -> Optional[dict]:
+        if self.answer_cache is None:
+            return None
+        cached = await self.answer_cache.aget(question)
+        self._record_cache_lookup(cached is not None)
+        if cached is not None:
+            logger.debug("Jawaban diambil dari answer cache.")
+        return cached
+
+    async def _aprepare(self, question: str) -> PackedContext:
+        """Retrieval RAG dan pencarian internet berjalan bersamaan, lalu konteks disusun."""
+        logger.debug("Pertanyaan diterima: %s", question)
+        rag_results, web_results = await asyncio.gather(
+            self._aretrieve(question),
+            self._asearch_web(question),
+        )
+        return self._build_context(rag_results, web_results)
+
+    async def _aanswer(self, question: str) -> dict:
+        with self.metrics.span("request"):
+            cached = await self._acached(question)
+            if cached is not None:
+                return cached
+            generation = self._cache_generation()
+            packed = await self._aprepare(question)
+            return await self._acomplete(question, packed, generation)
+
+    async def _acomplete(self, question: str, packed: PackedContext, generation: Optional[int] = None) -> dict:
+        logger.debug("Menjalankan answer chain (async) dengan konteks yang disiapkan...")
+        answer = "".join([token async for token in self._agenerate(packed.text, question)])
+
+        logger.debug("Jawaban berhasil diperoleh.")
+        result = {"answer": answer, "sources": self._build_sources(packed)}
+        if self.answer_cache is not None:
+            await self.answer_cache.aput(question, result, generation)
+        return result
+
+    async def _aanswer_retrieved(self, question: str, rag_results: List[Document],
+                                 generation: Optional[int] = None) -> dict:
+        """Seperti `_aanswer`, tetapi dokumen sudah diambil oleh retrieval batch."""
+        with self.metrics.span("request"):
+            web_results = await self._asearch_web(question)
+            packed = self._build_context(rag_results, web_results)
+            return await self._acomplete(question, packed, generation)
+
+    async def aask(self, question: str) -> str:
+        return (await self._aanswer(question))["answer"]
+
+    async def aask_with_sources(self, question: str) -> dict:
+        return await self._aanswer(question)
+
+    async def aask_many(
+        self,
+        questions: Sequence[str],
+        max_concurrency: int = 4,
+        batch_size: int = 64,
+    ) -> AsyncIterator[Tuple[int, dict]]:
+        """
+        Menjawab banyak pertanyaan (evaluasi malam hari, pra-generasi FAQ).
+
+        Pertanyaan yang sama setelah normalisasi hanya dijawab sekali. Pertanyaan diproses
+        per `batch_size`: answer cache dicek, sisanya di-embed dan dicari dalam satu batch,
+        lalu jawaban dibuat oleh LLM dengan paling banyak `max_concurrency` permintaan
+        bersamaan. Batch berikutnya baru diambil jika antrean LLM tidak lebih dari satu batch.
+
+        Args:
+            questions: Daftar pertanyaan.
+            max_concurrency: Jumlah maksimum permintaan LLM yang berjalan bersamaan.
+            batch_size: Jumlah pertanyaan unik per retrieval batch.
+
+        Yields:
+            Tuple (indeks pertanyaan, hasil) sesuai urutan selesai. Hasil berisi "question",
+            "answer", dan "sources", atau "question" dan "error" jika pertanyaan itu gagal.
+        """
+        groups: Dict[str, List[int]] = {}
+        for index, question in enumerate(questions):
+            groups.setdefault(normalize_question(question), []).append(index)
+        unique = [(questions[indexes[0]], indexes) for indexes in groups.values()]
+        logger.debug("aask_many: %d pertanyaan, %d unik", len(questions), len(unique))
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+        results: asyncio.Queue = asyncio.Queue()
+        tasks: List[asyncio.Task] = []
+
+        def _emit(indexes: List[int], result: dict) -> None:
+            for index in indexes:
+                results.put_nowait((index, {"question": questions[index], **result}))
+
+        async def _answer(question: str, rag_results: List[Document], indexes: List[int],
+                          generation: Optional[int]) -> None:
+            async with semaphore:
+                try:
+                    result = await self._aanswer_retrieved(question, rag_results, generation)
+                except Exception as e:
+                    logger.error("Gagal menjawab pertanyaan %r: %s", question, e)
+                    result = {"error": str(e)}
+            _emit(indexes, result)
+
+        async def _produce() -> None:
             try:
-                web_results = self.internet_search.run(question)
-                if web_results:
-                    sources.append({
-                        "source_type": "internet_search",
-                        "content": web_results,
-                    })
+                for offset in range(0, len(unique), batch_size):
+                    batch = unique[offset:offset + batch_size]
+                    await asyncio.to_thread(self._warm_question_embeddings, [q for q, _ in batch])
+                    pending = []
+                    for question, indexes in batch:
+                        cached = await self._acached(question)
+                        if cached is not None:
+                            _emit(indexes, cached)
+                        else:
+                            pending.append((question, indexes))
+                    if pending:
+                        generation = self._cache_generation()
+                        retrieved = await asyncio.to_thread(self._retrieve_many, [q for q, _ in pending])
+                        for (question, indexes), rag_results in zip(pending, retrieved):
+                            tasks.append(asyncio.create_task(_answer(question, rag_results, indexes, generation)))
+                    # Backpressure: dokumen hasil retrieval tidak menumpuk jauh di depan LLM
+                    running = [task for task in tasks if not task.done()]
+                    while len(running) > batch_size:
+                        await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                        running = [task for task in running if not task.done()]
+                await asyncio.gather(*tasks)
             except Exception as e:
-                logging.error(f"Error saat pencarian internet: {e}")
+                results.put_nowait(e)
+
+        producer = asyncio.create_task(_produce())
+        try:
+            for _ in range(len(questions)):
+                item = await results.get()
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            producer.cancel()
+            for task in tasks:
+                task.cancel()
+
+    def ask_many(self, questions: Sequence[str], max_concurrency: int = 4, batch_size: int = 64) -> List[dict]:
+        """Versi sinkron dari `aask_many`; hasil dikembalikan sesuai urutan pertanyaan."""
+        async def _collect() -> List[dict]:
+            ordered: List[Optional[dict]] = [None] * len(questions)
+            async for index, result in self.aask_many(questions, max_concurrency, batch_size):
+                ordered[index] = result
+            return ordered  # type: ignore[return-value]
+
+        return asyncio.run(_collect())
+
+    async def astream_with_sources(self, question: str) -> AsyncIterator[dict]:
+        """
+        Men-stream jawaban token demi token.
+
+        Yields:
+            {"type": "token", "content": str} untuk setiap potongan jawaban, lalu satu
+            event terakhir {"type": "sources", "answer": str, "sources": List[dict]}.
+        """
+        start = time.perf_counter()
+        cached = await self._acached(question)
+        if cached is not None:
+            yield {"type": "token", "content": cached["answer"]}
+            yield {"type": "sources", **cached}
+            self.metrics.observe("myrag_stage_seconds", time.perf_counter() - start, stage="request")
+            return
+
+        generation = self._cache_generation()
+        packed = await self._aprepare(question)
+        logger.debug("Men-stream answer chain dengan konteks yang disiapkan...")
+        answer_parts: List[str] = []
+        async for token in self._agenerate(packed.text, question):
+            answer_parts.append(token)
+            yield {"type": "token", "content": token}
 
-        return {"answer": answer, "sources": sources}
+        logger.debug("Streaming jawaban selesai.")
+        result = {"answer": "".join(answer_parts), "sources": self._build_sources(packed)}
+        if self.answer_cache is not None:
+            await self.answer_cache.aput(question, result, generation)
+        yield {"type": "sources", **result}
+        self.metrics.observe("myrag_stage_seconds", time.perf_counter() - start, stage="request")
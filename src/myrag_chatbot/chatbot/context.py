@@ -0,0 +1,198 @@
+# src/myrag_chatbot/chatbot/context.py
+import math
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+from langchain_core.documents import Document
+
+# Anggaran token untuk konteks (di luar instruksi dan pertanyaan) per provider LLM.
+# llama3.2 di CPU memproses prompt secara linear, jadi anggarannya dibuat paling ketat.
+CONTEXT_TOKEN_BUDGETS: Dict[str, int] = {
+    "ollama": 1500,
+    "openai": 3000,
+    "gemini": 6000,
+}
+DEFAULT_CONTEXT_TOKEN_BUDGET = 2000
+
+TokenCounter = Callable[[str], int]
+
+
+def context_budget_for(llm_model: str) -> int:
+    """Anggaran token konteks untuk provider LLM tertentu."""
+    return CONTEXT_TOKEN_BUDGETS.get(llm_model, DEFAULT_CONTEXT_TOKEN_BUDGET)
+
+
+def estimate_tokens(text: str, chars_per_token: float = 4.0) -> int:
+    """Perkiraan jumlah token tanpa tokenizer (rata-rata ~4 karakter per token)."""
+    return math.ceil(len(text) / chars_per_token) if text else 0
+
+
+def _overlap_length(left: str, right: str, min_overlap: int, max_overlap: int) -> int:
+    """Panjang terpanjang akhiran `left` yang sama dengan awalan `right`."""
+    for length in range(min(len(left), len(right), max_overlap), min_overlap - 1, -1):
+        if left.endswith(right[:length]):
+            return length
+    return 0
+
+
+def _same_source(a: Document, b: Document) -> bool:
+    return a.metadata.get("source") == b.metadata.get("source")
+
+
+def _format_web_results(web_results: Any) -> List[str]:
+    """Hasil Tavily (list dict url/content) atau teks biasa menjadi daftar potongan teks."""
+    if not web_results:
+        return []
+    if isinstance(web_results, str):
+        return [web_results.strip()]
+    items = []
+    for result in web_results:
+        if isinstance(result, dict):
+            content = str(result.get("content", "")).strip()
+            url = result.get("url")
+            items.append(f"[{url}] {content}" if url else content)
+        else:
+            items.append(str(result).strip())
+    return [item for item in items if item]
+
+
+@dataclass
+class PackedContext:
+    """Hasil penyusunan konteks: teks prompt dan bagian yang benar-benar dimasukkan."""
+    text: str
+    documents: List[Document] = field(default_factory=list)
+    web_results: List[str] = field(default_factory=list)
+    tokens: int = 0
+    dropped_documents: int = 0
+    trimmed_characters: int = 0
+
+
+class ContextPacker:
+    """
+    Menyusun konteks prompt dalam anggaran token.
+
+    Chunk diurutkan sesuai relevansi (urutan dari retriever). Teks yang tumpang tindih
+    dengan chunk lain dari sumber yang sama (akibat `chunk_overlap`) dibuang dari chunk
+    yang kurang relevan, lalu chunk dimasukkan sampai anggaran habis; chunk terakhir
+    dipotong di batas kalimat jika masih ada ruang yang berarti. Hasil pencarian internet
+    mendapat porsi `web_share` dari anggaran, sisanya dipakai dokumen.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = DEFAULT_CONTEXT_TOKEN_BUDGET,
+        token_counter: TokenCounter = estimate_tokens,
+        web_share: float = 0.3,
+        min_chunk_tokens: int = 32,
+        min_overlap: int = 20,
+        max_overlap: int = 400,
+    ):
+        """
+        Args:
+            max_tokens: Anggaran token untuk seluruh konteks.
+            token_counter: Fungsi penghitung token (default: perkiraan dari jumlah karakter).
+            web_share: Porsi maksimum anggaran untuk hasil internet jika ada.
+            min_chunk_tokens: Sisa anggaran minimum agar chunk terakhir dipotong, bukan dibuang.
+            min_overlap: Panjang tumpang tindih minimum (karakter) yang dianggap duplikat.
+            max_overlap: Panjang tumpang tindih maksimum yang dicari (>= chunk_overlap splitter).
+        """
+        self.max_tokens = max_tokens
+        self.token_counter = token_counter
+        self.web_share = web_share
+        self.min_chunk_tokens = min_chunk_tokens
+        self.min_overlap = min_overlap
+        self.max_overlap = max_overlap
+
+    def _dedupe(self, documents: List[Document]) -> List[Document]:
+        """Membuang chunk duplikat dan teks tumpang tindih dari chunk yang kurang relevan."""
+        kept: List[Document] = []
+        for doc in documents:
+            text = doc.page_content.strip()
+            for better in kept:
+                if not text:
+                    break
+                if not _same_source(better, doc):
+                    continue
+                if text in better.page_content:
+                    text = ""
+                    break
+                # Awal chunk ini sama dengan akhir chunk yang lebih relevan, atau sebaliknya
+                head = _overlap_length(better.page_content, text, self.min_overlap, self.max_overlap)
+                text = text[head:].lstrip()
+                tail = _overlap_length(text, better.page_content, self.min_overlap, self.max_overlap)
+                text = text[:len(text) - tail].rstrip()
+            if text:
+                kept.append(doc if text == doc.page_content else
+                            Document(id=doc.id, page_content=text, metadata=doc.metadata))
+        return kept
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        """Memotong teks agar muat di `max_tokens`, sebisa mungkin di akhir kalimat."""
+        if self.token_counter(text) <= max_tokens:
+            return text
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.token_counter(text[:middle]) <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        cut = text[:low]
+        sentence_end = max(cut.rfind(". "), cut.rfind(".\n"))
+        if sentence_end >= len(cut) // 2:
+            return cut[:sentence_end + 1]
+        space = cut.rfind(" ")
+        return cut[:space] if space > 0 else cut
+
+    def pack(self, documents: List[Document], web_results: Any = None) -> PackedContext:
+        """
+        Menyusun konteks dari dokumen hasil retrieval dan hasil pencarian internet.
+
+        Args:
+            documents: Dokumen dari retriever, urut dari yang paling relevan.
+            web_results: Hasil pencarian internet (list dict Tavily, teks, atau None).
+
+        Returns:
+            PackedContext berisi teks konteks serta dokumen dan hasil internet yang dipakai.
+        """
+        original_characters = sum(len(doc.page_content) for doc in documents)
+        candidates = self._dedupe(documents)
+
+        web_items = _format_web_results(web_results)
+        web_used: List[str] = []
+        web_budget = int(self.max_tokens * self.web_share) if web_items else 0
+        web_tokens = 0
+        for item in web_items:
+            remaining = web_budget - web_tokens
+            if remaining < self.min_chunk_tokens:
+                break
+            item = self._truncate(item, remaining)
+            web_used.append(item)
+            web_tokens += self.token_counter(item)
+
+        doc_budget = self.max_tokens - web_tokens
+        used: List[Document] = []
+        doc_tokens = 0
+        for doc in candidates:
+            remaining = doc_budget - doc_tokens
+            tokens = self.token_counter(doc.page_content)
+            if tokens > remaining:
+                if remaining < self.min_chunk_tokens:
+                    break
+                doc = Document(id=doc.id, page_content=self._truncate(doc.page_content, remaining),
+                               metadata=doc.metadata)
+                tokens = self.token_counter(doc.page_content)
+            used.append(doc)
+            doc_tokens += tokens
+
+        sections = ["Informasi dari dokumen:\n" + "\n\n".join(doc.page_content for doc in used)]
+        if web_used:
+            sections.append("Informasi dari internet:\n" + "\n".join(f"- {item}" for item in web_used))
+        return PackedContext(
+            text="\n\n".join(sections),
+            documents=used,
+            web_results=web_used,
+            tokens=doc_tokens + web_tokens,
+            dropped_documents=len(documents) - len(used),
+            trimmed_characters=original_characters - sum(len(doc.page_content) for doc in used),
+        )
@@ -0,0 +1,101 @@
+# src/myrag_chatbot/chatbot/llm_providers.py
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.language_models import BaseLanguageModel
+
+logger = logging.getLogger(__name__)
+
+# Registry provider LLM. SDK setiap provider baru diimpor di dalam factory-nya,
+# jadi hanya provider yang dipilih yang ikut dimuat saat startup.
+LLMFactory = Callable[..., BaseLanguageModel]
+_LLM_PROVIDERS: Dict[str, LLMFactory] = {}
+
+
+def register_llm_provider(name: str, factory: LLMFactory) -> None:
+    """
+    Mendaftarkan provider LLM.
+
+    `factory(temperature, **options)` harus mengembalikan model LangChain; `options`
+    berisi pengaturan per backend seperti `model` dan `base_url`.
+    """
+    _LLM_PROVIDERS[name] = factory
+
+
+def available_llm_providers() -> List[str]:
+    return sorted(_LLM_PROVIDERS)
+
+
+def create_llm(name: str, temperature: float = 0.2, **options: Any) -> BaseLanguageModel:
+    """
+    Membuat model LLM dari provider terdaftar.
+
+    Args:
+        name: Nama provider ("openai", "ollama", "gemini", atau provider lain yang didaftarkan).
+        temperature: Temperature model.
+        **options: Pengaturan tambahan untuk provider (mis. `model`, `base_url`).
+
+    Returns:
+        Objek model LLM LangChain.
+    """
+    factory = _LLM_PROVIDERS.get(name)
+    if factory is None:
+        raise ValueError(f"Model LLM tidak didukung: {name}")
+    return factory(temperature, **{key: value for key, value in options.items() if value is not None})
+
+
+def _create_openai(temperature: float, model: str = "gpt-3.5-turbo",
+                   base_url: Optional[str] = None) -> BaseLanguageModel:
+    openai_api_key = os.getenv("OPENAI_API_KEY")
+    if not openai_api_key:
+        raise ValueError("OPENAI_API_KEY harus diatur di environment variables.")
+    from langchain_openai import ChatOpenAI
+
+    logger.debug("Menggunakan model OpenAI (%s)", model)
+    return ChatOpenAI(
+        model_name=model,
+        temperature=temperature,
+        openai_api_key=openai_api_key,
+        base_url=base_url,
+    )
+
+
+def _create_ollama(temperature: float, model: str = "llama3.2:latest",
+                   base_url: Optional[str] = None) -> BaseLanguageModel:
+    base_url_option = {"base_url": base_url} if base_url else {}
+    try:
+        # OllamaLLM memakai satu client HTTP per instance, jadi koneksi dipakai ulang antar permintaan
+        from langchain_ollama import OllamaLLM
+    except ImportError:
+        from langchain_community.llms import Ollama
+
+        logger.debug("langchain_ollama tidak tersedia, memakai Ollama dari langchain_community (%s)", model)
+        return Ollama(model=model, temperature=temperature, **base_url_option)
+    logger.debug("Menggunakan model Ollama (%s)", model)
+    return OllamaLLM(model=model, temperature=temperature, **base_url_option)
+
+
+def _create_gemini(temperature: float, model: str = "gemini-pro",
+                   base_url: Optional[str] = None) -> BaseLanguageModel:
+    google_api_key = os.getenv("GOOGLE_API_KEY")
+    if not google_api_key:
+        raise ValueError("GOOGLE_API_KEY harus diatur di environment variables.")
+    try:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+    except ImportError:
+        raise ValueError("langchain_google_genai tidak tersedia.")
+    # base_url diteruskan sebagai endpoint API client Google (mis. proxy atau endpoint regional)
+    client_options = {"client_options": {"api_endpoint": base_url}} if base_url else {}
+    logger.debug("Menggunakan model Gemini (%s)", model)
+    return ChatGoogleGenerativeAI(
+        model=model,
+        temperature=temperature,
+        google_api_key=google_api_key,
+        **client_options,
+    )
+
+
+register_llm_provider("openai", _create_openai)
+register_llm_provider("ollama", _create_ollama)
+register_llm_provider("gemini", _create_gemini)
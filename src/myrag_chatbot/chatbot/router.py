@@ -0,0 +1,416 @@
+# src/myrag_chatbot/chatbot/router.py
+import asyncio
+import logging
+import queue
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Deque, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from myrag_chatbot.chatbot.llm_providers import create_llm
+from myrag_chatbot.metrics.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class LLMBackendConfig:
+    """
+    Satu backend LLM untuk router.
+
+    Attributes:
+        name: Nama unik backend (dipakai di log dan metrik).
+        provider: Provider terdaftar ("ollama", "openai", "gemini", ...).
+        model: Nama model; None memakai default provider.
+        base_url: Alamat server (mis. host Ollama lain atau endpoint OpenAI-compatible).
+        options: Pengaturan tambahan untuk factory provider, sebagai pasangan (kunci, nilai).
+    """
+    name: str
+    provider: str
+    model: Optional[str] = None
+    base_url: Optional[str] = None
+    options: Tuple[Tuple[str, Any], ...] = ()
+
+
+class BackendStats:
+    """Statistik bergulir satu backend: latensi token pertama, error, dan permintaan aktif."""
+
+    def __init__(self, window: int = 50, failure_threshold: int = 3, cooldown_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self.in_flight = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+
+    def started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def record_latency(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._outcomes.append(True)
+            self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._outcomes.append(False)
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold:
+                # Circuit breaker: backend dilewati sementara setelah gagal berturut-turut
+                self.cooldown_until = time.monotonic() + self.cooldown_seconds
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    @property
+    def error_rate(self) -> float:
+        with self._lock:
+            if not self._outcomes:
+                return 0.0
+            return self._outcomes.count(False) / len(self._outcomes)
+
+    @property
+    def median_latency(self) -> Optional[float]:
+        with self._lock:
+            return statistics.median(self._latencies) if self._latencies else None
+
+    def score(self, prior_latency: float, failure_penalty: float) -> float:
+        """
+        Perkiraan waktu tunggu dalam detik; lebih kecil lebih baik.
+
+        Args:
+            prior_latency: Latensi yang dipakai jika backend belum punya sampel TTFT
+                (mis. backend baru, atau backend yang selalu gagal sebelum token pertama).
+            failure_penalty: Waktu yang dianggap terbuang per kegagalan sebelum failover.
+        """
+        latency = self.median_latency
+        if latency is None:
+            latency = prior_latency
+        # Permintaan yang sedang berjalan membuat backend yang jenuh kalah dari backend lain;
+        # error ditambahkan terpisah supaya tetap berpengaruh walau latensinya kecil
+        return latency * (1 + self.in_flight) + self.error_rate * failure_penalty
+
+    def snapshot(self) -> dict:
+        return {
+            "median_latency": self.median_latency,
+            "error_rate": self.error_rate,
+            "in_flight": self.in_flight,
+            "healthy": self.healthy,
+        }
+
+
+class RoutedBackend:
+    def __init__(self, name: str, llm: Runnable, stats: BackendStats):
+        self.name = name
+        self.llm = llm
+        self.stats = stats
+
+
+class _Attempt:
+    __slots__ = ("backend", "start", "cancel", "task", "first_chunk_at")
+
+    def __init__(self, backend: RoutedBackend):
+        self.backend = backend
+        self.start = time.perf_counter()
+        self.cancel = threading.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.first_chunk_at: Optional[float] = None
+
+
+class LLMRouter(Runnable):
+    """
+    Runnable yang meneruskan setiap permintaan ke backend LLM tercepat yang sehat.
+
+    Backend diurutkan berdasarkan median waktu token pertama (TTFT) bergulir, jumlah
+    permintaan aktif, dan tingkat error. Jika backend pertama belum menghasilkan token
+    setelah `ttft_timeout` detik, permintaan yang sama dikirim juga ke backend berikutnya
+    (hedging) dan backend yang lebih dulu menghasilkan token yang dipakai. Jika backend
+    gagal sebelum token pertama, permintaan dialihkan ke backend berikutnya (failover).
+
+    Objek LLM setiap backend dibuat sekali dan dipakai ulang, sehingga koneksi HTTP
+    ke masing-masing server tetap terbuka antar permintaan.
+    """
+
+    def __init__(
+        self,
+        backends: Sequence[Tuple[str, Runnable]],
+        ttft_timeout: Optional[float] = 2.0,
+        hedge: bool = True,
+        window: int = 50,
+        failure_threshold: int = 3,
+        cooldown_seconds: float = 30.0,
+        default_latency: float = 1.0,
+        max_error_rate: float = 0.5,
+    ):
+        """
+        Args:
+            backends: Pasangan (nama, model LangChain) dalam urutan preferensi awal.
+            ttft_timeout: Batas waktu token pertama sebelum hedging; None menonaktifkan hedging.
+            hedge: Jika False, backend berikutnya hanya dipakai saat backend sebelumnya gagal.
+            window: Jumlah permintaan terakhir yang dipakai untuk statistik.
+            failure_threshold: Jumlah kegagalan berturut-turut sebelum backend diistirahatkan.
+            cooldown_seconds: Lama backend diistirahatkan.
+            default_latency: Perkiraan TTFT (detik) untuk backend tanpa sampel jika belum ada
+                backend lain yang punya sampel.
+            max_error_rate: Backend dengan tingkat error di atas batas ini diurutkan setelah
+                backend lain yang sehat.
+        """
+        if not backends:
+            raise ValueError("LLMRouter membutuhkan minimal satu backend.")
+        self.backends = [
+            RoutedBackend(name, llm, BackendStats(window, failure_threshold, cooldown_seconds))
+            for name, llm in backends
+        ]
+        self.ttft_timeout = ttft_timeout
+        self.hedge = hedge
+        self.default_latency = default_latency
+        self.max_error_rate = max_error_rate
+
+    @classmethod
+    def from_configs(cls, configs: Sequence[LLMBackendConfig], temperature: float = 0.2,
+                     **kwargs: Any) -> "LLMRouter":
+        """Membuat router dari konfigurasi backend; setiap LLM dibuat lewat registry provider."""
+        backends = [
+            (config.name, create_llm(config.provider, temperature, model=config.model,
+                                     base_url=config.base_url, **dict(config.options)))
+            for config in configs
+        ]
+        return cls(backends, **kwargs)
+
+    def _prior_latency(self) -> float:
+        # Backend tanpa sampel dianggap setara dengan median backend lain, bukan 0 detik
+        medians = [backend.stats.median_latency for backend in self.backends]
+        known = [latency for latency in medians if latency is not None]
+        return statistics.median(known) if known else self.default_latency
+
+    def ranked_backends(self) -> List[RoutedBackend]:
+        """
+        Backend sehat diurutkan dari skor terbaik, lalu backend dengan tingkat error tinggi,
+        lalu backend yang sedang diistirahatkan.
+        """
+        order = {id(backend): index for index, backend in enumerate(self.backends)}
+        prior = self._prior_latency()
+        penalty = max(prior, self.ttft_timeout or 0.0)
+        healthy = [backend for backend in self.backends if backend.stats.healthy]
+        resting = [backend for backend in self.backends if not backend.stats.healthy]
+        scores = {id(backend): backend.stats.score(prior, penalty) for backend in healthy}
+        healthy.sort(key=lambda backend: (backend.stats.error_rate > self.max_error_rate,
+                                          scores[id(backend)], order[id(backend)]))
+        resting.sort(key=lambda backend: backend.stats.cooldown_until)
+        return healthy + resting
+
+    def stats(self) -> dict:
+        return {backend.name: backend.stats.snapshot() for backend in self.backends}
+
+    def _hedge_delay(self) -> Optional[float]:
+        return self.ttft_timeout if self.hedge else None
+
+    @staticmethod
+    def _record_first_chunk(attempt: _Attempt) -> None:
+        attempt.first_chunk_at = time.perf_counter()
+        ttft = attempt.first_chunk_at - attempt.start
+        attempt.backend.stats.record_latency(ttft)
+        get_metrics().observe("myrag_llm_ttft_seconds", ttft, model=attempt.backend.name)
+
+    @staticmethod
+    def _record_result(attempt: _Attempt, result: str) -> None:
+        if result == "success":
+            attempt.backend.stats.record_success()
+        else:
+            attempt.backend.stats.record_failure()
+        get_metrics().inc("myrag_llm_backend_requests_total", backend=attempt.backend.name, result=result)
+
+    def _penalize_slow(self, attempts: List[_Attempt]) -> None:
+        # Backend yang melewati batas TTFT dicatat lambat agar skornya naik
+        for attempt in attempts:
+            attempt.backend.stats.record_latency(time.perf_counter() - attempt.start)
+        get_metrics().inc("myrag_llm_hedges_total")
+
+    def _on_event(self, race: "_Race", attempt: _Attempt, kind: str, payload: Any) -> str:
+        """
+        Memproses satu event dari sebuah percobaan.
+
+        Returns:
+            "yield" jika `payload` adalah potongan jawaban untuk pemanggil, "done" jika selesai,
+            atau "continue". Exception backend pemenang (atau semua backend gagal) diteruskan.
+        """
+        if attempt not in race.active:
+            return "continue"
+        if race.winner is None:
+            if kind == "error":
+                race.active.remove(attempt)
+                self._record_result(attempt, "error")
+                logger.warning("Backend LLM %s gagal: %s", attempt.backend.name, payload)
+                # Failover: coba backend berikutnya jika tidak ada percobaan lain yang berjalan
+                if not race.active and not race.launch():
+                    raise payload
+                return "continue"
+            race.winner = attempt
+            for other in race.active:
+                if other is not attempt:
+                    race.cancel(other)
+            race.active[:] = [attempt]
+            self._record_first_chunk(attempt)
+        if kind == "chunk":
+            return "yield"
+        if kind == "done":
+            self._record_result(attempt, "success")
+            return "done"
+        self._record_result(attempt, "error")
+        raise payload
+
+    def _on_ttft_timeout(self, race: "_Race") -> None:
+        waiting = list(race.active)
+        if race.launch():
+            self._penalize_slow(waiting)
+            logger.debug("TTFT melewati %.2fs, hedging ke backend berikutnya", self.ttft_timeout)
+        else:
+            race.can_hedge = False
+
+    def _next_timeout(self, race: "_Race") -> Optional[float]:
+        delay = self._hedge_delay()
+        if race.winner is not None or delay is None or not race.can_hedge:
+            return None
+        return max(0.0, race.active[-1].start + delay - time.perf_counter())
+
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[Any]:
+        events: "queue.Queue[Tuple[_Attempt, str, Any]]" = queue.Queue()
+
+        def _run(attempt: _Attempt) -> None:
+            iterator = None
+            try:
+                # Backend bisa gagal saat stream dibuat; kegagalan itu juga harus memicu failover
+                iterator = attempt.backend.llm.stream(input, config, **kwargs)
+                for chunk in iterator:
+                    if attempt.cancel.is_set():
+                        break
+                    events.put((attempt, "chunk", chunk))
+                else:
+                    events.put((attempt, "done", None))
+            except Exception as e:
+                events.put((attempt, "error", e))
+            finally:
+                close = getattr(iterator, "close", None)
+                if close is not None:
+                    close()
+                attempt.backend.stats.finished()
+
+        def _start(attempt: _Attempt) -> None:
+            threading.Thread(target=_run, args=(attempt,), name=f"llm-{attempt.backend.name}",
+                             daemon=True).start()
+
+        race = _Race(self.ranked_backends(), _start, lambda attempt: attempt.cancel.set())
+        race.launch()
+        try:
+            while True:
+                try:
+                    attempt, kind, payload = events.get(timeout=self._next_timeout(race))
+                except queue.Empty:
+                    self._on_ttft_timeout(race)
+                    continue
+                action = self._on_event(race, attempt, kind, payload)
+                if action == "yield":
+                    yield payload
+                elif action == "done":
+                    return
+        finally:
+            race.cancel_all()
+
+    async def astream(self, input: Any, config: Optional[RunnableConfig] = None,
+                      **kwargs: Any) -> AsyncIterator[Any]:
+        events: "asyncio.Queue[Tuple[_Attempt, str, Any]]" = asyncio.Queue()
+
+        async def _run(attempt: _Attempt) -> None:
+            try:
+                async for chunk in attempt.backend.llm.astream(input, config, **kwargs):
+                    await events.put((attempt, "chunk", chunk))
+                await events.put((attempt, "done", None))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await events.put((attempt, "error", e))
+            finally:
+                attempt.backend.stats.finished()
+
+        def _start(attempt: _Attempt) -> None:
+            attempt.task = asyncio.ensure_future(_run(attempt))
+
+        def _cancel(attempt: _Attempt) -> None:
+            # Task yang dibatalkan ikut menutup stream HTTP backend yang kalah
+            if attempt.task is not None and not attempt.task.done():
+                attempt.task.cancel()
+
+        race = _Race(self.ranked_backends(), _start, _cancel)
+        race.launch()
+        try:
+            while True:
+                try:
+                    attempt, kind, payload = await asyncio.wait_for(events.get(), self._next_timeout(race))
+                except asyncio.TimeoutError:
+                    self._on_ttft_timeout(race)
+                    continue
+                action = self._on_event(race, attempt, kind, payload)
+                if action == "yield":
+                    yield payload
+                elif action == "done":
+                    return
+        finally:
+            race.cancel_all()
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        # Selalu lewat stream agar TTFT terukur dan hedging berlaku juga untuk invoke
+        output = None
+        for chunk in self.stream(input, config, **kwargs):
+            output = chunk if output is None else output + chunk
+        return output if output is not None else ""
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        output = None
+        async for chunk in self.astream(input, config, **kwargs):
+            output = chunk if output is None else output + chunk
+        return output if output is not None else ""
+
+
+class _Race:
+    """Status satu permintaan yang mungkin berjalan di beberapa backend sekaligus."""
+
+    def __init__(self, ranked: List[RoutedBackend], start: Callable[[_Attempt], None],
+                 cancel: Callable[[_Attempt], None]):
+        self._candidates = iter(ranked)
+        self._start = start
+        self.cancel = cancel
+        self.active: List[_Attempt] = []
+        self.winner: Optional[_Attempt] = None
+        self.can_hedge = True
+
+    def launch(self) -> bool:
+        """Memulai percobaan di backend berikutnya; False jika backend sudah habis."""
+        backend = next(self._candidates, None)
+        if backend is None:
+            return False
+        logger.debug("Mengirim permintaan ke backend LLM %s", backend.name)
+        attempt = _Attempt(backend)
+        backend.stats.started()
+        self.active.append(attempt)
+        self._start(attempt)
+        return True
+
+    def cancel_all(self) -> None:
+        for attempt in self.active:
+            self.cancel(attempt)
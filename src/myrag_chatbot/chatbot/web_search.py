@@ -0,0 +1,223 @@
+# src/myrag_chatbot/chatbot/web_search.py
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Optional, Protocol
+
+from myrag_chatbot.chatbot.answer_cache import normalize_question
+from myrag_chatbot.metrics.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SearchBackend(Protocol):
+    def search(self, query: str) -> Any:
+        """Mengembalikan hasil pencarian (mis. list dict {"url", "content"})."""
+
+
+class TavilySearchBackend:
+    """Backend pencarian Tavily; paket Tavily baru diimpor saat backend dibuat."""
+
+    def __init__(self, api_key: str, max_results: int = 3):
+        from langchain_community.tools.tavily_search import TavilySearchResults
+
+        self.tool = TavilySearchResults(max_results=max_results, api_key=api_key)
+
+    def search(self, query: str) -> Any:
+        return self.tool.invoke(query)
+
+
+class StubSearchBackend:
+    """
+    Backend pencarian lokal untuk pengujian offline.
+
+    Args:
+        results: Hasil tetap per query yang dinormalisasi; query lain mendapat hasil sintetis.
+        delay: Latensi buatan per pencarian (detik).
+        fail: Jika True, setiap pencarian melempar RuntimeError.
+    """
+
+    def __init__(self, results: Optional[Dict[str, Any]] = None, delay: float = 0.0, fail: bool = False):
+        self.results = {normalize_question(query): value for query, value in (results or {}).items()}
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def search(self, query: str) -> Any:
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("Stub search gagal")
+        key = normalize_question(query)
+        if key in self.results:
+            return self.results[key]
+        return [{"url": f"https://example.com/search?q={key.replace(' ', '+')}",
+                 "content": f"Hasil pencarian tiruan untuk: {query}"}]
+
+
+class CachedWebSearch:
+    """
+    Pencarian internet dengan cache TTL dan batas waktu per permintaan.
+
+    Kunci cache adalah query yang dinormalisasi. Jika pencarian melewati `deadline_seconds`,
+    pemanggil langsung mendapat None (jawaban lanjut dengan konteks RAG saja), sementara
+    pencarian tetap berjalan di thread latar dan hasilnya mengisi cache untuk permintaan
+    berikutnya. Query yang sama yang sedang dicari tidak dikirim ulang ke backend.
+    """
+
+    def __init__(
+        self,
+        backend: SearchBackend,
+        ttl_seconds: float = 900.0,
+        deadline_seconds: Optional[float] = 3.0,
+        max_entries: int = 512,
+        max_workers: int = 4,
+    ):
+        """
+        Args:
+            backend: Objek dengan method `search(query)`.
+            ttl_seconds: Umur maksimum hasil di cache.
+            deadline_seconds: Waktu tunggu maksimum per permintaan; None berarti tanpa batas.
+            max_entries: Jumlah maksimum query di cache (LRU).
+            max_workers: Jumlah pencarian yang boleh berjalan bersamaan.
+        """
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.deadline_seconds = deadline_seconds
+        self.max_entries = max_entries
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="web-search")
+        # RLock: callback future yang sudah selesai dijalankan langsung saat didaftarkan (lock masih dipegang)
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, results)
+        self._in_flight: Dict[str, Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def _cached(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def _store(self, key: str, future: Future) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if future.cancelled() or future.exception() is not None or not future.result():
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, future.result())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _lookup_or_submit(self, query: str) -> tuple:
+        """Mengembalikan (hasil cache, None) atau (None, future pencarian yang berjalan)."""
+        key = normalize_question(query)
+        cached = self._cached(key)
+        metrics = get_metrics()
+        if cached is not None:
+            self.hits += 1
+            metrics.inc("myrag_cache_requests_total", cache="web", result="hit")
+            return cached, None
+        self.misses += 1
+        metrics.inc("myrag_cache_requests_total", cache="web", result="miss")
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is None:
+                future = self._executor.submit(self.backend.search, query)
+                self._in_flight[key] = future
+                future.add_done_callback(lambda done, key=key: self._store(key, done))
+        return None, future
+
+    def _on_timeout(self, query: str) -> None:
+        self.timeouts += 1
+        get_metrics().inc("myrag_web_search_timeouts_total")
+        logger.warning("Pencarian internet melewati batas %.1fs, jawaban memakai dokumen saja: %s",
+                       self.deadline_seconds, query)
+
+    def _on_error(self, error: BaseException) -> None:
+        self.errors += 1
+        get_metrics().inc("myrag_errors_total", stage="web_search")
+        logger.error("Error saat pencarian internet: %s", error)
+
+    def search(self, query: str) -> Optional[Any]:
+        """Hasil pencarian dari cache atau backend; None jika gagal atau melewati batas waktu."""
+        cached, future = self._lookup_or_submit(query)
+        if future is None:
+            return cached
+        try:
+            return future.result(timeout=self.deadline_seconds)
+        except FutureTimeoutError:
+            self._on_timeout(query)
+        except Exception as e:
+            self._on_error(e)
+        return None
+
+    async def asearch(self, query: str) -> Optional[Any]:
+        """Versi async dari `search`; event loop tidak diblokir selama menunggu."""
+        cached, future = self._lookup_or_submit(query)
+        if future is None:
+            return cached
+        try:
+            # shield: batas waktu hanya menghentikan penantian, bukan pencariannya
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.deadline_seconds)
+        except asyncio.TimeoutError:
+            self._on_timeout(query)
+        except Exception as e:
+            self._on_error(e)
+        return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            entries = len(self._entries)
+        return {"entries": entries, "hits": self.hits, "misses": self.misses,
+                "timeouts": self.timeouts, "errors": self.errors}
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_web_search(
+    backend: str = "tavily",
+    ttl_seconds: float = 900.0,
+    deadline_seconds: Optional[float] = 3.0,
+) -> Optional[CachedWebSearch]:
+    """
+    Membuat pencarian internet ber-cache.
+
+    Args:
+        backend: "tavily" (butuh TAVILY_API_KEY) atau "stub" (lokal, untuk pengujian).
+        ttl_seconds: Umur hasil di cache.
+        deadline_seconds: Batas waktu per permintaan.
+
+    Returns:
+        CachedWebSearch, atau None jika backend Tavily tidak bisa dipakai.
+    """
+    if backend == "stub":
+        search_backend: SearchBackend = StubSearchBackend()
+    elif backend == "tavily":
+        tavily_api_key = os.getenv("TAVILY_API_KEY")
+        if not tavily_api_key:
+            logger.warning("TAVILY_API_KEY tidak ditemukan. Pencarian internet dinonaktifkan.")
+            return None
+        search_backend = TavilySearchBackend(api_key=tavily_api_key)
+    else:
+        raise ValueError(f"Backend pencarian internet tidak didukung: {backend}")
+    logger.debug("Pencarian internet (%s) diaktifkan.", backend)
+    return CachedWebSearch(search_backend, ttl_seconds=ttl_seconds, deadline_seconds=deadline_seconds)
@@ -0,0 +1,200 @@
+# src/myrag_chatbot/embedder/batcher.py
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from myrag_chatbot.metrics.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class _QueryRequest:
+    __slots__ = ("text", "future")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.future: "Future[List[float]]" = Future()
+
+
+class MicroBatchingEmbeddings(Embeddings):
+    """
+    Pembungkus Embeddings yang menggabungkan `embed_query` dari banyak sesi menjadi satu batch.
+
+    Setiap pemanggil mendapat Future miliknya sendiri. Thread dispatcher mengumpulkan
+    permintaan paling lama `max_wait_seconds` sejak permintaan pertama (atau sampai
+    `max_batch_size`), lalu mengirim satu panggilan `embed_documents` ke provider. Jika
+    `max_in_flight` batch sudah berjalan, permintaan baru terus dikumpulkan sehingga batch
+    berikutnya otomatis lebih besar saat server sibuk.
+
+    Hanya cocok untuk provider yang embedding query dan dokumennya sama (Ollama, OpenAI).
+    `embed_documents` diteruskan langsung karena sudah berupa batch.
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        max_batch_size: int = 32,
+        max_wait_seconds: float = 0.005,
+        max_in_flight: int = 2,
+    ):
+        """
+        Args:
+            underlying: Objek Embeddings asli.
+            max_batch_size: Jumlah maksimum pertanyaan per panggilan ke provider.
+            max_wait_seconds: Waktu tunggu maksimum untuk mengisi batch.
+            max_in_flight: Jumlah batch yang boleh dikirim ke provider bersamaan.
+        """
+        self.underlying = underlying
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.max_in_flight = max_in_flight
+        self.batches = 0
+        self.queries = 0
+        self._queue: "queue.Queue[Optional[_QueryRequest]]" = queue.Queue()
+        self._slots = threading.Semaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _ensure_started(self) -> None:
+        # Thread dibuat saat query pertama, bukan saat objek dibuat (aman untuk process pool ingestion)
+        if self._dispatcher is not None:
+            return
+        with self._lock:
+            if self._dispatcher is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight,
+                                                    thread_name_prefix="embedding-batch")
+                self._dispatcher = threading.Thread(target=self._run, name="embedding-dispatcher", daemon=True)
+                self._dispatcher.start()
+
+    def _collect(self, first: _QueryRequest) -> List[Optional[_QueryRequest]]:
+        batch: List[Optional[_QueryRequest]] = [first]
+        deadline = time.monotonic() + self.max_wait_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            if item is None:
+                break
+        return batch
+
+    def _run(self) -> None:
+        executor = self._executor
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+            stop = batch[-1] is None
+            requests = [request for request in batch if request is not None]
+            self._slots.acquire()
+            # Selama menunggu slot, permintaan lain mungkin masuk; ikutkan selama batch belum penuh
+            while not stop and len(requests) < self.max_batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                else:
+                    requests.append(item)
+            executor.submit(self._dispatch, requests)
+            if stop:
+                return
+
+    def _dispatch(self, requests: List[_QueryRequest]) -> None:
+        try:
+            # Teks yang sama di satu batch hanya dikirim sekali
+            positions: Dict[str, int] = {}
+            for request in requests:
+                positions.setdefault(request.text, len(positions))
+            metrics = get_metrics()
+            with metrics.span("embedding", kind="query_batch"):
+                vectors = self.underlying.embed_documents(list(positions))
+            with self._lock:
+                self.batches += 1
+                self.queries += len(requests)
+            metrics.inc("myrag_embedding_batches_total")
+            metrics.inc("myrag_embedding_batched_queries_total", len(requests))
+            for request in requests:
+                request.future.set_result(vectors[positions[request.text]])
+        except Exception as e:
+            logger.error("Batch embedding query gagal (%d permintaan): %s", len(requests), e)
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(e)
+        finally:
+            self._slots.release()
+
+    def submit_query(self, text: str) -> "Future[List[float]]":
+        """Mengantrekan satu pertanyaan dan mengembalikan Future berisi vektornya."""
+        self._ensure_started()
+        request = _QueryRequest(text)
+        self._queue.put(request)
+        return request.future
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.submit_query(text).result()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await asyncio.wrap_future(self.submit_query(text))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.underlying.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.underlying.aembed_documents(texts)
+
+    def stats(self) -> Dict[str, float]:
+        """Jumlah batch, jumlah pertanyaan, dan rata-rata ukuran batch."""
+        with self._lock:
+            batches, queries = self.batches, self.queries
+        return {
+            "batches": batches,
+            "queries": queries,
+            "mean_batch_size": queries / batches if batches else 0.0,
+        }
+
+    def close(self) -> None:
+        """Menghentikan dispatcher setelah permintaan yang sudah antre dikirim."""
+        with self._lock:
+            dispatcher, executor = self._dispatcher, self._executor
+        if dispatcher is not None:
+            # Sentinel di belakang antrean: dispatcher mengirim semua permintaan sebelumnya dulu,
+            # dan executor baru dilepas setelah dispatcher berhenti
+            self._queue.put(None)
+            dispatcher.join()
+        if executor is not None:
+            executor.shutdown(wait=True)
+        with self._lock:
+            if self._dispatcher is dispatcher:
+                self._dispatcher = None
+                self._executor = None
+        if not self._queue.empty():
+            # Permintaan yang masuk setelah sentinel dilayani dispatcher baru
+            self._ensure_started()
+
+
+if __name__ == '__main__':
+    from concurrent.futures import ThreadPoolExecutor as _Pool
+
+    from myrag_chatbot.benchmark.fakes import HashEmbeddings
+
+    provider = HashEmbeddings(delay_per_call=0.02)
+    batcher = MicroBatchingEmbeddings(provider, max_batch_size=16, max_wait_seconds=0.005)
+    questions = [f"Pertanyaan nomor {i}" for i in range(200)]
+    start = time.perf_counter()
+    with _Pool(max_workers=32) as pool:
+        vectors = list(pool.map(batcher.embed_query, questions))
+    print(f"{len(vectors)} query dalam {time.perf_counter() - start:.2f}s, "
+          f"{provider.calls} panggilan provider, {batcher.stats()}")
+    batcher.close()
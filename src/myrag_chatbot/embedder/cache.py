@@ -0,0 +1,225 @@
+# src/myrag_chatbot/embedder/cache.py
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from myrag_chatbot.metrics.metrics import get_metrics
+
+DOCUMENT_NAMESPACE = "document"
+QUERY_NAMESPACE = "query"
+
+
+def hash_text(text: str) -> str:
+    """Menghasilkan hash SHA-256 dari teks (dipakai sebagai alamat isi)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Pembungkus Embeddings dengan cache berbasis isi (content-addressed).
+
+    Vektor disimpan dengan kunci (provider, nama model, hash teks) di file SQLite lokal,
+    dengan LRU terbatas di memori di atasnya. Teks yang sama tidak pernah dikirim ulang
+    ke provider embedding.
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        provider: str,
+        model_name: str,
+        cache_path: Optional[str] = None,
+        max_memory_items: int = 10000,
+        batch_queries: bool = False,
+    ):
+        """
+        Args:
+            underlying: Objek Embeddings asli (Ollama, OpenAI, Gemini, ...).
+            provider: Nama provider, bagian dari kunci cache.
+            model_name: Nama model embedding, bagian dari kunci cache.
+            cache_path: Path file SQLite untuk cache di disk. None berarti hanya di memori.
+            max_memory_items: Jumlah maksimum vektor di LRU memori.
+            batch_queries: True jika embedding query provider sama dengan embedding dokumen,
+                sehingga `embed_queries` boleh memakai satu panggilan `embed_documents`.
+        """
+        self.underlying = underlying
+        self.provider = provider
+        self.model_name = model_name
+        self.cache_path = cache_path
+        self.max_memory_items = max_memory_items
+        self.batch_queries = batch_queries
+        self.hits = 0
+        self.misses = 0
+
+        self._memory: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if cache_path:
+            directory = os.path.dirname(cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS embeddings (
+                    provider TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    namespace TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (provider, model, namespace, text_hash)
+                )"""
+            )
+            self._conn.commit()
+
+    def _memory_get(self, key: Tuple[str, str]) -> Optional[List[float]]:
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+        return vector
+
+    def _memory_put(self, key: Tuple[str, str], vector: List[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _disk_get_many(self, namespace: str, text_hashes: List[str]) -> Dict[str, List[float]]:
+        if self._conn is None or not text_hashes:
+            return {}
+        found: Dict[str, List[float]] = {}
+        # SQLite membatasi jumlah parameter per query, jadi lookup dilakukan bertahap
+        for start in range(0, len(text_hashes), 500):
+            batch = text_hashes[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT text_hash, vector FROM embeddings "
+                f"WHERE provider = ? AND model = ? AND namespace = ? AND text_hash IN ({placeholders})",
+                (self.provider, self.model_name, namespace, *batch),
+            ).fetchall()
+            for text_hash, blob in rows:
+                found[text_hash] = array("d", blob).tolist()
+        return found
+
+    def _disk_put_many(self, namespace: str, items: Dict[str, List[float]]) -> None:
+        if self._conn is None or not items:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (provider, model, namespace, text_hash, vector) VALUES (?, ?, ?, ?, ?)",
+            [
+                (self.provider, self.model_name, namespace, text_hash, array("d", vector).tobytes())
+                for text_hash, vector in items.items()
+            ],
+        )
+        self._conn.commit()
+
+    def _lookup(self, namespace: str, texts: List[str]) -> Tuple[List[Optional[List[float]]], Dict[str, str]]:
+        """Mencari vektor di cache. Mengembalikan hasil per teks dan teks yang belum ada (hash -> teks)."""
+        hashes = [hash_text(text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}
+        for index, text_hash in enumerate(hashes):
+            vector = self._memory_get((namespace, text_hash))
+            if vector is not None:
+                results[index] = vector
+            else:
+                pending.setdefault(text_hash, []).append(index)
+
+        for text_hash, vector in self._disk_get_many(namespace, list(pending)).items():
+            self._memory_put((namespace, text_hash), vector)
+            for index in pending.pop(text_hash):
+                results[index] = vector
+
+        missing = {text_hash: texts[indexes[0]] for text_hash, indexes in pending.items()}
+        hit_count = sum(1 for vector in results if vector is not None)
+        self.hits += hit_count
+        self.misses += len(texts) - hit_count
+        metrics = get_metrics()
+        if hit_count:
+            metrics.inc("myrag_cache_requests_total", hit_count, cache="embedding", result="hit")
+        if len(texts) > hit_count:
+            metrics.inc("myrag_cache_requests_total", len(texts) - hit_count, cache="embedding", result="miss")
+        return results, missing
+
+    def _store(self, namespace: str, vectors: Dict[str, List[float]]) -> None:
+        for text_hash, vector in vectors.items():
+            self._memory_put((namespace, text_hash), vector)
+        self._disk_put_many(namespace, vectors)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Meng-embed daftar teks, hanya mengirim teks yang belum ada di cache ke provider."""
+        with self._lock:
+            results, missing = self._lookup(DOCUMENT_NAMESPACE, texts)
+        if missing:
+            missing_hashes = list(missing)
+            with get_metrics().span("embedding", kind="document"):
+                new_vectors = self.underlying.embed_documents([missing[h] for h in missing_hashes])
+            computed = dict(zip(missing_hashes, new_vectors))
+            with self._lock:
+                self._store(DOCUMENT_NAMESPACE, computed)
+            for index, text in enumerate(texts):
+                if results[index] is None:
+                    results[index] = computed[hash_text(text)]
+        return results  # type: ignore[return-value]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Meng-embed satu pertanyaan, memakai cache terpisah dari dokumen."""
+        with self._lock:
+            results, missing = self._lookup(QUERY_NAMESPACE, [text])
+        if results[0] is not None:
+            return results[0]
+        with get_metrics().span("embedding", kind="query"):
+            vector = self.underlying.embed_query(text)
+        with self._lock:
+            self._store(QUERY_NAMESPACE, {hash_text(text): vector})
+        return vector
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        Meng-embed banyak pertanyaan sekaligus, hanya mengirim yang belum ada di cache.
+
+        Jika `batch_queries` aktif, pertanyaan yang belum ada dikirim dalam satu panggilan
+        `embed_documents`. Provider yang membedakan embedding query dan dokumen (mis. Gemini)
+        tetap memakai `embed_query` per pertanyaan, supaya cache pertanyaan tidak berisi
+        vektor dokumen.
+        """
+        with self._lock:
+            results, missing = self._lookup(QUERY_NAMESPACE, texts)
+        if missing:
+            missing_hashes = list(missing)
+            missing_texts = [missing[h] for h in missing_hashes]
+            with get_metrics().span("embedding", kind="query"):
+                if self.batch_queries:
+                    new_vectors = self.underlying.embed_documents(missing_texts)
+                else:
+                    new_vectors = [self.underlying.embed_query(text) for text in missing_texts]
+            computed = dict(zip(missing_hashes, new_vectors))
+            with self._lock:
+                self._store(QUERY_NAMESPACE, computed)
+            for index, text in enumerate(texts):
+                if results[index] is None:
+                    results[index] = computed[hash_text(text)]
+        return results  # type: ignore[return-value]
+
+    def stats(self) -> Dict[str, float]:
+        """Statistik cache: jumlah hit, miss, rasio hit, dan jumlah item di memori."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "memory_items": len(self._memory),
+        }
+
+    def close(self) -> None:
+        """Menutup koneksi cache di disk."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,53 +1,121 @@
 from langchain_core.embeddings import Embeddings
-from langchain_openai import OpenAIEmbeddings
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_ollama import OllamaEmbeddings
+from myrag_chatbot.embedder.batcher import MicroBatchingEmbeddings
+from myrag_chatbot.embedder.cache import CachedEmbeddings
 
-from typing import Optional
+from typing import Callable, Dict, Optional, Set
+import logging
 import os
 
-def create_embeddings(embedding_model: str = "openai") -> Embeddings:
+logger = logging.getLogger(__name__)
+
+# Nama model per provider, dipakai juga sebagai bagian kunci cache embedding
+EMBEDDING_MODEL_NAMES = {
+    "openai": "text-embedding-ada-002",
+    "ollama": "llama3.2:latest",
+    "gemini": "models/embedding-001",
+}
+
+# Registry provider embedding. SDK setiap provider baru diimpor di dalam factory-nya,
+# jadi hanya provider yang dipilih yang ikut dimuat saat startup.
+_EMBEDDING_PROVIDERS: Dict[str, Callable[[], Embeddings]] = {}
+# Provider yang embedding query-nya sama dengan embedding dokumen, sehingga query
+# dari banyak sesi boleh digabung menjadi satu panggilan embed_documents
+_BATCHABLE_QUERY_PROVIDERS: Set[str] = set()
+
+def register_embedding_provider(name: str, factory: Callable[[], Embeddings], model_name: str,
+                                batch_queries: bool = False) -> None:
+    """Mendaftarkan provider embedding beserta nama modelnya (untuk kunci cache)."""
+    _EMBEDDING_PROVIDERS[name] = factory
+    EMBEDDING_MODEL_NAMES[name] = model_name
+    if batch_queries:
+        _BATCHABLE_QUERY_PROVIDERS.add(name)
+    else:
+        _BATCHABLE_QUERY_PROVIDERS.discard(name)
+
+def create_embeddings(
+    embedding_model: str = "openai",
+    cache_dir: Optional[str] = None,
+    query_batch_wait: Optional[float] = None,
+    query_batch_size: int = 32,
+) -> Embeddings:
     """
     Membuat model embeddings.
 
     Args:
         embedding_model: Model embedding yang akan digunakan ("openai", "ollama", atau "gemini").
+        cache_dir: Direktori cache embedding di disk. Jika diisi, embeddings dibungkus
+            CachedEmbeddings sehingga teks yang sama tidak di-embed ulang.
+        query_batch_wait: Jika diisi (detik), `embed_query` yang bersamaan digabung menjadi
+            satu batch oleh MicroBatchingEmbeddings (hanya untuk provider yang mendukung).
+        query_batch_size: Ukuran maksimum batch query.
 
     Returns:
         Objek Embeddings yang sesuai.
     """
-    print(f"[DEBUG] Membuat embeddings dengan model: {embedding_model}")
-
-    if embedding_model == "openai":
-        openai_api_key = os.getenv("OPEN_API_KEY")
-        if not openai_api_key:
-            raise ValueError("OPENAI_API_KEY harus diatur di environment variables.")
-        print("[DEBUG] Menggunakan OpenAIEmbeddings")
-        return OpenAIEmbeddings(openai_api_key=openai_api_key)
-
-    elif embedding_model == "ollama":
-        print("[DEBUG] Memanggil OllamaEmbeddings...")
-        try:
-            # Tes langsung koneksi
-            import requests
-            response = requests.get("http://localhost:11434/api/tags")
-            print(f"[DEBUG] Respons manual ke Ollama: {response.status_code} - {response.text}")
-            
-            # Lanjut buat embeddings
-            return OllamaEmbeddings(model="llama3.2:latest")
-        except Exception as e:
-            print(f"[ERROR] Gagal membuat OllamaEmbeddings: {e}")
-            raise
-
-    elif embedding_model == "gemini":
-        google_api_key = os.getenv("GOOGLE_API_KEY")
-        if not google_api_key:
-            raise ValueError("GOOGLE_API_KEY harus diatur di environment variables.")
-        print("[DEBUG] Menggunakan GoogleGenerativeAIEmbeddings")
-        return GoogleGenerativeAIEmbeddings(model="models/embedding-001", api_key=google_api_key)
+    embeddings = _create_provider_embeddings(embedding_model)
+    if query_batch_wait is not None and embedding_model in _BATCHABLE_QUERY_PROVIDERS:
+        # Di bawah cache: query yang sudah pernah di-embed tidak ikut antre
+        logger.debug("Mengaktifkan micro-batching query embedding (%.3fs, maks %d)", query_batch_wait,
+                     query_batch_size)
+        embeddings = MicroBatchingEmbeddings(embeddings, max_batch_size=query_batch_size,
+                                             max_wait_seconds=query_batch_wait)
+    if cache_dir:
+        logger.debug("Mengaktifkan cache embedding di: %s", cache_dir)
+        return CachedEmbeddings(
+            embeddings,
+            provider=embedding_model,
+            model_name=EMBEDDING_MODEL_NAMES[embedding_model],
+            cache_path=os.path.join(cache_dir, "embeddings.sqlite3"),
+            batch_queries=embedding_model in _BATCHABLE_QUERY_PROVIDERS,
+        )
+    return embeddings
 
-    else:
+def _create_provider_embeddings(embedding_model: str) -> Embeddings:
+    logger.debug("Membuat embeddings dengan model: %s", embedding_model)
+    factory = _EMBEDDING_PROVIDERS.get(embedding_model)
+    if factory is None:
         raise ValueError(f"Model embedding tidak didukung: {embedding_model}")
+    return factory()
+
+def _create_openai_embeddings() -> Embeddings:
+    openai_api_key = os.getenv("OPEN_API_KEY")
+    if not openai_api_key:
+        raise ValueError("OPENAI_API_KEY harus diatur di environment variables.")
+    from langchain_openai import OpenAIEmbeddings
+
+    logger.debug("Menggunakan OpenAIEmbeddings")
+    return OpenAIEmbeddings(model=EMBEDDING_MODEL_NAMES["openai"], openai_api_key=openai_api_key)
+
+def _create_ollama_embeddings() -> Embeddings:
+    logger.debug("Memanggil OllamaEmbeddings...")
+    try:
+        # Tes langsung koneksi
+        import requests
+        response = requests.get("http://localhost:11434/api/tags", timeout=5)
+        logger.debug("Respons manual ke Ollama: %s - %s", response.status_code, response.text)
+
+        # Lanjut buat embeddings
+        from langchain_ollama import OllamaEmbeddings
+
+        return OllamaEmbeddings(model=EMBEDDING_MODEL_NAMES["ollama"])
+    except Exception as e:
+        logger.error("Gagal membuat OllamaEmbeddings: %s", e)
+        raise
+
+def _create_gemini_embeddings() -> Embeddings:
+    google_api_key = os.getenv("GOOGLE_API_KEY")
+    if not google_api_key:
+        raise ValueError("GOOGLE_API_KEY harus diatur di environment variables.")
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+    logger.debug("Menggunakan GoogleGenerativeAIEmbeddings")
+    return GoogleGenerativeAIEmbeddings(model=EMBEDDING_MODEL_NAMES["gemini"], api_key=google_api_key)
+
+register_embedding_provider("openai", _create_openai_embeddings, EMBEDDING_MODEL_NAMES["openai"],
+                            batch_queries=True)
+register_embedding_provider("ollama", _create_ollama_embeddings, EMBEDDING_MODEL_NAMES["ollama"],
+                            batch_queries=True)
+register_embedding_provider("gemini", _create_gemini_embeddings, EMBEDDING_MODEL_NAMES["gemini"])
 
 if __name__ == '__main__':
     # Contoh penggunaan
@@ -0,0 +1,359 @@
+# src/myrag_chatbot/ingestion/bulk.py
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from langchain_core.vectorstores import VectorStore
+
+from myrag_chatbot.ingestion.ingest import iter_file_chunks, plan_file_sync
+from myrag_chatbot.ingestion.manifest import IngestionManifest, file_sha256
+from myrag_chatbot.metrics.metrics import get_metrics
+from myrag_chatbot.splitter.splitter import Chunk, as_document
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = (".pdf", ".txt")
+
+
+def iter_input_paths(inputs: Iterable[str]) -> Iterator[str]:
+    """
+    Mengembangkan daftar input (file, direktori, atau pola glob) menjadi path file PDF/TXT.
+
+    Direktori ditelusuri secara rekursif. Setiap file hanya dihasilkan sekali.
+    """
+    seen: Set[str] = set()
+
+    def _emit(path: str) -> Iterator[str]:
+        path = os.path.abspath(path)
+        if path not in seen and path.lower().endswith(SUPPORTED_EXTENSIONS):
+            seen.add(path)
+            yield path
+
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, dirs, files in os.walk(item):
+                dirs.sort()
+                for name in sorted(files):
+                    yield from _emit(os.path.join(root, name))
+        elif glob.has_magic(item):
+            for path in sorted(glob.iglob(item, recursive=True)):
+                if os.path.isfile(path):
+                    yield from _emit(path)
+        else:
+            yield from _emit(item)
+
+
+def parse_file(file_path: str, chunk_size: int, chunk_overlap: int,
+               offset_splitter: bool = False) -> Tuple[str, str, List[Chunk]]:
+    """
+    Memuat (halaman demi halaman) dan memecah satu file. Dijalankan di process pool.
+
+    Dengan `offset_splitter`, chunk berupa ChunkRef yang memakai metadata SourceText bersama,
+    sehingga metadata file hanya dikirim sekali dari worker dan Document baru dibuat saat di-embed.
+
+    Returns:
+        Tuple (path file, hash SHA-256 isi file, daftar chunk).
+    """
+    sha256 = file_sha256(file_path)
+    chunks = list(iter_file_chunks(file_path, chunk_size, chunk_overlap, offset_splitter=offset_splitter))
+    return file_path, sha256, chunks
+
+
+def iter_parsed_files(
+    paths: Iterable[str],
+    manifest: IngestionManifest,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 100,
+    workers: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    stats: Optional[Dict[str, float]] = None,
+    offset_splitter: bool = False,
+) -> Iterator[Tuple[str, os.stat_result, str, List[Chunk]]]:
+    """
+    Mem-parsing file secara paralel dan menghasilkan chunk per file sebagai generator.
+
+    File yang ukuran dan mtime-nya tidak berubah dilewati sebelum dikirim ke worker.
+    Jumlah file yang sedang diproses dibatasi `max_pending`, sehingga parsing tidak
+    berjalan jauh di depan proses embedding (backpressure) dan memori tetap terbatas.
+
+    Yields:
+        Tuple (path file, hasil os.stat, hash SHA-256, daftar chunk).
+    """
+    stats = stats if stats is not None else {}
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    max_pending = max_pending or workers * 2
+
+    def _candidates() -> Iterator[Tuple[str, os.stat_result]]:
+        for path in paths:
+            stats["files_seen"] = stats.get("files_seen", 0) + 1
+            stat = os.stat(path)
+            if manifest.is_unchanged(path, stat.st_size, stat.st_mtime):
+                stats["files_skipped"] = stats.get("files_skipped", 0) + 1
+                continue
+            yield path, stat
+
+    if workers <= 1:
+        for path, stat in _candidates():
+            try:
+                _, sha256, chunks = parse_file(path, chunk_size, chunk_overlap, offset_splitter)
+            except Exception as e:
+                logger.error("Gagal memproses %s: %s", path, e)
+                get_metrics().inc("myrag_errors_total", stage="ingest_parse")
+                stats["files_failed"] = stats.get("files_failed", 0) + 1
+                continue
+            yield path, stat, sha256, chunks
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Dict[Future, Tuple[str, os.stat_result]] = {}
+        candidates = _candidates()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_pending:
+                try:
+                    path, stat = next(candidates)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[executor.submit(parse_file, path, chunk_size, chunk_overlap, offset_splitter)] = (path, stat)
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, stat = pending.pop(future)
+                try:
+                    _, sha256, chunks = future.result()
+                except Exception as e:
+                    logger.error("Gagal memproses %s: %s", path, e)
+                    get_metrics().inc("myrag_errors_total", stage="ingest_parse")
+                    stats["files_failed"] = stats.get("files_failed", 0) + 1
+                    continue
+                yield path, stat, sha256, chunks
+
+
+class BatchUpserter:
+    """
+    Mengumpulkan chunk baru dari banyak file dan meng-upsert-nya dalam batch berukuran tetap.
+
+    Sebuah file baru dicatat di manifest setelah semua chunk-nya benar-benar tersimpan,
+    jadi ingestion yang terhenti di tengah jalan akan mengulang file tersebut.
+    """
+
+    def __init__(
+        self,
+        vectorstore: VectorStore,
+        manifest: IngestionManifest,
+        batch_size: int = 64,
+        stats: Optional[Dict[str, float]] = None,
+        on_batch: Optional[Callable[[Dict[str, float]], None]] = None,
+    ):
+        self.vectorstore = vectorstore
+        self.manifest = manifest
+        self.batch_size = batch_size
+        self.stats = stats if stats is not None else {}
+        self.on_batch = on_batch
+        self._docs: List[Chunk] = []
+        self._ids: List[str] = []
+        self._enqueued = 0
+        self._flushed = 0
+        # (jumlah chunk yang harus sudah ter-flush, argumen manifest.record)
+        self._waiting_files: List[Tuple[int, tuple]] = []
+        # Manifest disimpan paling sering setiap `save_interval` detik agar tidak menulis ulang
+        # seluruh file JSON untuk setiap file kecil
+        self.save_interval = 2.0
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    def add_file(self, file_path: str, stat: os.stat_result, sha256: str, chunks: List[Chunk]) -> None:
+        entry = self.manifest.get(file_path)
+        if entry is not None and entry["sha256"] == sha256:
+            # Hanya mtime yang berubah, isi file sama
+            self.manifest.record(file_path, stat.st_size, stat.st_mtime, sha256, entry["chunks"])
+            self.stats["files_unchanged"] = self.stats.get("files_unchanged", 0) + 1
+            self._dirty = True
+            self._save_manifest()
+            return
+
+        unique, new_ids, stale_ids = plan_file_sync(file_path, chunks, self.manifest)
+        if stale_ids:
+            self.vectorstore.delete(ids=stale_ids)
+            self.stats["chunks_deleted"] = self.stats.get("chunks_deleted", 0) + len(stale_ids)
+        for cid in new_ids:
+            self._ids.append(cid)
+            self._docs.append(unique[cid])
+        self._enqueued += len(new_ids)
+        self._waiting_files.append(
+            (self._enqueued, (file_path, stat.st_size, stat.st_mtime, sha256, list(unique)))
+        )
+        self.stats["files_indexed"] = self.stats.get("files_indexed", 0) + 1
+
+        while len(self._docs) >= self.batch_size:
+            self._flush(self.batch_size)
+        self._record_completed_files()
+
+    def _flush(self, count: int) -> None:
+        pending, self._docs = self._docs[:count], self._docs[count:]
+        ids, self._ids = self._ids[:count], self._ids[count:]
+        if not pending:
+            return
+        # ChunkRef baru dijadikan Document di sini, jadi hanya satu batch teks chunk yang ada di memori
+        docs = [as_document(chunk) for chunk in pending]
+        metrics = get_metrics()
+        with metrics.span("ingest_batch"):
+            self.vectorstore.add_documents(docs, ids=ids)
+        metrics.inc("myrag_ingested_chunks_total", len(docs))
+        self._flushed += len(docs)
+        self.stats["chunks_added"] = self.stats.get("chunks_added", 0) + len(docs)
+        self.stats["batches"] = self.stats.get("batches", 0) + 1
+        self._record_completed_files()
+        if self.on_batch is not None:
+            self.on_batch(self.stats)
+
+    def _record_completed_files(self) -> None:
+        while self._waiting_files and self._waiting_files[0][0] <= self._flushed:
+            _, record_args = self._waiting_files.pop(0)
+            self.manifest.record(*record_args)
+            self._dirty = True
+        self._save_manifest()
+
+    def _save_manifest(self, force: bool = False) -> None:
+        if self._dirty and (force or time.monotonic() - self._last_save >= self.save_interval):
+            self.manifest.save()
+            self._dirty = False
+            self._last_save = time.monotonic()
+
+    def close(self) -> None:
+        """Meng-upsert sisa chunk dan mencatat semua file yang tersisa di manifest."""
+        while self._docs:
+            self._flush(self.batch_size)
+        self._record_completed_files()
+        self._save_manifest(force=True)
+
+
+def bulk_ingest(
+    inputs: Iterable[str],
+    vectorstore: VectorStore,
+    manifest: IngestionManifest,
+    batch_size: int = 64,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 100,
+    workers: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    on_progress: Optional[Callable[[Dict[str, float]], None]] = None,
+    offset_splitter: bool = False,
+) -> Dict[str, float]:
+    """
+    Mengindeks banyak file (direktori, glob, atau path) secara paralel dan inkremental.
+
+    Parsing berjalan di process pool, chunk mengalir sebagai generator, dan embedding
+    serta upsert dilakukan per batch `batch_size`. Hanya chunk baru yang di-embed.
+
+    Args:
+        inputs: Daftar file, direktori, atau pola glob.
+        vectorstore: Vectorstore tujuan.
+        manifest: Manifest ingestion.
+        batch_size: Jumlah chunk per batch embedding/upsert.
+        chunk_size: Ukuran chunk.
+        chunk_overlap: Overlap antar chunk.
+        workers: Jumlah proses parser. 1 berarti tanpa process pool.
+        max_pending: Jumlah maksimum file yang sedang di-parsing.
+        on_progress: Callback yang dipanggil dengan statistik setiap batch/file selesai.
+        offset_splitter: Pakai splitter berbasis offset (hemat memori untuk file besar).
+
+    Returns:
+        Statistik ingestion (jumlah file, chunk, batch, durasi, dan throughput).
+    """
+    stats: Dict[str, float] = {
+        "files_seen": 0, "files_skipped": 0, "files_unchanged": 0, "files_indexed": 0,
+        "files_failed": 0, "chunks_added": 0, "chunks_deleted": 0, "batches": 0,
+    }
+    started = time.perf_counter()
+
+    def _report(current: Dict[str, float]) -> None:
+        elapsed = time.perf_counter() - started
+        current["elapsed_seconds"] = elapsed
+        current["chunks_per_second"] = current["chunks_added"] / elapsed if elapsed else 0.0
+        if on_progress is not None:
+            on_progress(current)
+
+    upserter = BatchUpserter(vectorstore, manifest, batch_size=batch_size, stats=stats, on_batch=_report)
+    parsed = iter_parsed_files(
+        iter_input_paths(inputs), manifest,
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap,
+        workers=workers, max_pending=max_pending, stats=stats,
+        offset_splitter=offset_splitter,
+    )
+    for file_path, stat, sha256, chunks in parsed:
+        upserter.add_file(file_path, stat, sha256, chunks)
+        _report(stats)
+    upserter.close()
+    _report(stats)
+    return stats
+
+
+def _print_progress(stats: Dict[str, float]) -> None:
+    sys.stderr.write(
+        f"\r[ingest] file {int(stats['files_seen'])} "
+        f"(diindeks {int(stats['files_indexed'])}, dilewati {int(stats['files_skipped'])}, "
+        f"gagal {int(stats['files_failed'])}) | chunk {int(stats['chunks_added'])} "
+        f"| {stats.get('chunks_per_second', 0.0):.1f} chunk/s"
+    )
+    sys.stderr.flush()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point CLI: `myrag-ingest <file|direktori|glob> ...`."""
+    from myrag_chatbot.registry.registry import EngineConfig, get_registry
+
+    parser = argparse.ArgumentParser(description="Ingestion massal PDF/TXT ke vectorstore.")
+    parser.add_argument("inputs", nargs="+", help="File, direktori, atau pola glob.")
+    parser.add_argument("--persist-directory", default=EngineConfig.persist_directory)
+    parser.add_argument("--embedding-model", default=EngineConfig.embedding_model)
+    parser.add_argument("--vector-backend", default=EngineConfig.vector_backend, choices=["chroma", "numpy"])
+    parser.add_argument("--embedding-cache-dir", default=None)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-pending", type=int, default=None)
+    parser.add_argument("--offset-splitter", action="store_true",
+                        help="Chunk sebagai offset ke teks sumber; teks dibuat saat di-embed.")
+    parser.add_argument("--ivf-lists", type=int, default=None,
+                        help="Bangun partisi IVF setelah ingestion (hanya backend numpy).")
+    parser.add_argument("--verbose", action="store_true", help="Tampilkan log debug.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+
+    config = EngineConfig(
+        embedding_model=args.embedding_model,
+        persist_directory=args.persist_directory,
+        vector_backend=args.vector_backend,
+        embedding_cache_dir=args.embedding_cache_dir,
+    )
+    registry = get_registry()
+    stats = bulk_ingest(
+        args.inputs,
+        registry.vectorstore(config),
+        registry.manifest(config),
+        batch_size=args.batch_size,
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        workers=args.workers,
+        max_pending=args.max_pending,
+        on_progress=_print_progress,
+        offset_splitter=args.offset_splitter,
+    )
+    sys.stderr.write("\n")
+    if args.ivf_lists and args.vector_backend == "numpy":
+        stats["ivf_lists"] = registry.vectorstore(config).build_partitions(n_lists=args.ivf_lists)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == '__main__':
+    main()
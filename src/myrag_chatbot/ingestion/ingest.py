@@ -0,0 +1,225 @@
+# src/myrag_chatbot/ingestion/ingest.py
+import hashlib
+import os
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+from myrag_chatbot.ingestion.manifest import IngestionManifest, file_sha256
+from myrag_chatbot.loaders.loaders import iter_documents
+from myrag_chatbot.metrics.metrics import get_metrics
+from myrag_chatbot.splitter.splitter import (
+    Chunk,
+    ChunkRef,
+    as_document,
+    chunk_text,
+    iter_chunk_refs,
+    split_documents,
+)
+
+BatchCallback = Callable[[Dict[str, int]], None]
+
+
+def chunk_id(file_path: str, content: str) -> str:
+    """ID chunk yang stabil: hash dari path file dan isi chunk."""
+    return hashlib.sha256(f"{os.path.abspath(file_path)}\x00{content}".encode("utf-8")).hexdigest()
+
+
+def _tag_chunk(chunk: Chunk, cid: str) -> None:
+    if isinstance(chunk, ChunkRef):
+        chunk.chunk_id = cid
+    else:
+        chunk.metadata["chunk_id"] = cid
+
+
+def plan_file_sync(
+    file_path: str,
+    chunks: List[Chunk],
+    manifest: IngestionManifest,
+) -> Tuple[Dict[str, Chunk], List[str], List[str]]:
+    """
+    Membandingkan chunk terbaru sebuah file dengan yang tercatat di manifest.
+
+    Chunk boleh berupa Document atau ChunkRef; teks ChunkRef hanya dibuat sementara untuk hashing.
+
+    Returns:
+        Tuple (chunk unik per ID, ID chunk baru, ID chunk lama yang harus dihapus).
+    """
+    unique: Dict[str, Chunk] = {}
+    for chunk in chunks:
+        cid = chunk_id(file_path, chunk_text(chunk))
+        if cid not in unique:
+            _tag_chunk(chunk, cid)
+            unique[cid] = chunk
+
+    entry = manifest.get(file_path)
+    old_ids = set(entry["chunks"]) if entry else set()
+    new_ids = [cid for cid in unique if cid not in old_ids]
+    stale_ids = [cid for cid in old_ids if cid not in unique]
+    return unique, new_ids, stale_ids
+
+
+def iter_file_chunks(
+    file_path: str,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 100,
+    offset_splitter: bool = False,
+    pages: Optional[Dict[str, int]] = None,
+) -> Iterator[Chunk]:
+    """
+    Memuat dan memecah file secara lazy, halaman demi halaman.
+
+    Halaman berikutnya baru dibaca setelah chunk dari halaman sebelumnya diambil, jadi file
+    besar tidak pernah dimuat utuh. Jika `pages` diberikan, dict tersebut diperbarui dengan
+    jumlah halaman yang sudah dibaca ("pages") dan jumlah halaman file ("pages_total", 0 jika
+    loader tidak mengetahuinya).
+    """
+    def _documents() -> Iterator[Document]:
+        for document in iter_documents(file_path):
+            if pages is not None:
+                pages["pages"] = pages.get("pages", 0) + 1
+                pages["pages_total"] = int(document.metadata.get("total_pages", 0))
+            yield document
+
+    if offset_splitter:
+        yield from iter_chunk_refs(_documents(), chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        return
+    for document in _documents():
+        # RecursiveCharacterTextSplitter memecah setiap dokumen secara terpisah,
+        # jadi hasil per halaman sama dengan split_documents atas seluruh file
+        yield from split_documents([document], chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+
+def sync_file_chunks(
+    file_path: str,
+    chunks: Iterable[Chunk],
+    vectorstore: VectorStore,
+    manifest: IngestionManifest,
+    size: int,
+    mtime: float,
+    sha256: str,
+    batch_size: Optional[int] = None,
+    on_batch: Optional[BatchCallback] = None,
+) -> Dict[str, int]:
+    """
+    Menyamakan isi vectorstore dengan chunk terbaru sebuah file.
+
+    Chunk dibaca sebagai stream. Chunk yang sudah ada (ID sama) tidak di-embed ulang,
+    chunk baru di-upsert, dan chunk lama yang tidak ada lagi dihapus dari koleksi
+    setelah stream habis.
+
+    Dengan `batch_size`, chunk baru di-upsert begitu satu batch terkumpul sehingga langsung
+    bisa dicari sebelum seluruh file selesai dibaca; `on_batch` dipanggil setelah setiap
+    batch dengan {"added", "new", "total"}, dihitung dari chunk yang sudah dibaca sejauh ini.
+    File baru dicatat di manifest setelah batch terakhir, jadi ingestion yang terhenti
+    mengulang file tersebut (upsert dengan ID yang sama).
+
+    Returns:
+        Dict berisi jumlah chunk "added", "deleted", dan "total".
+    """
+    entry = manifest.get(file_path)
+    old_ids = set(entry["chunks"]) if entry else set()
+    seen: Dict[str, None] = {}
+    pending: Dict[str, Chunk] = {}
+    added = 0
+    metrics = get_metrics()
+
+    def _flush() -> None:
+        nonlocal added
+        batch_ids = list(pending)
+        with metrics.span("ingest_batch"):
+            vectorstore.add_documents([as_document(pending[cid]) for cid in batch_ids], ids=batch_ids)
+        metrics.inc("myrag_ingested_chunks_total", len(batch_ids))
+        added += len(batch_ids)
+        pending.clear()
+        if on_batch is not None:
+            on_batch({"added": added, "new": added, "total": len(seen)})
+
+    for chunk in chunks:
+        cid = chunk_id(file_path, chunk_text(chunk))
+        if cid in seen:
+            continue
+        seen[cid] = None
+        if cid in old_ids:
+            continue
+        _tag_chunk(chunk, cid)
+        pending[cid] = chunk
+        if batch_size and len(pending) >= batch_size:
+            _flush()
+    if pending:
+        _flush()
+
+    stale_ids = [cid for cid in old_ids if cid not in seen]
+    if stale_ids:
+        vectorstore.delete(ids=stale_ids)
+
+    manifest.record(file_path, size, mtime, sha256, list(seen))
+    manifest.save()
+    return {"added": added, "deleted": len(stale_ids), "total": len(seen)}
+
+
+def ingest_file(
+    file_path: str,
+    vectorstore: VectorStore,
+    manifest: IngestionManifest,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 100,
+    batch_size: Optional[int] = None,
+    on_batch: Optional[BatchCallback] = None,
+    offset_splitter: bool = False,
+) -> Dict[str, object]:
+    """
+    Mengindeks satu file PDF/TXT secara inkremental.
+
+    File yang ukuran dan mtime-nya tidak berubah langsung dilewati tanpa dibaca.
+    Jika isinya sama (hash sama) hanya sidik jari yang diperbarui. Selain itu file
+    dibaca ulang halaman demi halaman, dan hanya chunk baru/berubah yang di-embed,
+    per batch selama file masih dibaca.
+
+    Args:
+        file_path: Path file yang akan diindeks.
+        vectorstore: Vectorstore tujuan (mis. koleksi Chroma).
+        manifest: Manifest ingestion.
+        chunk_size: Ukuran chunk.
+        chunk_overlap: Overlap antar chunk.
+        batch_size: Jumlah chunk per upsert; None berarti semua chunk sekaligus.
+        on_batch: Callback progres setelah setiap batch (lihat `sync_file_chunks`), ditambah
+            "pages" dan "pages_total" (lihat `iter_file_chunks`).
+        offset_splitter: Pakai splitter berbasis offset (hemat memori untuk file besar).
+
+    Returns:
+        Dict berisi "status" ("skipped", "unchanged", atau "indexed") dan jumlah chunk.
+    """
+    stat = os.stat(file_path)
+    if manifest.is_unchanged(file_path, stat.st_size, stat.st_mtime):
+        return {"status": "skipped", "added": 0, "deleted": 0, "total": len(manifest.get(file_path)["chunks"])}
+
+    sha256 = file_sha256(file_path)
+    entry = manifest.get(file_path)
+    if entry is not None and entry["sha256"] == sha256:
+        manifest.record(file_path, stat.st_size, stat.st_mtime, sha256, entry["chunks"])
+        manifest.save()
+        return {"status": "unchanged", "added": 0, "deleted": 0, "total": len(entry["chunks"])}
+
+    pages = {"pages": 0, "pages_total": 0}
+    report = None
+    if on_batch is not None:
+        def report(progress: Dict[str, int]) -> None:
+            on_batch({**progress, **pages})
+
+    chunks = iter_file_chunks(file_path, chunk_size, chunk_overlap, offset_splitter=offset_splitter, pages=pages)
+    counts = sync_file_chunks(file_path, chunks, vectorstore, manifest, stat.st_size, stat.st_mtime, sha256,
+                              batch_size=batch_size, on_batch=report)
+    return {"status": "indexed", **counts}
+
+
+def remove_file(file_path: str, vectorstore: VectorStore, manifest: IngestionManifest) -> int:
+    """Menghapus semua chunk milik file dari vectorstore dan manifest. Mengembalikan jumlah chunk yang dihapus."""
+    entry = manifest.remove(file_path)
+    if not entry:
+        return 0
+    if entry["chunks"]:
+        vectorstore.delete(ids=entry["chunks"])
+    manifest.save()
+    return len(entry["chunks"])
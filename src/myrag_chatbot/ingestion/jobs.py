@@ -0,0 +1,193 @@
+# src/myrag_chatbot/ingestion/jobs.py
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from myrag_chatbot.metrics.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class IngestionJob:
+    """Status satu pekerjaan ingestion; diperbarui oleh worker, dibaca oleh sesi chat."""
+    job_id: str
+    file_path: str
+    options: Dict[str, Any] = field(default_factory=dict)
+    status: str = QUEUED
+    chunks_new: int = 0
+    chunks_added: int = 0
+    chunks_total: int = 0
+    pages_read: int = 0
+    pages_total: int = 0
+    result: Optional[Dict[str, object]] = None
+    error: Optional[str] = None
+    on_done: Optional[Callable[["IngestionJob"], None]] = field(default=None, repr=False)
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    @property
+    def progress(self) -> float:
+        """
+        Perkiraan progres (0.0 - 1.0).
+
+        File dibaca sebagai stream, jadi jumlah chunk baru baru diketahui di akhir; progres
+        dihitung dari halaman yang sudah dibaca. Jika jumlah halaman tidak diketahui (mis. TXT),
+        progres tetap 0.0 sampai pekerjaan selesai.
+        """
+        if self.status == DONE:
+            return 1.0
+        return min(self.pages_read / self.pages_total, 1.0) if self.pages_total else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "file": os.path.basename(self.file_path),
+            "status": self.status,
+            "progress": self.progress,
+            "chunks_added": self.chunks_added,
+            "chunks_new": self.chunks_new,
+            "chunks_total": self.chunks_total,
+            "pages_read": self.pages_read,
+            "pages_total": self.pages_total,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+# run(job, on_batch) menjalankan ingestion dan mengembalikan hasil ingest_file
+JobRunner = Callable[[IngestionJob, Callable[[Dict[str, int]], None]], Dict[str, object]]
+
+
+class IngestionJobQueue:
+    """
+    Antrean ingestion di latar belakang dengan jumlah worker terbatas.
+
+    `submit` langsung mengembalikan IngestionJob; worker menjalankan `runner` dan
+    memperbarui progres setiap kali satu batch chunk tersimpan, sehingga sesi chat
+    tetap bisa bertanya selama file besar diindeks.
+    """
+
+    def __init__(self, runner: JobRunner, max_workers: int = 2, max_queued: int = 100,
+                 keep_finished: int = 100):
+        """
+        Args:
+            runner: Fungsi yang menjalankan satu pekerjaan (mis. registry.ingest_file).
+            max_workers: Jumlah file yang diindeks bersamaan.
+            max_queued: Jumlah maksimum pekerjaan yang menunggu atau berjalan.
+            keep_finished: Jumlah pekerjaan selesai yang statusnya tetap disimpan.
+        """
+        self.runner = runner
+        self.max_queued = max_queued
+        self.keep_finished = keep_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest-job")
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._ids = itertools.count(1)
+
+    def _active_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(len(finished) - self.keep_finished, 0)]:
+            del self._jobs[job_id]
+
+    def submit(self, file_path: str, on_done: Optional[Callable[[IngestionJob], None]] = None,
+               **options: Any) -> IngestionJob:
+        """
+        Mengantrekan file untuk diindeks.
+
+        Args:
+            file_path: File yang akan diindeks.
+            on_done: Dipanggil di thread worker setelah pekerjaan selesai atau gagal
+                (mis. untuk menghapus file unggahan sementara).
+            **options: Diteruskan ke runner (mis. chunk_size).
+
+        Raises:
+            RuntimeError: Jika antrean sudah penuh.
+        """
+        with self._lock:
+            if self._active_count() >= self.max_queued:
+                raise RuntimeError("Antrean ingestion penuh, coba lagi nanti.")
+            job = IngestionJob(job_id=f"job-{next(self._ids)}", file_path=file_path, options=options,
+                               on_done=on_done)
+            self._jobs[job.job_id] = job
+            self._prune()
+        get_metrics().inc("myrag_ingest_jobs_total", status=QUEUED)
+        self._executor.submit(self._run, job)
+        logger.debug("Pekerjaan ingestion %s diantrekan: %s", job.job_id, file_path)
+        return job
+
+    def _on_batch(self, job: IngestionJob, progress: Dict[str, int]) -> None:
+        job.chunks_added = progress["added"]
+        job.chunks_new = progress["new"]
+        job.chunks_total = progress["total"]
+        job.pages_read = progress.get("pages", job.pages_read)
+        job.pages_total = progress.get("pages_total", job.pages_total)
+
+    def _run(self, job: IngestionJob) -> None:
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            result = self.runner(job, lambda progress: self._on_batch(job, progress))
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+            logger.error("Pekerjaan ingestion %s gagal: %s", job.job_id, e)
+        else:
+            job.result = result
+            job.chunks_added = int(result.get("added", 0))
+            job.chunks_total = int(result.get("total", 0))
+            job.status = DONE
+        finally:
+            job.finished_at = time.time()
+            get_metrics().inc("myrag_ingest_jobs_total", status=job.status)
+            if job.on_done is not None:
+                try:
+                    job.on_done(job)
+                except Exception as e:
+                    logger.error("Callback pekerjaan ingestion %s gagal: %s", job.job_id, e)
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[IngestionJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+if __name__ == '__main__':
+    def _fake_runner(job: IngestionJob, on_batch: Callable[[Dict[str, int]], None]) -> Dict[str, object]:
+        for added in range(10, 60, 10):
+            time.sleep(0.05)
+            on_batch({"added": added, "new": added, "total": added, "pages": added // 10, "pages_total": 5})
+        return {"status": "indexed", "added": 50, "deleted": 0, "total": 50}
+
+    jobs = IngestionJobQueue(_fake_runner, max_workers=2)
+    submitted = [jobs.submit(f"dokumen_{i}.pdf") for i in range(3)]
+    while not all(job.finished for job in submitted):
+        print([f"{job.job_id}:{job.status}:{job.progress:.0%}" for job in submitted])
+        time.sleep(0.1)
+    print([job.snapshot()["status"] for job in submitted])
+    jobs.shutdown()
@@ -0,0 +1,78 @@
+# src/myrag_chatbot/ingestion/manifest.py
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+MANIFEST_VERSION = 1
+
+
+def file_sha256(file_path: str, block_size: int = 1 << 20) -> str:
+    """Menghitung hash SHA-256 isi file secara bertahap (tanpa memuat seluruh file)."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestionManifest:
+    """
+    Catatan file yang sudah diindeks ke vectorstore.
+
+    Untuk setiap file disimpan sidik jari (ukuran, mtime, hash isi) dan daftar
+    ID chunk yang ada di koleksi, sehingga file yang tidak berubah bisa dilewati
+    dan file yang berubah hanya meng-upsert chunk yang baru.
+    """
+
+    def __init__(self, manifest_path: str):
+        self.manifest_path = manifest_path
+        self._lock = threading.RLock()
+        self._files: Dict[str, dict] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.manifest_path):
+            return
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == MANIFEST_VERSION:
+            self._files = data.get("files", {})
+
+    def save(self) -> None:
+        """Menyimpan manifest secara atomik (tulis ke file sementara lalu rename)."""
+        with self._lock:
+            directory = os.path.dirname(self.manifest_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.manifest_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "files": self._files}, f)
+            os.replace(tmp_path, self.manifest_path)
+
+    def get(self, file_path: str) -> Optional[dict]:
+        with self._lock:
+            return self._files.get(os.path.abspath(file_path))
+
+    def is_unchanged(self, file_path: str, size: int, mtime: float) -> bool:
+        """True jika ukuran dan mtime file sama dengan yang tercatat."""
+        entry = self.get(file_path)
+        return entry is not None and entry["size"] == size and entry["mtime"] == mtime
+
+    def record(self, file_path: str, size: int, mtime: float, sha256: str, chunk_ids: List[str]) -> None:
+        with self._lock:
+            self._files[os.path.abspath(file_path)] = {
+                "size": size,
+                "mtime": mtime,
+                "sha256": sha256,
+                "chunks": chunk_ids,
+            }
+
+    def remove(self, file_path: str) -> Optional[dict]:
+        with self._lock:
+            return self._files.pop(os.path.abspath(file_path), None)
+
+    def files(self) -> List[str]:
+        with self._lock:
+            return list(self._files)
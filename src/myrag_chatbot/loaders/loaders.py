@@ -1,8 +1,8 @@
 # src/myrag_chatbot/loaders/loaders.py
-from langchain.docstore.document import Document
-from myrag_chatbot.loaders.pdf_loader import load_pdf
-from myrag_chatbot.loaders.txt_loader import load_txt
-from typing import List
+from langchain_core.documents import Document
+from myrag_chatbot.loaders.pdf_loader import iter_pdf, load_pdf
+from myrag_chatbot.loaders.txt_loader import iter_txt, load_txt
+from typing import Iterator, List
 
 def load_documents(file_path: str) -> List[Document]:
     """
@@ -21,6 +21,26 @@ def load_documents(file_path: str) -> List[Document]:
     else:
         raise ValueError("Format file tidak didukung. Hanya PDF dan TXT yang diterima.")
 
+def iter_documents(file_path: str) -> Iterator[Document]:
+    """
+    Memuat dokumen dari file PDF atau TXT secara lazy.
+
+    Halaman PDF dibaca satu per satu saat iterator dijalankan, sehingga halaman yang
+    sudah diproses bisa dibuang sebelum halaman berikutnya dimuat.
+
+    Args:
+        file_path: Path ke file yang akan dimuat.
+
+    Returns:
+        Iterator Document dari file.
+    """
+    if file_path.endswith(".pdf"):
+        return iter_pdf(file_path)
+    elif file_path.endswith(".txt"):
+        return iter_txt(file_path)
+    else:
+        raise ValueError("Format file tidak didukung. Hanya PDF dan TXT yang diterima.")
+
 if __name__ == '__main__':
     # Contoh penggunaan
     try:
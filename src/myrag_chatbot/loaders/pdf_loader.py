@@ -1,7 +1,7 @@
 # src/myrag_chatbot/loaders/pdf_loader.py
 from langchain_community.document_loaders import PyPDFLoader
-from langchain.docstore.document import Document
-from typing import List
+from langchain_core.documents import Document
+from typing import Iterator, List
 
 def load_pdf(file_path: str) -> List[Document]:
     """Memuat dokumen dari file PDF."""
@@ -14,6 +14,16 @@ def load_pdf(file_path: str) -> List[Document]:
     except Exception as e:
         raise Exception(f"Terjadi kesalahan saat memuat file PDF: {e}")
 
+def iter_pdf(file_path: str) -> Iterator[Document]:
+    """Memuat dokumen dari file PDF secara lazy (per halaman), tanpa menahan seluruh isi file."""
+    try:
+        loader = PyPDFLoader(file_path)
+        yield from loader.lazy_load()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File PDF tidak ditemukan di: {file_path}")
+    except Exception as e:
+        raise Exception(f"Terjadi kesalahan saat memuat file PDF: {e}")
+
 if __name__ == '__main__':
     # Contoh penggunaan (buat file dummy.pdf untuk testing)
     try:
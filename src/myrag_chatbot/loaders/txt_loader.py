@@ -1,7 +1,7 @@
 # src/myrag_chatbot/loaders/txt_loader.py
 from langchain_community.document_loaders import TextLoader
-from langchain.docstore.document import Document
-from typing import List
+from langchain_core.documents import Document
+from typing import Iterator, List
 
 def load_txt(file_path: str) -> List[Document]:
     """Memuat dokumen dari file TXT."""
@@ -14,6 +14,16 @@ def load_txt(file_path: str) -> List[Document]:
     except Exception as e:
         raise Exception(f"Terjadi kesalahan saat memuat file TXT: {e}")
 
+def iter_txt(file_path: str) -> Iterator[Document]:
+    """Memuat dokumen dari file TXT secara lazy; file baru dibaca saat iterator dijalankan."""
+    try:
+        loader = TextLoader(file_path)
+        yield from loader.lazy_load()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File TXT tidak ditemukan di: {file_path}")
+    except Exception as e:
+        raise Exception(f"Terjadi kesalahan saat memuat file TXT: {e}")
+
 if __name__ == '__main__':
     # Contoh penggunaan (buat file dummy.txt untuk testing)
     try:
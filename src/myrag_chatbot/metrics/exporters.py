@@ -0,0 +1,100 @@
+# src/myrag_chatbot/metrics/exporters.py
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from myrag_chatbot.metrics.metrics import MetricsRegistry, get_metrics
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class FileExporter:
+    """
+    Menulis metrik dalam format teks Prometheus ke file secara berkala.
+
+    Cocok untuk node_exporter textfile collector. File ditulis atomik
+    (file sementara lalu rename), jadi pembaca tidak pernah melihat isi setengah jadi.
+    """
+
+    def __init__(self, path: str, interval: float = 15.0, metrics: Optional[MetricsRegistry] = None):
+        self.path = path
+        self.interval = interval
+        self.metrics = metrics or get_metrics()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self) -> None:
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".metrics-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.metrics.render_prometheus())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def start(self) -> "FileExporter":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="metrics-file-exporter", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Menghentikan thread dan menulis metrik terakhir."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.write()
+
+
+def start_http_server(port: int = 9464, host: str = "0.0.0.0",
+                      metrics: Optional[MetricsRegistry] = None) -> ThreadingHTTPServer:
+    """
+    Menjalankan endpoint `/metrics` (format Prometheus) di thread latar.
+
+    Returns:
+        Objek server; panggil `shutdown()` untuk menghentikannya.
+    """
+    registry = metrics or get_metrics()
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            # Setiap scrape tidak perlu ditulis ke stderr
+            pass
+
+    server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def configure_from_env(metrics: Optional[MetricsRegistry] = None) -> None:
+    """
+    Mengaktifkan exporter dari environment variables:
+    `MYRAG_METRICS_PORT` (endpoint HTTP) dan `MYRAG_METRICS_FILE` (+ `MYRAG_METRICS_INTERVAL`).
+    """
+    port = os.getenv("MYRAG_METRICS_PORT")
+    if port:
+        start_http_server(int(port), metrics=metrics)
+    path = os.getenv("MYRAG_METRICS_FILE")
+    if path:
+        FileExporter(path, float(os.getenv("MYRAG_METRICS_INTERVAL", "15")), metrics=metrics).start()
@@ -0,0 +1,188 @@
+# src/myrag_chatbot/metrics/metrics.py
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Batas bucket histogram (detik), dari operasi in-memory sampai panggilan LLM yang lambat
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+MetricsHook = Callable[[dict], None]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "count", "total")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.count += 1
+        self.total += value
+
+
+class MetricsRegistry:
+    """
+    Kumpulan counter dan histogram latensi per tahap, aman dipakai dari banyak thread.
+
+    Setiap observasi juga diteruskan ke hook yang terdaftar (mis. untuk tracing atau log
+    terstruktur), sehingga metrik bisa dikirim ke sistem lain tanpa mengubah kode yang diukur.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._help: Dict[str, str] = {}
+        self._hooks: List[MetricsHook] = []
+
+    def describe(self, name: str, help_text: str) -> None:
+        """Menambahkan teks HELP untuk metrik di output Prometheus."""
+        self._help[name] = help_text
+
+    def add_hook(self, hook: MetricsHook) -> None:
+        """
+        Mendaftarkan hook yang dipanggil untuk setiap observasi.
+
+        Args:
+            hook: Callable yang menerima event {"type": "counter"|"histogram", "name": str,
+                "value": float, "labels": dict}. Exception dari hook diabaikan.
+        """
+        with self._lock:
+            self._hooks = self._hooks + [hook]
+
+    def remove_hook(self, hook: MetricsHook) -> None:
+        with self._lock:
+            self._hooks = [existing for existing in self._hooks if existing is not hook]
+
+    def _emit(self, kind: str, name: str, value: float, labels: Dict[str, object]) -> None:
+        for hook in self._hooks:
+            try:
+                hook({"type": kind, "name": name, "value": value, "labels": labels})
+            except Exception:
+                pass
+
+    def inc(self, name: str, value: float = 1.0, **labels: object) -> None:
+        """Menambah counter `name` dengan label tertentu."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+        if self._hooks:
+            self._emit("counter", name, value, labels)
+
+    def observe(self, name: str, seconds: float, **labels: object) -> None:
+        """Mencatat satu durasi (detik) di histogram `name`."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self.buckets)
+            histogram.observe(seconds)
+        if self._hooks:
+            self._emit("histogram", name, seconds, labels)
+
+    @contextmanager
+    def span(self, stage: str, **labels: object) -> Iterator[None]:
+        """
+        Mengukur durasi satu tahap ke histogram `myrag_stage_seconds{stage=...}`.
+
+        Exception di dalam span dihitung di `myrag_errors_total{stage=...}` lalu diteruskan.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc("myrag_errors_total", stage=stage, **labels)
+            raise
+        finally:
+            self.observe("myrag_stage_seconds", time.perf_counter() - start, stage=stage, **labels)
+
+    def snapshot(self) -> dict:
+        """Salinan semua metrik sebagai dict (untuk JSON atau pengujian)."""
+        with self._lock:
+            return {
+                "counters": {
+                    name: {_format_labels(key): value for key, value in series.items()}
+                    for name, series in self._counters.items()
+                },
+                "histograms": {
+                    name: {
+                        _format_labels(key): {"count": hist.count, "sum": hist.total}
+                        for key, hist in series.items()
+                    }
+                    for name, series in self._histograms.items()
+                },
+            }
+
+    def render_prometheus(self) -> str:
+        """Merender semua metrik dalam format teks Prometheus (exposition format 0.0.4)."""
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self._counters):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+            for name in sorted(self._histograms):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', repr(bound)))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {hist.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {hist.total}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+_default_metrics = MetricsRegistry()
+_default_metrics.describe("myrag_stage_seconds", "Durasi per tahap pipeline (detik).")
+_default_metrics.describe("myrag_llm_ttft_seconds", "Waktu sampai token pertama per backend LLM (detik).")
+_default_metrics.describe("myrag_answer_ttft_seconds", "Waktu sampai token pertama jawaban engine (detik).")
+_default_metrics.describe("myrag_llm_output_tokens_total", "Jumlah potongan (token) jawaban dari LLM.")
+_default_metrics.describe("myrag_llm_backend_requests_total", "Permintaan per backend LLM dan hasilnya.")
+_default_metrics.describe("myrag_llm_hedges_total", "Permintaan yang dikirim ulang karena TTFT melewati batas.")
+_default_metrics.describe("myrag_errors_total", "Jumlah error per tahap.")
+_default_metrics.describe("myrag_cache_requests_total", "Lookup cache per jenis cache dan hasilnya.")
+_default_metrics.describe("myrag_context_tokens_total", "Perkiraan token konteks yang dikirim ke LLM.")
+_default_metrics.describe("myrag_embedding_batches_total", "Panggilan batch embedding query ke provider.")
+_default_metrics.describe("myrag_embedding_batched_queries_total", "Query yang dikirim lewat batch embedding.")
+_default_metrics.describe("myrag_ingested_chunks_total", "Jumlah chunk yang di-upsert saat ingestion.")
+_default_metrics.describe("myrag_ingest_jobs_total", "Pekerjaan ingestion latar per status.")
+
+
+def get_metrics() -> MetricsRegistry:
+    """Registry metrik default untuk proses ini."""
+    return _default_metrics
@@ -0,0 +1,349 @@
+# src/myrag_chatbot/registry/registry.py
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables import Runnable
+from langchain_core.vectorstores import VectorStore
+
+from myrag_chatbot.chatbot.answer_cache import AnswerCache
+from myrag_chatbot.chatbot.chatbot_engine import ChatbotEngine
+from myrag_chatbot.chatbot.router import LLMBackendConfig, LLMRouter
+from myrag_chatbot.chatbot.web_search import CachedWebSearch, create_web_search
+from myrag_chatbot.embedder.embedder import create_embeddings
+from myrag_chatbot.ingestion.ingest import BatchCallback, ingest_file
+from myrag_chatbot.ingestion.jobs import IngestionJob, IngestionJobQueue
+from myrag_chatbot.ingestion.manifest import IngestionManifest
+from myrag_chatbot.retriever.bm25_index import BM25Index, IndexedVectorStore, backfill_index
+from myrag_chatbot.retriever.reranker import DEFAULT_CROSS_ENCODER, CrossEncoderReranker
+from myrag_chatbot.retriever.retriever import (
+    DEFAULT_PERSIST_DIRECTORY,
+    create_retriever,
+    create_vectorstore,
+    lexical_index_path,
+)
+
+
+@dataclass(frozen=True)
+class EngineConfig:
+    """Konfigurasi engine; juga dipakai sebagai kunci komponen di registry."""
+    llm_model: str = "ollama"
+    embedding_model: str = "ollama"
+    retriever_type: str = "similarity"
+    vector_backend: str = "chroma"
+    reranker_model: str = DEFAULT_CROSS_ENCODER
+    reranker_max_length: int = 512
+    reranker_threads: Optional[int] = None
+    reranker_skip_margin: Optional[float] = 0.15
+    persist_directory: str = DEFAULT_PERSIST_DIRECTORY
+    embedding_cache_dir: Optional[str] = None
+    embedding_batch_wait: Optional[float] = 0.005  # None = tanpa micro-batching query embedding
+    embedding_batch_size: int = 32
+    temperature: float = 0.2
+    llm_backends: Tuple[LLMBackendConfig, ...] = ()  # kosong = satu backend `llm_model`
+    llm_ttft_timeout: Optional[float] = 2.0  # batas token pertama sebelum hedging ke backend lain
+    use_internet_search: bool = False
+    web_search_backend: str = "tavily"  # "tavily", "stub"
+    web_search_ttl: float = 900.0
+    web_search_deadline: Optional[float] = 3.0
+    answer_cache: bool = True
+    answer_cache_threshold: float = 0.92
+    answer_cache_ttl: float = 3600.0
+    context_budget: Optional[int] = None  # None = anggaran default per provider LLM
+    ingest_workers: int = 2  # file yang diindeks bersamaan oleh antrean ingestion latar
+    ingest_batch_size: int = 64  # chunk per upsert; chunk bisa dicari setelah batch-nya tersimpan
+
+    @property
+    def manifest_path(self) -> str:
+        # Manifest mengikuti backend karena ID chunk yang tercatat hanya valid untuk koleksi itu
+        if self.vector_backend == "chroma":
+            return os.path.join(self.persist_directory, "ingestion_manifest.json")
+        return os.path.join(self.persist_directory, f"ingestion_manifest_{self.vector_backend}.json")
+
+
+class ComponentRegistry:
+    """
+    Registry komponen berat (embeddings, vectorstore, retriever, engine) per proses.
+
+    Setiap komponen dibuat sekali per kunci konfigurasi dan dipakai bersama oleh semua
+    sesi. Pembuatan dilindungi lock per kunci sehingga aman dipanggil dari sesi yang
+    berjalan bersamaan tanpa membuat objek ganda; setiap penulisan ke tabel komponen
+    memakai lock global yang sama dengan pembacanya.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._components: Dict[Hashable, Any] = {}
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+
+    def _key_lock(self, key: Hashable) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        component = self._components.get(key)
+        if component is not None:
+            return component
+        with self._key_lock(key):
+            component = self._components.get(key)
+            if component is None:
+                component = factory()
+                # Lock per kunci hanya menyerialkan factory(); dict-nya dilindungi lock global
+                # karena _engines_for menelusurinya dari thread ingestion
+                with self._lock:
+                    self._components[key] = component
+        return component
+
+    @staticmethod
+    def _retriever_key(config: EngineConfig) -> Hashable:
+        return ("retriever", config.embedding_model, config.embedding_cache_dir,
+                config.persist_directory, config.vector_backend, config.retriever_type)
+
+    @staticmethod
+    def _engine_key(config: EngineConfig) -> Hashable:
+        return ("engine", config)
+
+    def embeddings(self, config: EngineConfig) -> Embeddings:
+        return self._get_or_create(
+            ("embeddings", config.embedding_model, config.embedding_cache_dir,
+             config.embedding_batch_wait, config.embedding_batch_size),
+            lambda: create_embeddings(
+                config.embedding_model,
+                cache_dir=config.embedding_cache_dir,
+                query_batch_wait=config.embedding_batch_wait,
+                query_batch_size=config.embedding_batch_size,
+            ),
+        )
+
+    def vectorstore(self, config: EngineConfig) -> VectorStore:
+        return self._get_or_create(
+            ("vectorstore", config.embedding_model, config.embedding_cache_dir,
+             config.persist_directory, config.vector_backend),
+            lambda: self._build_vectorstore(config),
+        )
+
+    def _build_vectorstore(self, config: EngineConfig) -> VectorStore:
+        """Koleksi vektor yang dibungkus agar setiap upsert juga memperbarui index BM25."""
+        base = create_vectorstore(
+            self.embeddings(config),
+            persist_directory=config.persist_directory,
+            backend=config.vector_backend,
+        )
+        lexical_index = self.lexical_index(config)
+        if len(lexical_index) == 0:
+            # Koleksi yang diindeks sebelum ada index leksikal: isi dari chunk yang tercatat di manifest
+            manifest = self.manifest(config)
+            chunk_ids = [cid for path in manifest.files() for cid in manifest.get(path)["chunks"]]
+            if chunk_ids:
+                backfill_index(lexical_index, base, chunk_ids)
+        return IndexedVectorStore(base, lexical_index)
+
+    def lexical_index(self, config: EngineConfig) -> BM25Index:
+        return self._get_or_create(
+            ("lexical_index", config.persist_directory, config.vector_backend),
+            lambda: BM25Index(lexical_index_path(config.persist_directory, config.vector_backend)),
+        )
+
+    def manifest(self, config: EngineConfig) -> IngestionManifest:
+        return self._get_or_create(
+            ("manifest", config.manifest_path),
+            lambda: IngestionManifest(config.manifest_path),
+        )
+
+    def reranker(self, config: EngineConfig) -> CrossEncoderReranker:
+        # Dipakai bersama agar cache skor tidak hilang saat retriever di-refresh
+        return self._get_or_create(
+            ("reranker", config.reranker_model, config.reranker_max_length,
+             config.reranker_threads, config.reranker_skip_margin),
+            lambda: CrossEncoderReranker(
+                model_name=config.reranker_model,
+                max_length=config.reranker_max_length,
+                num_threads=config.reranker_threads,
+                skip_margin=config.reranker_skip_margin,
+            ),
+        )
+
+    def _build_retriever(self, config: EngineConfig) -> BaseRetriever:
+        return create_retriever(
+            self.embeddings(config),
+            retriever_type=config.retriever_type,
+            persist_directory=config.persist_directory,
+            vectorstore=self.vectorstore(config),
+            reranker=self.reranker(config) if config.retriever_type == "reranking" else None,
+        )
+
+    def retriever(self, config: EngineConfig) -> BaseRetriever:
+        return self._get_or_create(self._retriever_key(config), lambda: self._build_retriever(config))
+
+    def engine(self, config: EngineConfig) -> ChatbotEngine:
+        return self._get_or_create(
+            self._engine_key(config),
+            lambda: ChatbotEngine(
+                retriever=self.retriever(config),
+                llm_model=config.llm_model,
+                temperature=config.temperature,
+                use_internet_search=config.use_internet_search,
+                answer_cache=self._build_answer_cache(config),
+                context_budget=config.context_budget,
+                web_search=self.web_search(config),
+                llm=self.llm(config),
+            ),
+        )
+
+    def llm(self, config: EngineConfig) -> Optional[Runnable]:
+        # Router dan koneksi HTTP-nya dipakai bersama oleh semua engine dengan backend yang sama
+        if not config.llm_backends:
+            return None
+        return self._get_or_create(
+            ("llm", config.llm_backends, config.temperature, config.llm_ttft_timeout),
+            lambda: LLMRouter.from_configs(
+                config.llm_backends,
+                temperature=config.temperature,
+                ttft_timeout=config.llm_ttft_timeout,
+            ),
+        )
+
+    def web_search(self, config: EngineConfig) -> Optional[CachedWebSearch]:
+        # Cache hasil internet dipakai bersama oleh semua engine dengan backend yang sama
+        if not config.use_internet_search:
+            return None
+        return self._get_or_create(
+            ("web_search", config.web_search_backend, config.web_search_ttl, config.web_search_deadline),
+            lambda: create_web_search(
+                config.web_search_backend,
+                ttl_seconds=config.web_search_ttl,
+                deadline_seconds=config.web_search_deadline,
+            ),
+        )
+
+    def _build_answer_cache(self, config: EngineConfig) -> Optional[AnswerCache]:
+        if not config.answer_cache:
+            return None
+        return AnswerCache(
+            embeddings=self.embeddings(config),
+            similarity_threshold=config.answer_cache_threshold,
+            ttl_seconds=config.answer_cache_ttl,
+        )
+
+    def refresh_retriever(self, config: EngineConfig) -> BaseRetriever:
+        """
+        Membuat ulang retriever untuk koleksi ini dan memasangnya ke semua engine
+        yang memakainya, sehingga perubahan terlihat oleh semua sesi. Answer cache
+        engine tersebut dikosongkan karena jawabannya bisa sudah usang.
+        """
+        key = self._retriever_key(config)
+        with self._key_lock(key):
+            retriever = self._build_retriever(config)
+            with self._lock:
+                self._components[key] = retriever
+        for engine in self._engines_for(config):
+            engine.retriever = retriever
+            if engine.answer_cache is not None:
+                engine.answer_cache.clear()
+        return retriever
+
+    def _engines_for(self, config: EngineConfig) -> List[ChatbotEngine]:
+        """Engine yang memakai koleksi dan jenis retriever yang sama dengan `config`."""
+        key = self._retriever_key(config)
+        with self._lock:
+            return [
+                engine for engine_key, engine in self._components.items()
+                if isinstance(engine_key, tuple) and engine_key[0] == "engine"
+                and self._retriever_key(engine_key[1]) == key
+            ]
+
+    def clear_answer_caches(self, config: EngineConfig) -> None:
+        """Mengosongkan answer cache engine yang memakai koleksi ini (isi koleksi berubah)."""
+        for engine in self._engines_for(config):
+            if engine.answer_cache is not None:
+                engine.answer_cache.clear()
+
+    def ingest_file(self, config: EngineConfig, file_path: str, on_batch: Optional[BatchCallback] = None,
+                    **kwargs) -> Dict[str, object]:
+        """
+        Mengindeks file ke koleksi bersama.
+
+        File yang berbeda boleh diindeks bersamaan (vectorstore, index BM25, dan manifest
+        aman untuk banyak thread); file yang sama dijalankan berurutan. Vectorstore dipakai
+        bersama oleh retriever, jadi chunk langsung bisa dicari setelah batch-nya tersimpan;
+        answer cache dikosongkan setiap batch agar jawaban lama tidak dipakai lagi. Jawaban
+        yang sedang dibuat saat cache dikosongkan tidak ikut disimpan (lihat
+        AnswerCache.generation), dan cache dikosongkan sekali lagi jika ingestion gagal
+        setelah sebagian batch tersimpan.
+        """
+        stored = False
+
+        def _on_batch(progress: Dict[str, int]) -> None:
+            nonlocal stored
+            stored = True
+            self.clear_answer_caches(config)
+            if on_batch is not None:
+                on_batch(progress)
+
+        lock_key = ("ingest", config.persist_directory, config.vector_backend, os.path.abspath(file_path))
+        try:
+            with self._key_lock(lock_key):
+                result = ingest_file(file_path, self.vectorstore(config), self.manifest(config),
+                                     on_batch=_on_batch, **kwargs)
+        except Exception:
+            if stored:
+                self.clear_answer_caches(config)
+            raise
+        if result["added"] or result["deleted"]:
+            self.refresh_retriever(config)
+        return result
+
+    def ingestion_jobs(self, config: EngineConfig) -> IngestionJobQueue:
+        """Antrean ingestion latar untuk koleksi ini, dipakai bersama oleh semua sesi."""
+        def _run(job: IngestionJob, on_batch: BatchCallback) -> Dict[str, object]:
+            options = {"batch_size": config.ingest_batch_size, **job.options}
+            return self.ingest_file(config, job.file_path, on_batch=on_batch, **options)
+
+        return self._get_or_create(
+            ("ingestion_jobs", config),
+            lambda: IngestionJobQueue(_run, max_workers=config.ingest_workers),
+        )
+
+    def session(self, config: EngineConfig) -> "EngineHandle":
+        """Membuat handle ringan untuk satu sesi chat (engine dibuat sekali per proses)."""
+        self.engine(config)
+        return EngineHandle(self, config)
+
+
+class EngineHandle:
+    """
+    Handle per sesi ke engine bersama.
+
+    Handle tidak menyimpan objek berat; setiap akses mengambil engine terkini dari
+    registry, jadi retriever yang di-refresh langsung berlaku untuk semua sesi.
+    """
+
+    def __init__(self, registry: ComponentRegistry, config: EngineConfig):
+        self.registry = registry
+        self.config = config
+
+    @property
+    def engine(self) -> ChatbotEngine:
+        return self.registry.engine(self.config)
+
+    def ingest_file(self, file_path: str, **kwargs) -> Dict[str, object]:
+        return self.registry.ingest_file(self.config, file_path, **kwargs)
+
+    def submit_ingestion(self, file_path: str, **kwargs) -> IngestionJob:
+        """Mengantrekan file ke ingestion latar dan langsung mengembalikan status pekerjaannya."""
+        return self.registry.ingestion_jobs(self.config).submit(file_path, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        # Delegasi ke engine bersama (ask, aask, astream_with_sources, ...)
+        return getattr(self.engine, name)
+
+
+_default_registry = ComponentRegistry()
+
+
+def get_registry() -> ComponentRegistry:
+    """Registry default untuk proses ini."""
+    return _default_registry
@@ -0,0 +1,283 @@
+# src/myrag_chatbot/retriever/bm25_index.py
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+# Token berupa kata, termasuk ID seperti "ABC-123" atau "v1.2" yang tetap utuh
+TOKEN_PATTERN = re.compile(r"\w+(?:[-./]\w+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Memecah teks menjadi token huruf kecil untuk BM25."""
+    return [token.casefold() for token in TOKEN_PATTERN.findall(text)]
+
+
+class BM25Index:
+    """
+    Inverted index BM25 yang persisten di SQLite dan bisa diperbarui secara inkremental.
+
+    Index menyimpan posting (term, doc_id, tf), panjang dokumen, serta teks dan metadata
+    chunk, sehingga dokumen yang hanya ditemukan secara leksikal bisa dikembalikan
+    tanpa bertanya ke vectorstore.
+    """
+
+    def __init__(self, index_path: str, k1: float = 1.5, b: float = 0.75):
+        self.index_path = index_path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        directory = os.path.dirname(index_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(index_path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS docs (
+                doc_id TEXT PRIMARY KEY,
+                length INTEGER NOT NULL,
+                content TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                doc_id TEXT NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, doc_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+            CREATE TABLE IF NOT EXISTS stats (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            INSERT OR IGNORE INTO stats (key, value) VALUES ('doc_count', 0), ('total_length', 0);
+            """
+        )
+        self._conn.commit()
+
+    def _stat(self, key: str) -> int:
+        return self._conn.execute("SELECT value FROM stats WHERE key = ?", (key,)).fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._stat("doc_count")
+
+    def _delete_locked(self, ids: Sequence[str]) -> None:
+        for doc_id in ids:
+            row = self._conn.execute("SELECT length FROM docs WHERE doc_id = ?", (doc_id,)).fetchone()
+            if row is None:
+                continue
+            self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+            self._conn.execute("DELETE FROM docs WHERE doc_id = ?", (doc_id,))
+            self._conn.execute("UPDATE stats SET value = value - 1 WHERE key = 'doc_count'")
+            self._conn.execute("UPDATE stats SET value = value - ? WHERE key = 'total_length'", (row[0],))
+
+    def add(self, texts: Sequence[str], metadatas: Sequence[dict], ids: Sequence[str]) -> None:
+        """Menambahkan atau mengganti (upsert) dokumen di index."""
+        with self._lock:
+            self._delete_locked(ids)
+            postings = []
+            total_length = 0
+            for doc_id, text, metadata in zip(ids, texts, metadatas):
+                counts = Counter(tokenize(text))
+                length = sum(counts.values())
+                total_length += length
+                self._conn.execute(
+                    "INSERT INTO docs (doc_id, length, content, metadata) VALUES (?, ?, ?, ?)",
+                    (doc_id, length, text, json.dumps(metadata)),
+                )
+                postings.extend((term, doc_id, tf) for term, tf in counts.items())
+            self._conn.executemany("INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)", postings)
+            self._conn.execute("UPDATE stats SET value = value + ? WHERE key = 'doc_count'", (len(ids),))
+            self._conn.execute("UPDATE stats SET value = value + ? WHERE key = 'total_length'", (total_length,))
+            self._conn.commit()
+
+    def delete(self, ids: Sequence[str]) -> None:
+        with self._lock:
+            self._delete_locked(ids)
+            self._conn.commit()
+
+    def search(self, query: str, k: int = 20) -> List[Tuple[str, float]]:
+        """
+        Mencari dokumen dengan skor BM25.
+
+        Returns:
+            Daftar (doc_id, skor) terurut menurun, maksimal k item.
+        """
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        with self._lock:
+            doc_count = self._stat("doc_count")
+            if not doc_count:
+                return []
+            avg_length = self._stat("total_length") / doc_count
+            placeholders = ",".join("?" * len(terms))
+            rows = self._conn.execute(
+                f"SELECT p.term, p.doc_id, p.tf, d.length FROM postings p "
+                f"JOIN docs d ON d.doc_id = p.doc_id WHERE p.term IN ({placeholders})",
+                terms,
+            ).fetchall()
+
+        document_frequency = Counter(term for term, _, _, _ in rows)
+        scores: Dict[str, float] = {}
+        for term, doc_id, tf, length in rows:
+            df = document_frequency[term]
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def get_documents(self, ids: Sequence[str]) -> List[Document]:
+        """Mengambil Document dari index, urut sesuai `ids`."""
+        if not ids:
+            return []
+        with self._lock:
+            placeholders = ",".join("?" * len(ids))
+            found = {
+                doc_id: Document(id=doc_id, page_content=content, metadata=json.loads(metadata))
+                for doc_id, content, metadata in self._conn.execute(
+                    f"SELECT doc_id, content, metadata FROM docs WHERE doc_id IN ({placeholders})", list(ids)
+                )
+            }
+        return [found[doc_id] for doc_id in ids if doc_id in found]
+
+
+class IndexedVectorStore(VectorStore):
+    """
+    Vectorstore yang setiap penambahan/penghapusannya juga diterapkan ke BM25Index.
+
+    Dipakai sebagai pembungkus koleksi Chroma/NumPy sehingga ingestion (yang hanya
+    mengenal antarmuka VectorStore) otomatis memperbarui inverted index leksikal.
+    """
+
+    def __init__(self, vectorstore: VectorStore, lexical_index: BM25Index):
+        self.vectorstore = vectorstore
+        self.lexical_index = lexical_index
+
+    @property
+    def embeddings(self) -> Optional[Embeddings]:
+        return self.vectorstore.embeddings
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        ids = self.vectorstore.add_texts(texts, metadatas=metadatas, ids=ids, **kwargs)
+        self.lexical_index.add(texts, metadatas, ids)
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        result = self.vectorstore.delete(ids=ids, **kwargs)
+        if ids:
+            self.lexical_index.delete(ids)
+        return result
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        return self.vectorstore.get_by_ids(ids)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return self.vectorstore.similarity_search(query, k=k, **kwargs)
+
+    def similarity_search_with_score(self, *args: Any, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.vectorstore.similarity_search_with_score(*args, **kwargs)
+
+    def similarity_search_with_relevance_scores(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        return self.vectorstore.similarity_search_with_relevance_scores(query, k=k, **kwargs)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return self.vectorstore.similarity_search_by_vector(embedding, k=k, **kwargs)
+
+    def max_marginal_relevance_search(self, query: str, k: int = 4, fetch_k: int = 20,
+                                      lambda_mult: float = 0.5, **kwargs: Any) -> List[Document]:
+        return self.vectorstore.max_marginal_relevance_search(query, k, fetch_k, lambda_mult, **kwargs)
+
+    def max_marginal_relevance_search_by_vector(self, embedding: List[float], k: int = 4, fetch_k: int = 20,
+                                                lambda_mult: float = 0.5, **kwargs: Any) -> List[Document]:
+        return self.vectorstore.max_marginal_relevance_search_by_vector(embedding, k, fetch_k, lambda_mult, **kwargs)
+
+    async def asimilarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return await self.vectorstore.asimilarity_search(query, k=k, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        # Metode khusus backend (mis. batch_similarity_search_by_vector milik NumpyVectorStore)
+        if name == "vectorstore":
+            raise AttributeError(name)
+        return getattr(self.vectorstore, name)
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        return self.vectorstore._select_relevance_score_fn()
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        vectorstore_cls: Optional[Type[VectorStore]] = None,
+        lexical_index: Optional[BM25Index] = None,
+        **kwargs: Any,
+    ) -> "IndexedVectorStore":
+        """
+        Membuat vectorstore dalam dari teks lalu mengindeks teks yang sama di BM25Index.
+
+        Args:
+            texts: Teks chunk.
+            embedding: Objek Embeddings untuk vectorstore dalam.
+            metadatas: Metadata per teks.
+            ids: ID per teks; dibuat otomatis jika None.
+            vectorstore_cls: Kelas vectorstore dalam (default NumpyVectorStore).
+            lexical_index: Index BM25 yang dipakai; jika None dibuat `bm25_index.sqlite3`
+                di `persist_directory`.
+            **kwargs: Diteruskan ke `vectorstore_cls.from_texts` (mis. persist_directory).
+
+        Raises:
+            ValueError: Jika `lexical_index` dan `persist_directory` sama-sama tidak diberikan.
+        """
+        if lexical_index is None:
+            persist_directory = kwargs.get("persist_directory")
+            if not persist_directory:
+                raise ValueError("lexical_index atau persist_directory harus diisi untuk IndexedVectorStore.")
+            lexical_index = BM25Index(os.path.join(persist_directory, "bm25_index.sqlite3"))
+        if vectorstore_cls is None:
+            from myrag_chatbot.retriever.numpy_store import NumpyVectorStore
+
+            vectorstore_cls = NumpyVectorStore
+        texts = list(texts)
+        metadatas = metadatas or [{} for _ in texts]
+        # ID dibuat di sini supaya vectorstore dan index leksikal memakai ID yang sama
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        vectorstore = vectorstore_cls.from_texts(texts, embedding, metadatas=metadatas, ids=ids, **kwargs)
+        lexical_index.add(texts, metadatas, ids)
+        return cls(vectorstore, lexical_index)
+
+
+def backfill_index(lexical_index: BM25Index, vectorstore: VectorStore, chunk_ids: Sequence[str],
+                   batch_size: int = 500) -> int:
+    """
+    Mengisi BM25Index dari chunk yang sudah ada di vectorstore (mis. koleksi lama
+    yang diindeks sebelum index leksikal ada). Mengembalikan jumlah chunk yang ditambahkan.
+    """
+    added = 0
+    for start in range(0, len(chunk_ids), batch_size):
+        docs = vectorstore.get_by_ids(list(chunk_ids[start:start + batch_size]))
+        docs = [doc for doc in docs if doc.id]
+        if docs:
+            lexical_index.add([doc.page_content for doc in docs], [doc.metadata for doc in docs],
+                              [doc.id for doc in docs])
+            added += len(docs)
+    return added
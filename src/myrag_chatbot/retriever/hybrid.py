@@ -0,0 +1,103 @@
+# src/myrag_chatbot/retriever/hybrid.py
+import asyncio
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+
+from myrag_chatbot.retriever.bm25_index import BM25Index
+from myrag_chatbot.retriever.reranker import CrossEncoderReranker
+
+
+def _doc_key(doc: Document) -> Optional[str]:
+    return doc.id or doc.metadata.get("chunk_id")
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]],
+    weights: Sequence[float],
+    rrf_k: int = 60,
+) -> List[Tuple[str, float]]:
+    """
+    Menggabungkan beberapa peringkat dengan reciprocal rank fusion.
+
+    Skor setiap ID adalah jumlah weight / (rrf_k + peringkat) dari semua peringkat.
+    """
+    scores: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (rrf_k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Retriever hybrid: skor leksikal BM25 dan similarity dense digabung dengan RRF.
+
+    BM25 menangani nama dan ID yang sering meleset di embedding, sedangkan dense
+    retrieval menangani parafrase. Jika `reranker` diisi, `rerank_top_n` hasil fusi
+    teratas menjadi kandidat cross-encoder. Rerank dilewati jika BM25 dan dense sepakat
+    pada kandidat teratas.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    vectorstore: VectorStore
+    lexical_index: BM25Index
+    k: int = 3
+    fetch_k: int = 20
+    rrf_k: int = 60
+    dense_weight: float = 1.0
+    lexical_weight: float = 1.0
+    reranker: Optional[CrossEncoderReranker] = None
+    rerank_top_n: int = 8
+
+    def _fuse(self, dense_docs: List[Document], lexical_hits: List[Tuple[str, float]]) -> Tuple[List[Document], bool]:
+        """Kandidat hasil RRF dan apakah kedua peringkat sepakat pada kandidat teratas."""
+        docs_by_id: Dict[str, Document] = {}
+        dense_ranking: List[str] = []
+        for doc in dense_docs:
+            key = _doc_key(doc)
+            if key is None:
+                continue
+            docs_by_id.setdefault(key, doc)
+            dense_ranking.append(key)
+        lexical_ranking = [doc_id for doc_id, _ in lexical_hits]
+
+        limit = self.k if self.reranker is None else max(self.k, self.rerank_top_n)
+        fused = reciprocal_rank_fusion(
+            [dense_ranking, lexical_ranking], [self.dense_weight, self.lexical_weight], self.rrf_k
+        )[:limit]
+        missing = [doc_id for doc_id, _ in fused if doc_id not in docs_by_id]
+        for doc in self.lexical_index.get_documents(missing):
+            docs_by_id[doc.id] = doc
+        agree = bool(dense_ranking and lexical_ranking and dense_ranking[0] == lexical_ranking[0])
+        return [docs_by_id[doc_id] for doc_id, _ in fused if doc_id in docs_by_id], agree
+
+    def _select(self, query: str, dense_docs: List[Document], lexical_hits: List[Tuple[str, float]]) -> List[Document]:
+        candidates, agree = self._fuse(dense_docs, lexical_hits)
+        if self.reranker is None:
+            return candidates
+        return self.reranker.rerank(query, candidates, self.k, skip=agree)
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        dense_docs = self.vectorstore.similarity_search(query, k=self.fetch_k)
+        lexical_hits = self.lexical_index.search(query, k=self.fetch_k)
+        return self._select(query, dense_docs, lexical_hits)
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        dense_docs, lexical_hits = await asyncio.gather(
+            self.vectorstore.asimilarity_search(query, k=self.fetch_k),
+            asyncio.to_thread(self.lexical_index.search, query, self.fetch_k),
+        )
+        if self.reranker is None:
+            return self._select(query, dense_docs, lexical_hits)
+        # Inferensi cross-encoder berat di CPU, jadi dijalankan di thread agar event loop tetap bebas
+        return await asyncio.to_thread(self._select, query, dense_docs, lexical_hits)
@@ -0,0 +1,491 @@
+# src/myrag_chatbot/retriever/numpy_store.py
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+VECTORS_FILE = "vectors.f32"
+INDEX_FILE = "index.sqlite3"
+CENTROIDS_FILE = "centroids.npy"
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indeks k skor tertinggi, terurut menurun (argpartition lalu sort kecil)."""
+    if k >= len(scores):
+        return np.argsort(-scores)
+    top = np.argpartition(-scores, k)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def _mmr(query: np.ndarray, candidates: np.ndarray, k: int, lambda_mult: float) -> List[int]:
+    """Maximal marginal relevance pada vektor satuan (cosine = dot product)."""
+    if len(candidates) == 0:
+        return []
+    relevance = candidates @ query
+    max_similarity = np.full(len(candidates), -np.inf, dtype=np.float32)
+    selected: List[int] = []
+    for _ in range(min(k, len(candidates))):
+        if selected:
+            score = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        else:
+            score = relevance.copy()
+        score[selected] = -np.inf
+        index = int(np.argmax(score))
+        selected.append(index)
+        max_similarity = np.maximum(max_similarity, candidates @ candidates[index])
+    return selected
+
+
+class _Snapshot(NamedTuple):
+    """
+    Status index yang dibaca query. Penulis membuat snapshot baru lalu menggantinya dalam
+    satu assignment, jadi query tanpa lock selalu melihat vektor, baris hidup, dan partisi
+    yang saling cocok.
+    """
+    vectors: Optional[np.ndarray]
+    alive: np.ndarray
+    partitions: np.ndarray
+    centroids: Optional[np.ndarray]
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Vectorstore in-process berbasis matriks float32 yang di-memory-map dari file.
+
+    Vektor disimpan ternormalisasi di `vectors.f32` (satu baris per chunk) sehingga
+    cosine similarity cukup dihitung dengan satu perkalian matriks. Teks, metadata, dan
+    ID disimpan di tabel SQLite pendamping yang hanya dibaca untuk hasil top-k. Beberapa
+    proses worker dapat membuka direktori yang sama dan berbagi page cache vektor.
+
+    Mode partisi kasar (gaya IVF) bisa diaktifkan dengan `build_partitions()`: query
+    hanya menghitung skor untuk `n_probe` partisi terdekat.
+    """
+
+    def __init__(
+        self,
+        persist_directory: str,
+        embedding: Embeddings,
+        read_only: bool = False,
+        n_probe: int = 8,
+    ):
+        """
+        Args:
+            persist_directory: Direktori tempat file vektor dan tabel metadata disimpan.
+            embedding: Objek Embeddings untuk query dan dokumen.
+            read_only: Buka tanpa izin tulis (untuk worker yang hanya melakukan query).
+            n_probe: Jumlah partisi yang diperiksa per query jika mode IVF aktif.
+        """
+        self.persist_directory = persist_directory
+        self.embedding = embedding
+        self.read_only = read_only
+        self.n_probe = n_probe
+        self._lock = threading.RLock()
+        os.makedirs(persist_directory, exist_ok=True)
+        self._vectors_path = os.path.join(persist_directory, VECTORS_FILE)
+        self._index_path = os.path.join(persist_directory, INDEX_FILE)
+        self._centroids_path = os.path.join(persist_directory, CENTROIDS_FILE)
+
+        self._conn = sqlite3.connect(self._index_path, check_same_thread=False)
+        if not read_only:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT)")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS rows (
+                    row INTEGER PRIMARY KEY,
+                    id TEXT UNIQUE NOT NULL,
+                    text TEXT NOT NULL,
+                    metadata TEXT NOT NULL,
+                    deleted INTEGER NOT NULL DEFAULT 0,
+                    partition INTEGER NOT NULL DEFAULT -1
+                )"""
+            )
+            self._conn.commit()
+        self._load()
+
+    # ------------------------------------------------------------------ penyimpanan
+
+    def _info(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM info WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _load(self) -> None:
+        """Membaca ulang status index dari disk (memmap vektor dan kolom ringan dari SQLite)."""
+        dim = self._info("dim")
+        self._dim = int(dim) if dim else None
+        rows = self._conn.execute("SELECT row, id, deleted, partition FROM rows ORDER BY row").fetchall()
+        count = rows[-1][0] + 1 if rows else 0
+        ids: List[Optional[str]] = [None] * count
+        alive = np.zeros(count, dtype=bool)
+        partitions = np.full(count, -1, dtype=np.int32)
+        for row, doc_id, deleted, partition in rows:
+            ids[row] = doc_id
+            alive[row] = not deleted
+            partitions[row] = partition
+
+        vectors: Optional[np.ndarray] = None
+        if self._dim and os.path.exists(self._vectors_path):
+            capacity = os.path.getsize(self._vectors_path) // (4 * self._dim)
+            if capacity:
+                vectors = np.memmap(
+                    self._vectors_path, dtype=np.float32,
+                    mode="r" if self.read_only else "r+", shape=(capacity, self._dim),
+                )
+        centroids = np.load(self._centroids_path) if os.path.exists(self._centroids_path) else None
+        self._ids = ids
+        self._row_by_id = {doc_id: row for row, doc_id in enumerate(ids) if doc_id is not None}
+        self._inverted_lists: Optional[Tuple[_Snapshot, List[np.ndarray]]] = None
+        self._snapshot = _Snapshot(vectors, alive, partitions, centroids)
+        self._loaded_mtime = self._index_mtime()
+
+    @property
+    def _count(self) -> int:
+        return len(self._snapshot.alive)
+
+    def _index_mtime(self) -> int:
+        return os.stat(self._index_path).st_mtime_ns
+
+    def _maybe_reload(self) -> None:
+        # Proses lain mungkin sudah menambah data; cukup satu stat() per query untuk mendeteksinya
+        if self._index_mtime() != self._loaded_mtime:
+            with self._lock:
+                if self._index_mtime() != self._loaded_mtime:
+                    self._load()
+
+    def _grown_vectors(self, needed: int) -> np.ndarray:
+        """Memmap vektor dengan kapasitas minimal `needed` baris; snapshot lama tetap valid."""
+        vectors = self._snapshot.vectors
+        capacity = 0 if vectors is None else vectors.shape[0]
+        if needed <= capacity:
+            return vectors
+        new_capacity = max(needed, capacity * 2, 1024)
+        if vectors is not None:
+            vectors.flush()
+        # File hanya diperpanjang, jadi memmap lama yang masih dipakai query tetap bisa dibaca
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(new_capacity * self._dim * 4)
+        return np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(new_capacity, self._dim))
+
+    @staticmethod
+    def _assign_partitions(centroids: Optional[np.ndarray], vectors: np.ndarray) -> np.ndarray:
+        if centroids is None:
+            return np.full(len(vectors), -1, dtype=np.int32)
+        return np.argmax(vectors @ centroids.T, axis=1).astype(np.int32)
+
+    # ------------------------------------------------------------------ API VectorStore
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        if self.read_only:
+            raise ValueError("NumpyVectorStore dibuka dalam mode read_only.")
+        metadatas = metadatas or [{} for _ in texts]
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        vectors = _normalize_rows(np.asarray(self.embedding.embed_documents(texts), dtype=np.float32))
+
+        with self._lock:
+            if self._dim is None:
+                self._dim = vectors.shape[1]
+                self._conn.execute("INSERT OR REPLACE INTO info (key, value) VALUES ('dim', ?)", (str(self._dim),))
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(f"Dimensi embedding {vectors.shape[1]} tidak sama dengan index ({self._dim}).")
+
+            # ID yang sudah ada ditimpa di barisnya sendiri, ID baru ditambahkan di akhir
+            rows = []
+            next_row = self._count
+            assigned = {}
+            for doc_id in ids:
+                row = self._row_by_id.get(doc_id, assigned.get(doc_id))
+                if row is None:
+                    row = assigned[doc_id] = next_row
+                    next_row += 1
+                rows.append(row)
+            snapshot = self._snapshot
+            all_vectors = self._grown_vectors(next_row)
+            partitions = self._assign_partitions(snapshot.centroids, vectors)
+            all_vectors[rows] = vectors
+            all_vectors.flush()
+
+            # Salin-lalu-ganti: query yang sedang berjalan tetap memakai snapshot lamanya
+            grow = next_row - self._count
+            alive = np.concatenate([snapshot.alive, np.zeros(grow, dtype=bool)])
+            all_partitions = np.concatenate([snapshot.partitions, np.full(grow, -1, dtype=np.int32)])
+            self._ids.extend([None] * grow)
+            for row, doc_id, partition in zip(rows, ids, partitions):
+                self._ids[row] = doc_id
+                self._row_by_id[doc_id] = row
+                alive[row] = True
+                all_partitions[row] = partition
+
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO rows (row, id, text, metadata, deleted, partition) VALUES (?, ?, ?, ?, 0, ?)",
+                [
+                    (row, doc_id, text, json.dumps(metadata), int(partition))
+                    for row, doc_id, text, metadata, partition in zip(rows, ids, texts, metadatas, partitions)
+                ],
+            )
+            self._conn.commit()
+            # Snapshot baru dipasang setelah commit, jadi setiap baris hasil query sudah ada di SQLite
+            self._snapshot = snapshot._replace(vectors=all_vectors, alive=alive, partitions=all_partitions)
+            self._loaded_mtime = self._index_mtime()
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        """Menandai baris sebagai terhapus (tombstone); ruang vektornya tidak dipakai ulang."""
+        if not ids:
+            return None
+        with self._lock:
+            rows = [self._row_by_id.pop(doc_id) for doc_id in ids if doc_id in self._row_by_id]
+            if not rows:
+                return False
+            alive = self._snapshot.alive.copy()
+            alive[rows] = False
+            for row in rows:
+                self._ids[row] = None
+            self._snapshot = self._snapshot._replace(alive=alive)
+            self._conn.executemany(
+                "DELETE FROM rows WHERE row = ?", [(row,) for row in rows]
+            )
+            self._conn.commit()
+            self._loaded_mtime = self._index_mtime()
+        return True
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        self._maybe_reload()
+        rows = [self._row_by_id[doc_id] for doc_id in ids if doc_id in self._row_by_id]
+        return self._documents(rows)
+
+    def _fetch(self, rows: Sequence[int]) -> Dict[int, Document]:
+        """Mengambil teks dan metadata untuk baris-baris hasil pencarian (satu query SQLite)."""
+        if not len(rows):
+            return {}
+        placeholders = ",".join("?" * len(rows))
+        return {
+            row: Document(id=doc_id, page_content=text, metadata=json.loads(metadata))
+            for row, doc_id, text, metadata in self._conn.execute(
+                f"SELECT row, id, text, metadata FROM rows WHERE row IN ({placeholders})",
+                [int(row) for row in rows],
+            )
+        }
+
+    def _documents(self, rows: Sequence[int]) -> List[Document]:
+        found = self._fetch(rows)
+        return [found[row] for row in (int(r) for r in rows) if row in found]
+
+    def _documents_with_scores(self, rows: np.ndarray, scores: np.ndarray) -> List[Tuple[Document, float]]:
+        # Baris yang terhapus di antara skor dan lookup dilewati bersama skornya sendiri
+        found = self._fetch(rows)
+        return [
+            (found[row], score)
+            for row, score in zip((int(r) for r in rows), scores.tolist()) if row in found
+        ]
+
+    def _partition_rows(self, snapshot: _Snapshot, query: np.ndarray, n_probe: Optional[int]) -> Optional[np.ndarray]:
+        """Baris di `n_probe` partisi terdekat (mode IVF), atau None jika perlu brute force."""
+        n_probe = n_probe or self.n_probe
+        centroids = snapshot.centroids
+        if centroids is None or n_probe >= len(centroids):
+            return None
+        cached = self._inverted_lists
+        if cached is None or cached[0] is not snapshot:
+            alive_rows = np.flatnonzero(snapshot.alive)
+            inverted_lists = [
+                alive_rows[snapshot.partitions[alive_rows] == partition] for partition in range(len(centroids))
+            ]
+            self._inverted_lists = cached = (snapshot, inverted_lists)
+        probes = _top_k(centroids @ query, n_probe)
+        # Baris yang belum punya partisi (mis. ditambahkan sebelum partisi dibangun) selalu ikut dihitung
+        unassigned = np.flatnonzero(snapshot.alive & (snapshot.partitions < 0))
+        return np.concatenate([cached[1][p] for p in probes] + [unassigned])
+
+    @staticmethod
+    def _all_scores(snapshot: _Snapshot, queries: np.ndarray) -> np.ndarray:
+        """Skor semua baris untuk satu atau banyak query; baris terhapus diberi -inf."""
+        alive = snapshot.alive
+        scores = queries @ snapshot.vectors[:len(alive)].T
+        scores[..., ~alive] = -np.inf
+        return scores
+
+    def _search_rows(self, snapshot: _Snapshot, query: np.ndarray, k: int,
+                     n_probe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        if snapshot.vectors is None or not len(snapshot.alive):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        candidates = self._partition_rows(snapshot, query, n_probe)
+        if candidates is None:
+            # Brute force langsung pada slice memmap, tanpa menyalin matriks
+            scores = self._all_scores(snapshot, query)
+            top = _top_k(scores, k)
+            top = top[np.isfinite(scores[top])]
+            return top, scores[top]
+        if not len(candidates):
+            return candidates, np.empty(0, dtype=np.float32)
+        scores = snapshot.vectors[candidates] @ query
+        top = _top_k(scores, k)
+        return candidates[top], scores[top]
+
+    def _query_vector(self, embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def similarity_search_with_score_by_vector(
+        self, embedding: List[float], k: int = 4, **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        self._maybe_reload()
+        rows, scores = self._search_rows(self._snapshot, self._query_vector(embedding), k, kwargs.get("n_probe"))
+        return self._documents_with_scores(rows, scores)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self.embedding.embed_query(query), k, **kwargs)
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def batch_similarity_search_by_vector(
+        self, embeddings: List[List[float]], k: int = 4, **kwargs: Any
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Pencarian untuk banyak query sekaligus dengan satu perkalian matriks.
+
+        Returns:
+            Untuk setiap query, daftar (Document, skor cosine) terurut menurun.
+        """
+        self._maybe_reload()
+        snapshot = self._snapshot
+        if snapshot.vectors is None or not len(snapshot.alive) or not embeddings:
+            return [[] for _ in embeddings]
+        queries = _normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        if snapshot.centroids is not None:
+            # Mode IVF: partisi yang diperiksa berbeda per query
+            results = []
+            for query in queries:
+                rows, scores = self._search_rows(snapshot, query, k, kwargs.get("n_probe"))
+                results.append(self._documents_with_scores(rows, scores))
+            return results
+        results = []
+        for scores in self._all_scores(snapshot, queries):
+            top = _top_k(scores, k)
+            top = top[np.isfinite(scores[top])]
+            results.append(self._documents_with_scores(top, scores[top]))
+        return results
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        # Skor yang dikembalikan sudah berupa cosine similarity
+        return lambda score: score
+
+    def max_marginal_relevance_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        **kwargs: Any,
+    ) -> List[Document]:
+        self._maybe_reload()
+        query = self._query_vector(embedding)
+        snapshot = self._snapshot
+        rows, _ = self._search_rows(snapshot, query, fetch_k, kwargs.get("n_probe"))
+        if not len(rows):
+            return []
+        selected = _mmr(query, np.asarray(snapshot.vectors[rows]), k, lambda_mult)
+        return self._documents(rows[selected])
+
+    def max_marginal_relevance_search(
+        self,
+        query: str,
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        **kwargs: Any,
+    ) -> List[Document]:
+        return self.max_marginal_relevance_search_by_vector(
+            self.embedding.embed_query(query), k, fetch_k, lambda_mult, **kwargs
+        )
+
+    # ------------------------------------------------------------------ mode IVF
+
+    def build_partitions(self, n_lists: Optional[int] = None, n_iter: int = 10, sample_size: int = 50000) -> int:
+        """
+        Membangun partisi kasar (k-means) agar query tidak perlu brute force.
+
+        Args:
+            n_lists: Jumlah partisi. Default sqrt(jumlah vektor).
+            n_iter: Jumlah iterasi k-means.
+            sample_size: Jumlah vektor sampel untuk melatih centroid.
+
+        Returns:
+            Jumlah partisi yang dibuat.
+        """
+        with self._lock:
+            snapshot = self._snapshot
+            alive_rows = np.flatnonzero(snapshot.alive)
+            if not len(alive_rows):
+                return 0
+            n_lists = n_lists or max(1, int(np.sqrt(len(alive_rows))))
+            rng = np.random.default_rng(0)
+            sample = alive_rows if len(alive_rows) <= sample_size else rng.choice(alive_rows, sample_size, replace=False)
+            data = np.asarray(snapshot.vectors[sample])
+            centroids = data[rng.choice(len(data), min(n_lists, len(data)), replace=False)]
+            for _ in range(n_iter):
+                assignment = np.argmax(data @ centroids.T, axis=1)
+                for index in range(len(centroids)):
+                    members = data[assignment == index]
+                    if len(members):
+                        centroids[index] = members.mean(axis=0)
+                centroids = _normalize_rows(centroids)
+
+            centroids = centroids.astype(np.float32)
+            np.save(self._centroids_path, centroids)
+            partitions = snapshot.partitions.copy()
+            for start in range(0, len(alive_rows), 65536):
+                block = alive_rows[start:start + 65536]
+                partitions[block] = self._assign_partitions(centroids, np.asarray(snapshot.vectors[block]))
+            self._snapshot = snapshot._replace(partitions=partitions, centroids=centroids)
+            self._conn.executemany(
+                "UPDATE rows SET partition = ? WHERE row = ?",
+                [(int(partitions[row]), int(row)) for row in alive_rows],
+            )
+            self._conn.commit()
+            self._loaded_mtime = self._index_mtime()
+            return len(centroids)
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        persist_directory: Optional[str] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> "NumpyVectorStore":
+        if persist_directory is None:
+            raise ValueError("persist_directory harus diisi untuk NumpyVectorStore.")
+        store = cls(persist_directory=persist_directory, embedding=embedding, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
@@ -0,0 +1,200 @@
+# src/myrag_chatbot/retriever/reranker.py
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+
+from myrag_chatbot.metrics.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CROSS_ENCODER = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+_models: Dict[Tuple[str, int], Any] = {}
+_models_lock = threading.Lock()
+
+
+def get_cross_encoder(model_name: str = DEFAULT_CROSS_ENCODER, max_length: int = 512,
+                      num_threads: Optional[int] = None) -> Any:
+    """
+    Memuat model cross-encoder sekali per proses (lazy) dan mengembalikannya dari cache.
+
+    Args:
+        model_name: Nama model sentence-transformers CrossEncoder.
+        max_length: Panjang sekuens maksimum (query + chunk) dalam token.
+        num_threads: Jumlah thread torch untuk inferensi CPU. Berlaku untuk seluruh proses.
+
+    Raises:
+        ImportError: Jika sentence-transformers tidak terpasang.
+    """
+    key = (model_name, max_length)
+    model = _models.get(key)
+    if model is not None:
+        return model
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            from sentence_transformers import CrossEncoder
+
+            if num_threads:
+                import torch
+
+                torch.set_num_threads(num_threads)
+            logger.info("Memuat cross-encoder %s (max_length=%d)", model_name, max_length)
+            model = CrossEncoder(model_name, max_length=max_length, device="cpu")
+            _models[key] = model
+    return model
+
+
+def _chunk_key(doc: Document) -> str:
+    return doc.id or doc.metadata.get("chunk_id") or hashlib.sha256(doc.page_content.encode("utf-8")).hexdigest()
+
+
+class CrossEncoderReranker:
+    """
+    Tahap rerank dengan cross-encoder: batch scoring, cache skor, dan early exit.
+
+    Skor disimpan dengan kunci (hash query, ID chunk) sehingga pertanyaan yang berulang
+    tidak menjalankan model lagi. Jika skor dense teratas sudah unggul jauh
+    (`skip_margin`) dari kandidat berikutnya, rerank dilewati.
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_CROSS_ENCODER,
+        max_length: int = 512,
+        num_threads: Optional[int] = None,
+        batch_size: int = 32,
+        cache_size: int = 10000,
+        skip_margin: Optional[float] = 0.15,
+        cross_encoder: Optional[Any] = None,
+    ):
+        """
+        Args:
+            model_name: Nama model cross-encoder.
+            max_length: Panjang sekuens maksimum untuk model.
+            num_threads: Jumlah thread torch (None = default torch).
+            batch_size: Jumlah pasangan (query, chunk) per batch inferensi.
+            cache_size: Jumlah maksimum skor di cache LRU.
+            skip_margin: Selisih minimum skor relevansi dense #1 dan #2 untuk melewati rerank.
+                None menonaktifkan early exit.
+            cross_encoder: Model dengan method `predict(pairs, batch_size=...)`; jika None dimuat
+                lewat get_cross_encoder() saat pertama kali dibutuhkan.
+        """
+        self.model_name = model_name
+        self.max_length = max_length
+        self.num_threads = num_threads
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.skip_margin = skip_margin
+        self._cross_encoder = cross_encoder
+        self._unavailable = False
+        self._cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.skipped = 0
+
+    def _model(self) -> Optional[Any]:
+        if self._cross_encoder is None and not self._unavailable:
+            try:
+                self._cross_encoder = get_cross_encoder(self.model_name, self.max_length, self.num_threads)
+            except ImportError:
+                logger.warning("sentence-transformers tidak tersedia, rerank dinonaktifkan (urutan dense dipakai).")
+                self._unavailable = True
+        return self._cross_encoder
+
+    def should_skip(self, dense_scores: Optional[Sequence[float]]) -> bool:
+        """True jika kandidat dense teratas sudah cukup unggul sehingga rerank tidak perlu."""
+        if self.skip_margin is None or not dense_scores or len(dense_scores) < 2:
+            return False
+        return dense_scores[0] - dense_scores[1] >= self.skip_margin
+
+    def score(self, query: str, docs: Sequence[Document]) -> List[float]:
+        """Skor cross-encoder untuk setiap dokumen; hanya pasangan yang belum di-cache yang dihitung."""
+        model = self._model()
+        if model is None:
+            return [0.0] * len(docs)
+        query_hash = hashlib.sha256(query.encode("utf-8")).hexdigest()
+        keys = [(query_hash, _chunk_key(doc)) for doc in docs]
+        scores: List[Optional[float]] = []
+        with self._lock:
+            for key in keys:
+                value = self._cache.get(key)
+                if value is not None:
+                    self._cache.move_to_end(key)
+                scores.append(value)
+            missing = [index for index, value in enumerate(scores) if value is None]
+            self.cache_hits += len(docs) - len(missing)
+            self.cache_misses += len(missing)
+        metrics = get_metrics()
+        if len(docs) > len(missing):
+            metrics.inc("myrag_cache_requests_total", len(docs) - len(missing), cache="rerank", result="hit")
+        if missing:
+            metrics.inc("myrag_cache_requests_total", len(missing), cache="rerank", result="miss")
+            pairs = [(query, docs[index].page_content) for index in missing]
+            with metrics.span("rerank_model"):
+                predicted = model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+            with self._lock:
+                for index, value in zip(missing, predicted):
+                    scores[index] = float(value)
+                    self._cache[keys[index]] = float(value)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return scores  # type: ignore[return-value]
+
+    def rerank(self, query: str, docs: Sequence[Document], top_n: int,
+               dense_scores: Optional[Sequence[float]] = None, skip: bool = False) -> List[Document]:
+        """
+        Mengurutkan ulang kandidat dan mengembalikan `top_n` teratas.
+
+        Args:
+            query: Pertanyaan.
+            docs: Kandidat dari retrieval (dense atau hasil fusi hybrid), urut menurun.
+            top_n: Jumlah dokumen yang dikembalikan.
+            dense_scores: Skor relevansi dense (urutan sama dengan `docs`) untuk early exit.
+            skip: Early exit yang sudah diputuskan pemanggil (mis. BM25 dan dense sepakat).
+        """
+        if len(docs) <= 1 or skip or self.should_skip(dense_scores):
+            with self._lock:
+                self.skipped += 1
+            get_metrics().inc("myrag_rerank_skipped_total")
+            return list(docs[:top_n])
+        with get_metrics().span("rerank"):
+            scores = self.score(query, docs)
+        order = sorted(range(len(docs)), key=lambda index: scores[index], reverse=True)
+        return [docs[index] for index in order[:top_n]]
+
+
+class RerankingRetriever(BaseRetriever):
+    """Retrieval dense `fetch_k` kandidat, lalu rerank dengan cross-encoder menjadi `k` dokumen."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    vectorstore: VectorStore
+    reranker: CrossEncoderReranker
+    k: int = 3
+    fetch_k: int = 5
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        results = self.vectorstore.similarity_search_with_relevance_scores(query, k=self.fetch_k)
+        docs = [doc for doc, _ in results]
+        return self.reranker.rerank(query, docs, self.k, [score for _, score in results])
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        results = await self.vectorstore.asimilarity_search_with_relevance_scores(query, k=self.fetch_k)
+        docs = [doc for doc, _ in results]
+        # Inferensi cross-encoder berat di CPU, jadi dijalankan di thread agar event loop tetap bebas
+        return await asyncio.to_thread(self.reranker.rerank, query, docs, self.k, [score for _, score in results])
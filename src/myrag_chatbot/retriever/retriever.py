@@ -1,85 +1,143 @@
+import logging
 import os
-import traceback
-from typing import List
+from typing import TYPE_CHECKING, List, Optional
 
-from langchain_chroma import Chroma
-from chromadb.config import Settings as ClientSettings
-from langchain.embeddings.base import Embeddings
-from langchain.docstore.document import Document
-from langchain.vectorstores.base import VectorStoreRetriever
+from langchain_core.embeddings import Embeddings
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore, VectorStoreRetriever
 
-def create_retriever(
+if TYPE_CHECKING:
+    from myrag_chatbot.retriever.bm25_index import BM25Index
+    from myrag_chatbot.retriever.reranker import CrossEncoderReranker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PERSIST_DIRECTORY = "/Users/antoniomorabito/Documents/aiproject/myrag_chatbot/src/myrag_chatbot/db"
+
+def create_vectorstore(
     embeddings: Embeddings,
-    documents: List[Document],
-    retriever_type: str = "similarity",  # "similarity", "mmr", "reranking"
-    persist_directory: str = "/Users/antoniomorabito/Documents/aiproject/myrag_chatbot/src/myrag_chatbot/db",
-) -> VectorStoreRetriever:
+    persist_directory: str = DEFAULT_PERSIST_DIRECTORY,
+    backend: str = "chroma",  # "chroma", "numpy"
+) -> VectorStore:
     """
-    Membuat retriever dari dokumen dan embeddings.
+    Membuka (atau membuat) vectorstore yang persisten.
+
+    Backend "chroma" memakai koleksi Chroma; backend "numpy" memakai NumpyVectorStore
+    (matriks float32 memory-mapped) di subdirektori `numpy_index`.
     """
-    print(f"[DEBUG] create_retriever: retriever_type={retriever_type}, persist_directory={persist_directory}")
-    print(f"[DEBUG] create_retriever: type(embeddings)={type(embeddings)}, len(documents)={len(documents)}")
+    if backend == "numpy":
+        from myrag_chatbot.retriever.numpy_store import NumpyVectorStore
 
-    try:
-        client_settings = ClientSettings(
-            anonymized_telemetry=False,
-            persist_directory=persist_directory
+        logger.debug("create_vectorstore: NumpyVectorStore di %s", persist_directory)
+        return NumpyVectorStore(
+            persist_directory=os.path.join(persist_directory, "numpy_index"),
+            embedding=embeddings,
         )
-        print(f"[DEBUG] create_retriever: About to call Chroma with persist_directory: {persist_directory}")
+    if backend != "chroma":
+        raise ValueError(f"Backend vectorstore tidak didukung: {backend}")
+
+    try:
+        from langchain_chroma import Chroma
+
+        logger.debug("create_vectorstore: About to call Chroma with persist_directory: %s", persist_directory)
         vectorstore = Chroma(
             persist_directory=persist_directory,
             embedding_function=embeddings
         )
-        print(f"[DEBUG] create_retriever: Chroma vectorstore created successfully")
+        logger.debug("create_vectorstore: Chroma vectorstore created successfully")
     except Exception as e:
-        traceback.print_exc()
-        print(f"[ERROR] create_retriever: Error creating Chroma vectorstore: {e}")
+        logger.exception("create_vectorstore: Error creating Chroma vectorstore: %s", e)
         raise
+    return vectorstore
+
+def lexical_index_path(persist_directory: str = DEFAULT_PERSIST_DIRECTORY, backend: str = "chroma") -> str:
+    """Lokasi inverted index BM25 untuk koleksi di `persist_directory`."""
+    if backend == "chroma":
+        return os.path.join(persist_directory, "bm25_index.sqlite3")
+    return os.path.join(persist_directory, f"bm25_index_{backend}.sqlite3")
+
+def create_retriever(
+    embeddings: Embeddings,
+    documents: Optional[List[Document]] = None,
+    retriever_type: str = "similarity",  # "similarity", "mmr", "reranking", "hybrid"
+    persist_directory: str = DEFAULT_PERSIST_DIRECTORY,
+    vectorstore: Optional[VectorStore] = None,
+    backend: str = "chroma",  # "chroma", "numpy"
+    lexical_index: Optional["BM25Index"] = None,
+    reranker: Optional["CrossEncoderReranker"] = None,
+) -> VectorStoreRetriever:
+    """
+    Membuat retriever dari dokumen dan embeddings.
+
+    Jika `vectorstore` diberikan (mis. koleksi yang sama dipakai ingestion),
+    retriever dibuat di atasnya tanpa membuka client Chroma baru. Jika tidak,
+    vectorstore dibuka dengan `backend` yang dipilih.
+
+    Retriever "hybrid" memakai `lexical_index` (BM25) yang dibangun saat ingestion;
+    jika tidak diberikan, index milik IndexedVectorStore atau file default dipakai.
+    Jika `reranker` diberikan, hasil fusinya diurutkan ulang dengan cross-encoder.
+    Retriever "reranking" memakai `reranker` (CrossEncoderReranker) jika diberikan; jika
+    vectorstore berupa IndexedVectorStore, kandidat rerank diambil dari fusi BM25 + dense.
+    """
+    logger.debug("create_retriever: retriever_type=%s, persist_directory=%s", retriever_type, persist_directory)
+
+    if vectorstore is None:
+        vectorstore = create_vectorstore(embeddings, persist_directory, backend=backend)
 
     try:
         if retriever_type == "similarity":
             retriever = vectorstore.as_retriever(search_kwargs={"k": 3})
-            print(f"[DEBUG] create_retriever: similarity retriever created")
+            logger.debug("create_retriever: similarity retriever created")
 
         elif retriever_type == "mmr":
             retriever = vectorstore.as_retriever(
                 search_type="mmr",
                 search_kwargs={"k": 3, "fetch_k": 10, "lambda_mult": 0.5}
             )
-            print(f"[DEBUG] create_retriever: mmr retriever created")
+            logger.debug("create_retriever: mmr retriever created")
+
+        elif retriever_type == "hybrid":
+            from myrag_chatbot.retriever.bm25_index import BM25Index, IndexedVectorStore
+            from myrag_chatbot.retriever.hybrid import HybridRetriever
+
+            if lexical_index is None:
+                if isinstance(vectorstore, IndexedVectorStore):
+                    lexical_index = vectorstore.lexical_index
+                else:
+                    lexical_index = BM25Index(lexical_index_path(persist_directory, backend))
+            retriever = HybridRetriever(vectorstore=vectorstore, lexical_index=lexical_index, k=3, fetch_k=20,
+                                        reranker=reranker)
+            logger.debug("create_retriever: hybrid retriever created (BM25 + dense, RRF)")
 
         elif retriever_type == "reranking":
-            base_retriever = vectorstore.as_retriever(search_kwargs={"k": 5})
-            try:
-                from langchain.retrievers import EnsembleRetriever
-                from langchain_community.rerankers import SentenceTransformersRerank
-
-                reranker = SentenceTransformersRerank(top_n=3)
-                retriever = EnsembleRetriever(
-                    retrievers=[base_retriever],
-                    weights=[1],
-                    reranker=reranker
-                )
-                print(f"[DEBUG] create_retriever: reranking retriever created (SentenceTransformersRerank)")
-            except ImportError as ie:
-                print("[WARN] SentenceTransformersRerank not available, falling back to EmbeddingsFilter reranker.")
-                from langchain.retrievers.document_compressors import EmbeddingsFilter
-                from langchain.retrievers import ContextualCompressionRetriever
-
-                compressor = EmbeddingsFilter(embeddings=embeddings, similarity_threshold=0.7)
-                retriever = ContextualCompressionRetriever(
-                    base_compressor=compressor,
-                    base_retriever=base_retriever
+            from myrag_chatbot.retriever.bm25_index import IndexedVectorStore
+            from myrag_chatbot.retriever.hybrid import HybridRetriever
+            from myrag_chatbot.retriever.reranker import CrossEncoderReranker, RerankingRetriever
+
+            # Model cross-encoder dimuat lazy dan dipakai bersama oleh semua retriever di proses ini
+            reranker = reranker or CrossEncoderReranker()
+            if lexical_index is None and isinstance(vectorstore, IndexedVectorStore):
+                lexical_index = vectorstore.lexical_index
+            if lexical_index is not None:
+                # Fusi BM25 + dense memperkecil kandidat dan sering membuat cross-encoder tidak perlu
+                retriever = HybridRetriever(vectorstore=vectorstore, lexical_index=lexical_index, k=3,
+                                            fetch_k=20, reranker=reranker, rerank_top_n=5)
+                logger.debug("create_retriever: reranking retriever created (RRF candidates + CrossEncoderReranker)")
+            else:
+                retriever = RerankingRetriever(
+                    vectorstore=vectorstore,
+                    reranker=reranker,
+                    k=3,
+                    fetch_k=5,
                 )
-                print(f"[DEBUG] create_retriever: reranking retriever created (EmbeddingsFilter fallback)")
+                logger.debug("create_retriever: reranking retriever created (CrossEncoderReranker)")
 
         else:
             raise ValueError(f"Jenis retriever tidak didukung: {retriever_type}")
 
     except Exception as e:
-        traceback.print_exc()
-        print(f"[ERROR] create_retriever: Error creating retriever: {e}")
+        logger.exception("create_retriever: Error creating retriever: %s", e)
         raise
 
-    print(f"[DEBUG] create_retriever: Retriever berhasil dibuat: {retriever}")
+    logger.debug("create_retriever: Retriever berhasil dibuat: %s", type(retriever).__name__)
     return retriever
@@ -1,7 +1,9 @@
 # src/myrag_chatbot/splitter/splitter.py
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.docstore.document import Document
-from typing import List
+from bisect import bisect_right
+from itertools import count, groupby
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from langchain_core.documents import Document
 
 def split_documents(documents: List[Document], chunk_size: int = 1000, chunk_overlap: int = 100) -> List[Document]:
     """
@@ -15,10 +17,269 @@ def split_documents(documents: List[Document], chunk_size: int = 1000, chunk_ove
     Returns:
         List berisi chunk dokumen.
     """
+    # Diimpor saat dipakai: paket text splitter lambat diimpor dan tidak dibutuhkan saat chat
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
     chunks = text_splitter.split_documents(documents)
     return chunks
 
+class SourceText:
+    """
+    Metadata dan posisi halaman satu file, dipakai bersama oleh semua chunk-nya.
+
+    Halaman PDF dianggap digabung dengan pemisah paragraf. Offset awal setiap halaman
+    dicatat saat halaman dibaca, sehingga rentang halaman sebuah chunk bisa dihitung dari
+    offsetnya tanpa menyimpan teks seluruh file.
+    """
+
+    PAGE_SEPARATOR = "\n\n"
+
+    def __init__(self, doc_id: str, metadata: Dict[str, Any], page_starts: Sequence[Tuple[int, Any]] = ()):
+        self.doc_id = doc_id
+        self.metadata = metadata
+        self._page_offsets = [offset for offset, _ in page_starts]
+        self._pages = [page for _, page in page_starts]
+
+    @classmethod
+    def from_document(cls, doc_id: str, document: Document) -> "SourceText":
+        """Sumber baru dengan metadata dokumen pertama, tanpa kunci per halaman."""
+        metadata = {key: value for key, value in document.metadata.items() if key not in ("page", "page_label")}
+        return cls(doc_id, metadata)
+
+    def add_page(self, offset: int, page: Any) -> None:
+        self._page_offsets.append(offset)
+        self._pages.append(page)
+
+    def page_span(self, start: int, end: int) -> Tuple[Any, Any]:
+        """Halaman pertama dan terakhir yang disentuh rentang [start, end); (None, None) tanpa halaman."""
+        if not self._page_offsets:
+            return None, None
+        first = max(bisect_right(self._page_offsets, start) - 1, 0)
+        last = max(bisect_right(self._page_offsets, max(end - 1, start)) - 1, 0)
+        return self._pages[first], self._pages[last]
+
+
+class _PageWindow:
+    """
+    Jendela teks berjalan di atas halaman-halaman satu sumber.
+
+    Halaman dibaca dari iterator hanya saat dibutuhkan. Setiap kali halaman baru
+    ditambahkan, teks sebelum `keep_from` dibuang, jadi yang tersimpan hanya sisa chunk
+    yang sedang dipotong ditambah halaman terakhir.
+    """
+
+    def __init__(self, source: SourceText, first: Document, pages: Iterator[Document]):
+        self.source = source
+        self.text = ""
+        self.base = 0
+        self.exhausted = False
+        self._pages = pages
+        self._next: Optional[Document] = first
+        self._page_count = 0
+
+    @property
+    def end(self) -> int:
+        return self.base + len(self.text)
+
+    def read_until(self, position: int, keep_from: int) -> None:
+        """Membaca halaman sampai jendela mencakup offset `position` atau sumber habis."""
+        while self.end < position and not self.exhausted:
+            doc = self._next if self._next is not None else next(self._pages, None)
+            self._next = None
+            if doc is None:
+                self.exhausted = True
+                return
+            separator = self.source.PAGE_SEPARATOR if self._page_count else ""
+            self._page_count += 1
+            if "page" in doc.metadata:
+                self.source.add_page(self.end + len(separator), doc.metadata["page"])
+            kept = self.text[keep_from - self.base:]
+            self.text = kept + separator + doc.page_content if kept or separator else doc.page_content
+            self.base = keep_from
+
+    def slice(self, start: int, end: int) -> str:
+        return self.text[start - self.base:end - self.base]
+
+
+class ChunkRef:
+    """
+    Chunk sebagai rentang offset di sumbernya, tanpa salinan metadata per chunk.
+
+    Metadata dipakai bersama lewat SourceText; Document lengkap baru dibuat saat
+    `to_document()` dipanggil.
+
+    Attributes:
+        source: Sumber chunk (dipakai bersama oleh semua chunk dari file yang sama).
+        start: Offset awal (inklusif).
+        end: Offset akhir (eksklusif).
+        text: Teks chunk.
+        page_start: Halaman pertama chunk, None jika sumber tidak berhalaman.
+        page_end: Halaman terakhir chunk.
+        chunk_id: ID chunk, diisi saat ingestion.
+    """
+
+    __slots__ = ("source", "start", "end", "text", "page_start", "page_end", "chunk_id")
+
+    def __init__(self, source: SourceText, start: int, end: int, text: str, page_start: Any = None,
+                 page_end: Any = None, chunk_id: Optional[str] = None):
+        self.source = source
+        self.start = start
+        self.end = end
+        self.text = text
+        self.page_start = page_start
+        self.page_end = page_end
+        self.chunk_id = chunk_id
+
+    @property
+    def doc_id(self) -> str:
+        return self.source.doc_id
+
+    def to_document(self) -> Document:
+        """Membuat Document lengkap (teks dan salinan metadata) dari rentang ini."""
+        metadata = dict(self.source.metadata)
+        metadata["start_index"] = self.start
+        if self.page_start is not None:
+            metadata["page"] = self.page_start
+            metadata["page_end"] = self.page_end
+        if self.chunk_id is not None:
+            metadata["chunk_id"] = self.chunk_id
+        return Document(page_content=self.text, metadata=metadata)
+
+    def __repr__(self) -> str:
+        return f"ChunkRef({self.doc_id!r}, {self.start}, {self.end}, pages={self.page_start}-{self.page_end})"
+
+
+Chunk = Union[Document, ChunkRef]
+
+
+def chunk_text(chunk: Chunk) -> str:
+    """Teks sebuah chunk, baik Document maupun ChunkRef."""
+    return chunk.text if isinstance(chunk, ChunkRef) else chunk.page_content
+
+
+def as_document(chunk: Chunk) -> Document:
+    """Mengubah ChunkRef menjadi Document; Document dikembalikan apa adanya."""
+    return chunk.to_document() if isinstance(chunk, ChunkRef) else chunk
+
+
+class OffsetTextSplitter:
+    """
+    Splitter berbasis offset: memecah halaman satu sumber secara streaming.
+
+    Batas chunk dicari seperti RecursiveCharacterTextSplitter (paragraf, baris, kalimat,
+    lalu kata) langsung di jendela teks sumber, dan overlap dimulai di batas kata. Batas chunk
+    tidak selalu identik dengan `split_documents`, jadi ID chunk ikut berubah saat mode
+    splitter diganti.
+    """
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 100,
+                 separators: Sequence[str] = ("\n\n", "\n", ". ", " ")):
+        """
+        Args:
+            chunk_size: Ukuran maksimum chunk (karakter).
+            chunk_overlap: Overlap antar chunk berurutan (karakter).
+            separators: Pemisah yang dicoba berurutan, dari yang paling kasar.
+        """
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap harus lebih kecil dari chunk_size.")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = separators
+
+    def _find_cut(self, text: str, start: int, limit: int) -> int:
+        # Pemisah di paruh pertama chunk diabaikan agar tidak menghasilkan chunk kecil
+        earliest = start + self.chunk_size // 2
+        for separator in self.separators:
+            index = text.rfind(separator, earliest, limit)
+            if index != -1:
+                return index + len(separator)
+        return limit
+
+    @staticmethod
+    def _skip_space(window: _PageWindow, position: int) -> int:
+        while True:
+            window.read_until(position + 1, keep_from=position)
+            if position >= window.end or not window.text[position - window.base].isspace():
+                return position
+            position += 1
+
+    def iter_chunks(self, doc_id: str, documents: Iterable[Document]) -> Iterator[ChunkRef]:
+        """
+        Menghasilkan ChunkRef untuk satu sumber secara berurutan.
+
+        Halaman dibaca satu per satu dan teks yang sudah dilewati dibuang, jadi memori
+        terbatas pada satu halaman ditambah satu chunk, bukan seluruh file.
+        """
+        pages = iter(documents)
+        first = next(pages, None)
+        if first is None:
+            return
+        source = SourceText.from_document(doc_id, first)
+        window = _PageWindow(source, first, pages)
+        del first
+        start = self._skip_space(window, 0)
+        while True:
+            window.read_until(start + self.chunk_size + 1, keep_from=start)
+            if start >= window.end:
+                break
+            text, base = window.text, window.base
+            if window.end > start + self.chunk_size:
+                cut = self._find_cut(text, start - base, start - base + self.chunk_size) + base
+            else:
+                cut = window.end  # Sumber sudah habis dibaca
+            end = cut
+            while end > start and text[end - 1 - base].isspace():
+                end -= 1
+            if end > start:
+                page_start, page_end = source.page_span(start, end)
+                yield ChunkRef(source, start, end, window.slice(start, end), page_start, page_end)
+            if cut >= window.end:
+                break
+            next_start = max(cut - self.chunk_overlap, start + 1)
+            if next_start < cut:
+                # Overlap dimulai di awal kata, bukan di tengah kata
+                for position in range(next_start, cut):
+                    if text[position - base].isspace():
+                        next_start = position
+                        break
+            del text
+            start = self._skip_space(window, next_start)
+
+    def split(self, documents: Iterable[Document]) -> Iterator[ChunkRef]:
+        """Memecah dokumen yang sudah dikelompokkan per "source" (lihat `iter_chunk_refs`)."""
+        anonymous = count()
+
+        def _doc_id(doc: Document) -> str:
+            # Dokumen tanpa "source" selalu menjadi sumber tersendiri
+            source = doc.metadata.get("source")
+            return source if source is not None else f"doc-{next(anonymous)}"
+
+        for doc_id, pages in groupby(documents, key=_doc_id):
+            yield from self.iter_chunks(doc_id, pages)
+
+
+def iter_chunk_refs(documents: Iterable[Document], chunk_size: int = 1000,
+                    chunk_overlap: int = 100) -> Iterator[ChunkRef]:
+    """
+    Mode hemat memori dari `split_documents`: dokumen diproses sebagai stream.
+
+    Dokumen berurutan dengan metadata "source" yang sama (mis. halaman satu PDF)
+    dianggap satu sumber dan dipecah menjadi ChunkRef. Halaman dibaca satu per satu,
+    jadi dengan loader lazy (`lazy_load`) file besar tidak pernah dimuat utuh. Document
+    lengkap baru dibuat saat `to_document()` dipanggil.
+
+    Args:
+        documents: Dokumen (boleh generator), dikelompokkan per sumber.
+        chunk_size: Ukuran chunk.
+        chunk_overlap: Overlap antar chunk.
+
+    Yields:
+        ChunkRef berisi ID dokumen, offset awal/akhir, dan rentang halaman.
+    """
+    return OffsetTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap).split(documents)
+
+
 if __name__ == '__main__':
     # Contoh penggunaan
     dummy_documents = [
@@ -28,3 +289,7 @@ if __name__ == '__main__':
     chunks = split_documents(dummy_documents)
     print(f"Berhasil memecah menjadi {len(chunks)} chunk.")
     print(f"Contoh chunk pertama:\n{chunks[0].page_content[:100]}...")
+
+    refs = list(iter_chunk_refs(dummy_documents))
+    print(f"Mode offset: {len(refs)} chunk, contoh {refs[0]}")
+    print(f"Teks chunk pertama:\n{refs[0].text[:100]}...")
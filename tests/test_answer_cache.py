@@ -0,0 +1,95 @@
+import asyncio
+
+from myrag_chatbot.benchmark.fakes import HashEmbeddings
+from myrag_chatbot.chatbot import answer_cache
+from myrag_chatbot.chatbot.answer_cache import AnswerCache, normalize_question
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def _result(answer: str) -> dict:
+    return {"answer": answer, "sources": []}
+
+
+def test_normalized_question_is_an_exact_hit():
+    assert normalize_question("  Apa ibu-kota   INDONESIA?! ") == "apa ibu kota indonesia"
+    cache = AnswerCache()
+    cache.put("Apa ibu kota Indonesia?", _result("Jakarta"))
+    assert cache.get("apa ibu kota indonesia") == _result("Jakarta")
+    assert cache.get("apa ibu kota malaysia") is None
+    assert (cache.stats()["exact_hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_near_duplicate_question_is_a_semantic_hit():
+    embeddings = HashEmbeddings(dimension=256)
+    cache = AnswerCache(embeddings=embeddings, similarity_threshold=0.8)
+    cache.put("siapa pemegang proyek ZX-4411 di Surabaya", _result("tim Garuda"))
+    assert cache.get("siapa pemegang proyek ZX-4411 di Surabaya sekarang") == _result("tim Garuda")
+    assert cache.get("berapa harga tiket kereta ke Bandung") is None
+    stats = cache.stats()
+    assert (stats["semantic_hits"], stats["misses"]) == (1, 1)
+
+
+def test_question_embedding_is_reused_between_get_and_put():
+    embeddings = HashEmbeddings(dimension=64)
+    cache = AnswerCache(embeddings=embeddings)
+    assert cache.get("pertanyaan baru") is None
+    cache.put("pertanyaan baru", _result("jawaban"))
+    assert embeddings.calls == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(answer_cache.time, "monotonic", clock.monotonic)
+    cache = AnswerCache(embeddings=HashEmbeddings(dimension=64), ttl_seconds=60.0)
+    cache.put("jadwal rapat", _result("senin"))
+    clock.now += 59.0
+    assert cache.get("jadwal rapat") == _result("senin")
+    clock.now += 2.0
+    assert cache.get("jadwal rapat") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_answer_from_an_older_generation_is_dropped():
+    cache = AnswerCache(embeddings=HashEmbeddings(dimension=64))
+    cache.put("status server", _result("lama"))
+    generation = cache.generation
+    # Koleksi berubah saat jawaban sedang dibuat
+    cache.clear()
+    cache.put("status server", _result("dari konteks lama"), generation=generation)
+    assert cache.get("status server") is None
+
+    cache.put("status server", _result("baru"), generation=cache.generation)
+    assert cache.get("status server") == _result("baru")
+
+
+def test_async_api_respects_generation():
+    cache = AnswerCache(embeddings=HashEmbeddings(dimension=64))
+
+    async def _scenario():
+        generation = cache.generation
+        assert await cache.aget("kapan libur") is None
+        cache.clear()
+        await cache.aput("kapan libur", _result("usang"), generation=generation)
+        assert await cache.aget("kapan libur") is None
+        await cache.aput("kapan libur", _result("jumat"))
+        return await cache.aget("kapan libur")
+
+    assert asyncio.run(_scenario()) == _result("jumat")
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = AnswerCache(max_entries=2)
+    cache.put("satu", _result("1"))
+    cache.put("dua", _result("2"))
+    assert cache.get("satu") == _result("1")
+    cache.put("tiga", _result("3"))
+    assert cache.get("dua") is None
+    assert cache.get("satu") == _result("1")
+    assert cache.get("tiga") == _result("3")
@@ -0,0 +1,120 @@
+import asyncio
+import io
+import json
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from myrag_chatbot.benchmark.fakes import HashEmbeddings
+from myrag_chatbot.chatbot.answer_cache import AnswerCache
+from myrag_chatbot.chatbot.batch_ask import read_questions, run_batch
+from myrag_chatbot.chatbot.chatbot_engine import ChatbotEngine
+from myrag_chatbot.retriever.numpy_store import NumpyVectorStore
+
+
+class _CountingLLM:
+    """LLM async tiruan yang mencatat jumlah panggilan dan puncak permintaan bersamaan."""
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.questions = []
+        self.active = 0
+        self.peak = 0
+
+    async def _answer(self, prompt) -> str:
+        question = prompt.to_string().rsplit("Pertanyaan: ", 1)[1]
+        self.questions.append(question)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if "rusak" in question:
+            raise RuntimeError("backend menolak pertanyaan")
+        return f"jawaban untuk {question}"
+
+    def runnable(self) -> RunnableLambda:
+        return RunnableLambda(lambda prompt: asyncio.run(self._answer(prompt)), afunc=self._answer)
+
+
+@pytest.fixture
+def retriever(tmp_path):
+    store = NumpyVectorStore(persist_directory=str(tmp_path / "index"), embedding=HashEmbeddings(dimension=64))
+    store.add_texts([f"Fakta nomor {index} tentang proyek ZX-{index}." for index in range(10)])
+    return store.as_retriever(search_kwargs={"k": 2})
+
+
+def _engine(retriever, llm: _CountingLLM, answer_cache=None) -> ChatbotEngine:
+    return ChatbotEngine(retriever=retriever, llm_model="fake", llm=llm.runnable(), answer_cache=answer_cache)
+
+
+def test_duplicate_questions_are_answered_once(retriever):
+    llm = _CountingLLM()
+    questions = ["Apa itu proyek ZX-1?", "apa itu proyek zx 1", "Siapa pemilik ZX-2?", "APA ITU PROYEK ZX-1"]
+    results = _engine(retriever, llm).ask_many(questions)
+
+    assert len(llm.questions) == 2
+    assert [result["question"] for result in results] == questions
+    assert results[0]["answer"] == results[1]["answer"] == results[3]["answer"] == "jawaban untuk Apa itu proyek ZX-1?"
+    assert results[2]["answer"] == "jawaban untuk Siapa pemilik ZX-2?"
+    assert "ZX-1" in results[0]["sources"][0]["content"]
+
+
+def test_llm_concurrency_is_limited(retriever):
+    llm = _CountingLLM(delay=0.03)
+    questions = [f"pertanyaan ke-{index} tentang ZX-{index % 10}" for index in range(12)]
+    results = _engine(retriever, llm).ask_many(questions, max_concurrency=3, batch_size=4)
+
+    assert len(llm.questions) == 12
+    assert llm.peak == 3
+    assert all("error" not in result for result in results)
+
+
+def test_results_are_yielded_as_they_finish(retriever):
+    llm = _CountingLLM()
+
+    async def _collect():
+        return [index async for index, _ in _engine(retriever, llm).aask_many(["a", "b", "c", "b"])]
+
+    indexes = asyncio.run(_collect())
+    assert sorted(indexes) == [0, 1, 2, 3]
+
+
+def test_cached_answers_skip_the_llm(retriever):
+    llm = _CountingLLM()
+    engine = _engine(retriever, llm, answer_cache=AnswerCache(embeddings=HashEmbeddings(dimension=64)))
+    engine.ask_many(["kapan ZX-3 selesai?", "di mana ZX-4?"])
+    assert len(llm.questions) == 2
+    results = engine.ask_many(["Kapan ZX-3 selesai", "di mana ZX-4?", "berapa biaya ZX-5?"])
+    assert len(llm.questions) == 3
+    assert results[0]["answer"] == "jawaban untuk kapan ZX-3 selesai?"
+
+
+def test_one_failing_question_does_not_stop_the_batch(retriever):
+    llm = _CountingLLM()
+    results = _engine(retriever, llm).ask_many(["pertanyaan rusak", "pertanyaan sehat"])
+    assert results[0] == {"question": "pertanyaan rusak", "error": "backend menolak pertanyaan"}
+    assert results[1]["answer"] == "jawaban untuk pertanyaan sehat"
+
+
+def test_run_batch_writes_jsonl(tmp_path, retriever):
+    path = tmp_path / "pertanyaan.jsonl"
+    path.write_text('{"id": "q1", "question": "apa ZX-1?"}\n\n{"question": "pertanyaan rusak"}\n',
+                    encoding="utf-8")
+    items = read_questions(str(path))
+    assert items == [("q1", "apa ZX-1?"), (None, "pertanyaan rusak")]
+
+    output = io.StringIO()
+    stats = asyncio.run(run_batch(_engine(retriever, _CountingLLM()), items, output, include_sources=False))
+    records = sorted((json.loads(line) for line in output.getvalue().splitlines()), key=lambda r: r["index"])
+    assert records[0] == {"index": 0, "id": "q1", "question": "apa ZX-1?", "answer": "jawaban untuk apa ZX-1?"}
+    assert records[1]["error"] == "backend menolak pertanyaan"
+    assert (stats["questions"], stats["errors"]) == (2, 1)
+
+
+def test_jsonl_line_without_question_is_rejected(tmp_path):
+    path = tmp_path / "rusak.jsonl"
+    path.write_text('{"id": "q1"}\n', encoding="utf-8")
+    with pytest.raises(ValueError, match="Baris 1"):
+        read_questions(str(path))
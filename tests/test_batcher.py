@@ -0,0 +1,94 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from myrag_chatbot.benchmark.fakes import HashEmbeddings
+from myrag_chatbot.embedder.batcher import MicroBatchingEmbeddings
+
+
+class _RecordingEmbeddings(HashEmbeddings):
+    def __init__(self, **kwargs):
+        super().__init__(dimension=32, **kwargs)
+        self.batches = []
+        self._record_lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self._record_lock:
+            self.batches.append(list(texts))
+        return super().embed_documents(texts)
+
+
+class _FailingEmbeddings(HashEmbeddings):
+    def embed_documents(self, texts):
+        raise RuntimeError("provider tidak tersedia")
+
+
+@pytest.fixture
+def batcher():
+    provider = _RecordingEmbeddings(delay_per_call=0.02)
+    batcher = MicroBatchingEmbeddings(provider, max_batch_size=8, max_wait_seconds=0.02, max_in_flight=1)
+    yield batcher
+    batcher.close()
+
+
+def test_concurrent_queries_are_coalesced(batcher):
+    questions = [f"pertanyaan {i}" for i in range(40)]
+    with ThreadPoolExecutor(max_workers=40) as pool:
+        vectors = list(pool.map(batcher.embed_query, questions))
+
+    provider = batcher.underlying
+    assert vectors == [provider._embed(question) for question in questions]
+    assert len(provider.batches) < len(questions)
+    assert all(len(batch) <= 8 for batch in provider.batches)
+    stats = batcher.stats()
+    assert stats["queries"] == 40
+    assert stats["batches"] == len(provider.batches)
+    assert stats["mean_batch_size"] > 1
+
+
+def test_duplicate_questions_share_one_slot(batcher):
+    futures = [batcher.submit_query("pertanyaan sama") for _ in range(5)]
+    vectors = [future.result(timeout=5) for future in futures]
+    assert all(vector == vectors[0] for vector in vectors)
+    assert batcher.underlying.batches == [["pertanyaan sama"]]
+
+
+def test_async_queries_are_coalesced(batcher):
+    async def _ask_all():
+        return await asyncio.gather(*(batcher.aembed_query(f"tanya {i}") for i in range(8)))
+
+    vectors = asyncio.run(_ask_all())
+    assert len(vectors) == 8
+    assert len(batcher.underlying.batches) < 8
+
+
+def test_provider_error_reaches_every_caller():
+    batcher = MicroBatchingEmbeddings(_FailingEmbeddings(), max_batch_size=4, max_wait_seconds=0.02)
+    try:
+        futures = [batcher.submit_query(f"q{i}") for i in range(3)]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="provider tidak tersedia"):
+                future.result(timeout=5)
+    finally:
+        batcher.close()
+
+
+def test_documents_bypass_the_queue(batcher):
+    assert batcher.embed_documents(["dokumen a", "dokumen b"]) == batcher.underlying.embed_documents(
+        ["dokumen a", "dokumen b"])
+    assert batcher.stats()["batches"] == 0
+
+
+def test_close_sends_queued_queries_first():
+    provider = _RecordingEmbeddings(delay_per_call=0.05)
+    batcher = MicroBatchingEmbeddings(provider, max_batch_size=2, max_wait_seconds=0.01, max_in_flight=1)
+    futures = [batcher.submit_query(f"antre {i}") for i in range(10)]
+    batcher.close()
+    assert all(future.done() for future in futures)
+    assert [future.result() for future in futures] == [provider._embed(f"antre {i}") for i in range(10)]
+
+    # Objek tetap bisa dipakai setelah ditutup; dispatcher dibuat ulang
+    assert batcher.embed_query("lagi") == provider._embed("lagi")
+    batcher.close()
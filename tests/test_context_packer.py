@@ -0,0 +1,70 @@
+from langchain_core.documents import Document
+
+from myrag_chatbot.chatbot.context import ContextPacker, context_budget_for, estimate_tokens
+
+
+def _sentences(prefix: str, count: int) -> str:
+    return " ".join(f"{prefix} kalimat nomor {index} berisi fakta penting." for index in range(count))
+
+
+def _doc(text: str, source: str = "laporan.pdf") -> Document:
+    return Document(page_content=text, metadata={"source": source})
+
+
+def test_budget_per_provider():
+    assert context_budget_for("ollama") < context_budget_for("openai") < context_budget_for("gemini")
+    assert context_budget_for("fake") == 2000
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcde") == 2
+
+
+def test_documents_fit_the_token_budget():
+    documents = [_doc(_sentences(f"dok{index}", 20), source=f"{index}.pdf") for index in range(6)]
+    packer = ContextPacker(max_tokens=400)
+    packed = packer.pack(documents)
+
+    assert packed.tokens <= 400
+    assert sum(estimate_tokens(doc.page_content) for doc in packed.documents) == packed.tokens
+    # Urutan relevansi dipertahankan; chunk yang tidak muat dibuang
+    assert [doc.metadata["source"] for doc in packed.documents] == ["0.pdf", "1.pdf"]
+    assert packed.dropped_documents == 4
+    # Chunk terakhir dipotong di akhir kalimat
+    assert packed.documents[-1].page_content.endswith("penting.")
+    assert packed.trimmed_characters > 0
+
+
+def test_overlapping_chunks_are_deduplicated():
+    shared = "Bagian yang tumpang tindih antara dua chunk berurutan di halaman sama."
+    first = _doc("Awal laporan tahunan perusahaan. " + shared)
+    second = _doc(shared + " Lanjutan laporan tentang pendapatan kuartal ketiga.")
+    duplicate = _doc("Awal laporan tahunan perusahaan.")
+    other_source = _doc(shared, source="lain.pdf")
+
+    packed = ContextPacker().pack([first, second, duplicate, other_source])
+
+    texts = [doc.page_content for doc in packed.documents]
+    assert texts[0] == first.page_content
+    assert texts[1] == "Lanjutan laporan tentang pendapatan kuartal ketiga."
+    # Chunk yang seluruhnya sudah ada dibuang; sumber lain tidak dianggap duplikat
+    assert texts[2] == shared
+    assert packed.dropped_documents == 1
+    assert packed.text.count(shared) == 2
+
+
+def test_web_results_get_a_share_of_the_budget():
+    documents = [_doc(_sentences("dok", 40))]
+    web_results = [{"url": "https://contoh.id", "content": _sentences("web", 40)}, "hasil kedua"]
+    packed = ContextPacker(max_tokens=500, web_share=0.3).pack(documents, web_results)
+
+    web_tokens = sum(estimate_tokens(item) for item in packed.web_results)
+    assert web_tokens <= 150
+    assert packed.web_results[0].startswith("[https://contoh.id] web kalimat")
+    assert packed.tokens <= 500
+    assert "Informasi dari internet:\n- [https://contoh.id]" in packed.text
+
+
+def test_empty_input():
+    packed = ContextPacker().pack([])
+    assert packed.documents == [] and packed.web_results == []
+    assert packed.tokens == 0
+    assert packed.text == "Informasi dari dokumen:\n"
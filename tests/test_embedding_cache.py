@@ -0,0 +1,86 @@
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+from myrag_chatbot.embedder.cache import CachedEmbeddings
+
+
+class _AsymmetricEmbeddings(Embeddings):
+    """Provider dengan embedding query yang berbeda dari embedding dokumen (seperti Gemini)."""
+
+    def __init__(self):
+        self.document_calls: List[List[str]] = []
+        self.query_calls: List[str] = []
+
+    def embed_documents(self, texts):
+        self.document_calls.append(list(texts))
+        return [[float(len(text)), 0.0] for text in texts]
+
+    def embed_query(self, text):
+        self.query_calls.append(text)
+        return [0.0, float(len(text))]
+
+
+def _cache(tmp_path, underlying, **kwargs):
+    return CachedEmbeddings(underlying, provider="uji", model_name="model-a",
+                            cache_path=str(tmp_path / "embeddings.sqlite3"), **kwargs)
+
+
+def test_documents_are_embedded_once(tmp_path):
+    provider = _AsymmetricEmbeddings()
+    cache = _cache(tmp_path, provider)
+    first = cache.embed_documents(["satu", "dua", "satu"])
+    second = cache.embed_documents(["dua", "tiga"])
+    assert first == [[4.0, 0.0], [3.0, 0.0], [4.0, 0.0]]
+    assert second == [[3.0, 0.0], [4.0, 0.0]]
+    assert provider.document_calls == [["satu", "dua"], ["tiga"]]
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 4)
+
+
+def test_query_and_document_namespaces_are_separate(tmp_path):
+    provider = _AsymmetricEmbeddings()
+    cache = _cache(tmp_path, provider)
+    assert cache.embed_documents(["halo"]) == [[4.0, 0.0]]
+    # Teks yang sama sebagai pertanyaan tidak boleh memakai vektor dokumen dari cache
+    assert cache.embed_query("halo") == [0.0, 4.0]
+    assert cache.embed_query("halo") == [0.0, 4.0]
+    assert cache.embed_documents(["halo"]) == [[4.0, 0.0]]
+    assert provider.query_calls == ["halo"]
+    assert provider.document_calls == [["halo"]]
+
+
+def test_embed_queries_uses_embed_query_for_asymmetric_provider(tmp_path):
+    provider = _AsymmetricEmbeddings()
+    cache = _cache(tmp_path, provider)
+    cache.embed_query("a")
+    assert cache.embed_queries(["a", "bb", "ccc"]) == [[0.0, 1.0], [0.0, 2.0], [0.0, 3.0]]
+    assert provider.document_calls == []
+    assert provider.query_calls == ["a", "bb", "ccc"]
+
+
+def test_embed_queries_batches_when_provider_allows(tmp_path):
+    provider = _AsymmetricEmbeddings()
+    cache = _cache(tmp_path, provider, batch_queries=True)
+    cache.embed_query("a")
+    cache.embed_queries(["a", "bb", "ccc"])
+    assert provider.query_calls == ["a"]
+    assert provider.document_calls == [["bb", "ccc"]]
+    # Hasil batch masuk ke namespace query, bukan dokumen
+    cache.embed_documents(["bb"])
+    assert provider.document_calls == [["bb", "ccc"], ["bb"]]
+
+
+def test_cache_persists_and_is_keyed_by_model(tmp_path):
+    provider = _AsymmetricEmbeddings()
+    cache = _cache(tmp_path, provider)
+    cache.embed_documents(["tersimpan"])
+    cache.close()
+
+    reopened = _cache(tmp_path, provider)
+    assert reopened.embed_documents(["tersimpan"]) == [[9.0, 0.0]]
+    assert provider.document_calls == [["tersimpan"]]
+
+    other_model = CachedEmbeddings(provider, provider="uji", model_name="model-b",
+                                   cache_path=str(tmp_path / "embeddings.sqlite3"))
+    other_model.embed_documents(["tersimpan"])
+    assert provider.document_calls == [["tersimpan"], ["tersimpan"]]
@@ -0,0 +1,92 @@
+import pytest
+
+from myrag_chatbot.benchmark.fakes import FakeCrossEncoder, HashEmbeddings
+from myrag_chatbot.retriever.bm25_index import IndexedVectorStore
+from myrag_chatbot.retriever.hybrid import HybridRetriever, reciprocal_rank_fusion
+from myrag_chatbot.retriever.reranker import CrossEncoderReranker
+
+
+class _RecordingCrossEncoder(FakeCrossEncoder):
+    def __init__(self):
+        super().__init__()
+        self.pairs = []
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        self.pairs.extend(pairs)
+        return super().predict(pairs, batch_size, show_progress_bar)
+
+
+def test_rrf_orders_by_summed_reciprocal_rank():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "b", "d"]], [1.0, 1.0], rrf_k=60)
+    # b dan c muncul di kedua peringkat sehingga mengalahkan a dan d
+    assert [doc_id for doc_id, _ in fused] == ["c", "b", "a", "d"]
+    scores = dict(fused)
+    assert scores["b"] == pytest.approx(1 / 62 + 1 / 62)
+    assert scores["c"] == pytest.approx(1 / 63 + 1 / 61)
+    assert scores["a"] == pytest.approx(1 / 61)
+    assert [score for _, score in fused] == sorted(scores.values(), reverse=True)
+
+
+def test_rrf_weights_shift_the_winner():
+    rankings = [["dense"], ["lexical"]]
+    assert reciprocal_rank_fusion(rankings, [2.0, 1.0])[0][0] == "dense"
+    assert reciprocal_rank_fusion(rankings, [1.0, 2.0])[0][0] == "lexical"
+
+
+@pytest.fixture
+def indexed_store(tmp_path):
+    texts = [
+        "Kode produk ZX-4411 dipegang tim Garuda di Surabaya.",
+        "Tim Alpha menangani pelanggan di Jakarta setiap Senin.",
+        "Laporan cuaca: angin kencang dan ombak tinggi di pantai.",
+        "Kode produk QR-1200 dipegang tim Elang di Medan.",
+        "Jadwal rapat tim Borneo dipindah ke hari Kamis.",
+    ]
+    return IndexedVectorStore.from_texts(texts, HashEmbeddings(dimension=64), persist_directory=str(tmp_path))
+
+
+def test_from_texts_indexes_both_dense_and_lexical(indexed_store):
+    assert len(indexed_store.lexical_index) == 5
+    hits = indexed_store.lexical_index.search("ZX-4411", k=1)
+    assert indexed_store.get_by_ids([hits[0][0]])[0].page_content.startswith("Kode produk ZX-4411")
+
+
+def test_hybrid_retriever_finds_exact_codes(indexed_store):
+    retriever = HybridRetriever(vectorstore=indexed_store, lexical_index=indexed_store.lexical_index, k=2, fetch_k=5)
+    docs = retriever.invoke("siapa pemegang QR-1200?")
+    assert len(docs) == 2
+    assert "QR-1200" in docs[0].page_content
+
+
+def test_reranker_scores_fused_candidates(indexed_store):
+    cross_encoder = _RecordingCrossEncoder()
+    reranker = CrossEncoderReranker(cross_encoder=cross_encoder, skip_margin=None)
+    retriever = HybridRetriever(vectorstore=indexed_store, lexical_index=indexed_store.lexical_index, k=1,
+                                fetch_k=5, reranker=reranker, rerank_top_n=3)
+    query = "tim Elang di Medan"
+    stored = indexed_store.similarity_search("kode tim", k=5)
+    docs = {word: next(doc for doc in stored if word in doc.page_content)
+            for word in ("ZX-4411", "QR-1200", "Alpha", "Borneo")}
+    dense = [docs["ZX-4411"], docs["QR-1200"], docs["Alpha"]]
+    lexical = [(docs["QR-1200"].id, 3.0), (docs["Borneo"].id, 1.0)]
+
+    candidates, agree = retriever._fuse(dense, lexical)
+    assert not agree
+    assert [doc.id for doc in candidates] == [docs["QR-1200"].id, docs["ZX-4411"].id, docs["Borneo"].id]
+    selected = retriever._select(query, dense, lexical)
+    # Cross-encoder hanya menilai kandidat hasil fusi, bukan seluruh hasil dense
+    assert [passage for _, passage in cross_encoder.pairs] == [doc.page_content for doc in candidates]
+    assert [doc.id for doc in selected] == [docs["QR-1200"].id]
+
+
+def test_rerank_skipped_when_rankings_agree(indexed_store):
+    cross_encoder = _RecordingCrossEncoder()
+    reranker = CrossEncoderReranker(cross_encoder=cross_encoder, skip_margin=None)
+    retriever = HybridRetriever(vectorstore=indexed_store, lexical_index=indexed_store.lexical_index, k=2,
+                                fetch_k=5, reranker=reranker)
+    dense = indexed_store.similarity_search("ombak tinggi di pantai", k=3)
+    lexical = [(dense[0].id, 5.0)]
+    selected = retriever._select("ombak tinggi di pantai", dense, lexical)
+    assert cross_encoder.pairs == []
+    assert reranker.skipped == 1
+    assert selected[0].id == dense[0].id
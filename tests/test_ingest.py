@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+from myrag_chatbot.benchmark.corpus import write_pdf
+from myrag_chatbot.benchmark.fakes import HashEmbeddings
+from myrag_chatbot.ingestion import ingest
+from myrag_chatbot.ingestion.ingest import ingest_file, remove_file
+from myrag_chatbot.ingestion.manifest import IngestionManifest
+from myrag_chatbot.loaders.loaders import iter_documents
+from myrag_chatbot.retriever.numpy_store import NumpyVectorStore
+
+
+def _page(number: int) -> str:
+    return " ".join(f"halaman{number} kata{index} kode-{number}-{index}." for index in range(60))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return NumpyVectorStore(persist_directory=str(tmp_path / "index"), embedding=HashEmbeddings(dimension=64))
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    return IngestionManifest(str(tmp_path / "manifest.json"))
+
+
+def _touch(path: str) -> None:
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000))
+
+
+@pytest.mark.parametrize("offset_splitter", [False, True])
+def test_pdf_is_streamed_page_by_page(tmp_path, store, manifest, monkeypatch, offset_splitter):
+    path = str(tmp_path / "laporan.pdf")
+    write_pdf(path, [_page(number) for number in range(6)])
+    events = []
+
+    def _lazy(file_path):
+        for document in iter_documents(file_path):
+            events.append(("page", document.metadata["page"]))
+            yield document
+
+    add_documents = store.add_documents
+
+    def _add_documents(documents, **kwargs):
+        events.append(("batch", len(documents)))
+        return add_documents(documents, **kwargs)
+
+    monkeypatch.setattr(ingest, "iter_documents", _lazy)
+    monkeypatch.setattr(store, "add_documents", _add_documents)
+    progress = []
+    result = ingest_file(path, store, manifest, chunk_size=300, chunk_overlap=30, batch_size=4,
+                         on_batch=progress.append, offset_splitter=offset_splitter)
+
+    assert result["status"] == "indexed"
+    assert result["added"] == result["total"] > 4
+    # Batch pertama tersimpan sebelum halaman terakhir dibaca
+    assert events.index(("batch", 4)) < events.index(("page", 5))
+    assert [item["added"] for item in progress] == sorted(item["added"] for item in progress)
+    assert progress[-1]["added"] == result["added"]
+    assert progress[-1]["pages"] == progress[-1]["pages_total"] == 6
+    assert progress[0]["pages"] < 6
+    assert "kode-3-7." in store.similarity_search("halaman3 kata7 kode-3-7", k=1)[0].page_content
+    assert len(manifest.get(path)["chunks"]) == result["total"]
+
+
+def test_incremental_reingest(tmp_path, store, manifest):
+    path = str(tmp_path / "catatan.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n\n".join(_page(number) for number in range(3)))
+    first = ingest_file(path, store, manifest, chunk_size=300, chunk_overlap=30, batch_size=5)
+    assert first["status"] == "indexed"
+
+    assert ingest_file(path, store, manifest, chunk_size=300, chunk_overlap=30)["status"] == "skipped"
+    _touch(path)
+    assert ingest_file(path, store, manifest, chunk_size=300, chunk_overlap=30)["status"] == "unchanged"
+
+    # Halaman terakhir diganti: hanya chunk baru yang di-embed, chunk lama yang hilang dihapus
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n\n".join(_page(number) for number in (0, 1, 9)))
+    _touch(path)
+    second = ingest_file(path, store, manifest, chunk_size=300, chunk_overlap=30, batch_size=5)
+    assert second["status"] == "indexed"
+    assert 0 < second["added"] < first["total"]
+    assert second["deleted"] > 0
+    chunk_ids = manifest.get(path)["chunks"]
+    assert len(chunk_ids) == second["total"]
+    assert len(store.get_by_ids(chunk_ids)) == second["total"]
+    assert all("halaman2" not in doc.page_content for doc in store.similarity_search("halaman2 kata5", k=10))
+
+    assert remove_file(path, store, manifest) == second["total"]
+    assert store.get_by_ids(chunk_ids) == []
+    assert manifest.get(path) is None
@@ -0,0 +1,136 @@
+import threading
+
+import pytest
+
+from myrag_chatbot.ingestion.jobs import DONE, FAILED, QUEUED, RUNNING, IngestionJobQueue
+
+
+def _wait(event: threading.Event) -> None:
+    assert event.wait(timeout=5)
+
+
+def test_status_and_progress_transitions():
+    started, batch_reported, release = threading.Event(), threading.Event(), threading.Event()
+
+    def _runner(job, on_batch):
+        started.set()
+        on_batch({"added": 4, "new": 4, "total": 6, "pages": 1, "pages_total": 4})
+        batch_reported.set()
+        _wait(release)
+        on_batch({"added": 8, "new": 8, "total": 12, "pages": 4, "pages_total": 4})
+        return {"status": "indexed", "added": 8, "deleted": 1, "total": 12}
+
+    done = threading.Event()
+    jobs = IngestionJobQueue(_runner, max_workers=1)
+    try:
+        job = jobs.submit("laporan.pdf", on_done=lambda _: done.set(), chunk_size=500)
+        assert job.options == {"chunk_size": 500}
+        _wait(started)
+        _wait(batch_reported)
+        assert job.status == RUNNING
+        assert (job.chunks_added, job.chunks_total) == (4, 6)
+        assert job.progress == pytest.approx(0.25)
+
+        release.set()
+        _wait(done)
+        assert job.status == DONE
+        assert job.finished
+        assert job.progress == 1.0
+        assert job.result["deleted"] == 1
+        snapshot = job.snapshot()
+        assert snapshot["file"] == "laporan.pdf"
+        assert (snapshot["chunks_added"], snapshot["chunks_total"]) == (8, 12)
+        assert jobs.get(job.job_id) is job
+    finally:
+        jobs.shutdown()
+
+
+def test_queued_job_waits_for_free_worker():
+    release = threading.Event()
+
+    def _runner(job, on_batch):
+        _wait(release)
+        return {"status": "indexed", "added": 0, "deleted": 0, "total": 0}
+
+    jobs = IngestionJobQueue(_runner, max_workers=1)
+    try:
+        first = jobs.submit("a.txt")
+        second = jobs.submit("b.txt")
+        assert second.status == QUEUED
+        assert second.progress == 0.0
+        release.set()
+        jobs.shutdown(wait=True)
+        assert [first.status, second.status] == [DONE, DONE]
+    finally:
+        release.set()
+        jobs.shutdown()
+
+
+def test_progress_without_page_count_stays_at_zero_until_done():
+    reported, release = threading.Event(), threading.Event()
+
+    def _runner(job, on_batch):
+        on_batch({"added": 3, "new": 3, "total": 3, "pages": 1, "pages_total": 0})
+        reported.set()
+        _wait(release)
+        return {"status": "indexed", "added": 3, "deleted": 0, "total": 3}
+
+    jobs = IngestionJobQueue(_runner, max_workers=1)
+    try:
+        job = jobs.submit("catatan.txt")
+        _wait(reported)
+        assert job.chunks_added == 3
+        assert job.progress == 0.0
+        release.set()
+        jobs.shutdown(wait=True)
+        assert job.progress == 1.0
+    finally:
+        release.set()
+        jobs.shutdown()
+
+
+def test_failed_job_records_error_and_calls_on_done():
+    finished = []
+
+    def _runner(job, on_batch):
+        raise ValueError("Format file tidak didukung")
+
+    jobs = IngestionJobQueue(_runner, max_workers=1)
+    job = jobs.submit("gambar.png", on_done=finished.append)
+    jobs.shutdown(wait=True)
+    assert job.status == FAILED
+    assert job.error == "Format file tidak didukung"
+    assert job.finished
+    assert finished == [job]
+
+
+def test_full_queue_rejects_new_jobs():
+    release = threading.Event()
+
+    def _runner(job, on_batch):
+        _wait(release)
+        return {"status": "indexed", "added": 0, "deleted": 0, "total": 0}
+
+    jobs = IngestionJobQueue(_runner, max_workers=1, max_queued=2)
+    try:
+        jobs.submit("a.txt")
+        jobs.submit("b.txt")
+        with pytest.raises(RuntimeError):
+            jobs.submit("c.txt")
+    finally:
+        release.set()
+        jobs.shutdown()
+
+
+def test_finished_jobs_are_pruned():
+    finished = threading.Semaphore(0)
+    jobs = IngestionJobQueue(lambda job, on_batch: {"added": 0, "total": 0}, max_workers=1, keep_finished=2)
+    try:
+        submitted = [jobs.submit(f"{i}.txt", on_done=lambda _: finished.release()) for i in range(3)]
+        for _ in submitted:
+            assert finished.acquire(timeout=5)
+        jobs.submit("terakhir.txt")
+        assert jobs.get(submitted[0].job_id) is None
+        assert [job.file_path for job in jobs.jobs()] == ["1.txt", "2.txt", "terakhir.txt"]
+    finally:
+        jobs.shutdown()
@@ -0,0 +1,122 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from myrag_chatbot.benchmark.fakes import FakeLLM, HashEmbeddings
+from myrag_chatbot.chatbot.chatbot_engine import ChatbotEngine
+from myrag_chatbot.chatbot.router import LLMRouter
+from myrag_chatbot.metrics.exporters import FileExporter, start_http_server
+from myrag_chatbot.metrics.metrics import MetricsRegistry, get_metrics
+from myrag_chatbot.retriever.numpy_store import NumpyVectorStore
+
+
+def test_render_prometheus_counters_and_histograms():
+    metrics = MetricsRegistry(buckets=(0.1, 1.0))
+    metrics.describe("myrag_uji_total", "Counter uji.")
+    metrics.inc("myrag_uji_total", 2, cache="answer")
+    metrics.inc("myrag_uji_total", cache="answer")
+    metrics.observe("myrag_uji_seconds", 0.05, stage="llm")
+    metrics.observe("myrag_uji_seconds", 0.5, stage="llm")
+    metrics.observe("myrag_uji_seconds", 5.0, stage="llm")
+
+    lines = metrics.render_prometheus().splitlines()
+    assert lines[:3] == [
+        "# HELP myrag_uji_total Counter uji.",
+        "# TYPE myrag_uji_total counter",
+        'myrag_uji_total{cache="answer"} 3.0',
+    ]
+    # Bucket kumulatif, dengan +Inf sama dengan jumlah observasi
+    assert 'myrag_uji_seconds_bucket{stage="llm",le="0.1"} 1' in lines
+    assert 'myrag_uji_seconds_bucket{stage="llm",le="1.0"} 2' in lines
+    assert 'myrag_uji_seconds_bucket{stage="llm",le="+Inf"} 3' in lines
+    assert 'myrag_uji_seconds_count{stage="llm"} 3' in lines
+    assert 'myrag_uji_seconds_sum{stage="llm"} 5.55' in lines
+
+
+def test_label_values_are_escaped():
+    metrics = MetricsRegistry()
+    metrics.inc("myrag_uji_total", file='laporan "akhir"\\baru\n')
+    assert 'myrag_uji_total{file="laporan \\"akhir\\"\\\\baru\\n"} 1.0' in metrics.render_prometheus()
+
+
+def test_span_records_duration_and_errors():
+    metrics = MetricsRegistry()
+    events = []
+    hook = events.append
+    metrics.add_hook(hook)
+    with metrics.span("retrieval"):
+        pass
+    with pytest.raises(ValueError):
+        with metrics.span("llm", model="fake"):
+            raise ValueError("gagal")
+
+    snapshot = metrics.snapshot()
+    stages = snapshot["histograms"]["myrag_stage_seconds"]
+    assert stages['{stage="retrieval"}']["count"] == 1
+    assert stages['{model="fake",stage="llm"}']["count"] == 1
+    assert snapshot["counters"]["myrag_errors_total"] == {'{model="fake",stage="llm"}': 1.0}
+    assert [(event["type"], event["name"]) for event in events] == [
+        ("histogram", "myrag_stage_seconds"),
+        ("counter", "myrag_errors_total"),
+        ("histogram", "myrag_stage_seconds"),
+    ]
+
+    metrics.remove_hook(hook)
+    metrics.inc("myrag_uji_total")
+    assert len(events) == 3
+
+
+def test_failing_hook_does_not_break_measurement():
+    metrics = MetricsRegistry()
+
+    def _broken(event):
+        raise RuntimeError("hook rusak")
+
+    metrics.add_hook(_broken)
+    metrics.observe("myrag_uji_seconds", 0.2)
+    assert metrics.snapshot()["histograms"]["myrag_uji_seconds"][""]["count"] == 1
+
+
+def test_file_exporter_writes_prometheus_text(tmp_path):
+    metrics = MetricsRegistry()
+    metrics.inc("myrag_uji_total")
+    path = tmp_path / "metrics" / "myrag.prom"
+    exporter = FileExporter(str(path), interval=60.0, metrics=metrics).start()
+    metrics.inc("myrag_uji_total")
+    exporter.stop()
+    assert path.read_text(encoding="utf-8") == metrics.render_prometheus()
+    assert [p.name for p in path.parent.iterdir()] == ["myrag.prom"]
+
+
+def test_http_endpoint_serves_metrics():
+    metrics = MetricsRegistry()
+    metrics.inc("myrag_uji_total")
+    server = start_http_server(0, host="127.0.0.1", metrics=metrics)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{url}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert "myrag_uji_total 1.0" in response.read().decode("utf-8")
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{url}/lain", timeout=5)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_ttft_is_recorded_once_per_answer_with_router(tmp_path):
+    store = NumpyVectorStore(persist_directory=str(tmp_path / "index"), embedding=HashEmbeddings(dimension=64))
+    store.add_texts(["Kode proyek ZX-4411 dipegang tim Garuda."])
+    metrics = get_metrics()
+    metrics.reset()
+    engine = ChatbotEngine(retriever=store.as_retriever(search_kwargs={"k": 1}), llm_model="fake",
+                           metrics=metrics, llm=LLMRouter([("utama", FakeLLM(delay=0.0))], ttft_timeout=None))
+    engine.ask("siapa pemegang ZX-4411?")
+
+    histograms = metrics.snapshot()["histograms"]
+    # Router mencatat TTFT per backend, engine mencatat TTFT jawaban dengan nama sendiri
+    llm_ttft = histograms["myrag_llm_ttft_seconds"]
+    assert list(llm_ttft) == ['{model="utama"}']
+    assert llm_ttft['{model="utama"}']["count"] == 1
+    assert histograms["myrag_answer_ttft_seconds"]['{model="fake"}']["count"] == 1
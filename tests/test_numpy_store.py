@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from myrag_chatbot.benchmark.fakes import HashEmbeddings
+from myrag_chatbot.retriever.numpy_store import NumpyVectorStore
+
+
+class _TableEmbeddings(Embeddings):
+    """Embedding dari tabel tetap: teks "v<i>" dipetakan ke baris ke-i."""
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+
+    def embed_documents(self, texts):
+        return [self.vectors[int(text[1:])].tolist() for text in texts]
+
+    def embed_query(self, text):
+        return self.vectors[int(text[1:])].tolist()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return NumpyVectorStore(persist_directory=str(tmp_path / "index"), embedding=HashEmbeddings(dimension=64))
+
+
+def test_add_and_search_returns_matching_scores(store):
+    texts = ["kode produk ALPHA-1 di Jakarta", "tim Borneo bertugas di Medan", "ombak besar di pulau karang"]
+    ids = store.add_texts(texts, metadatas=[{"n": i} for i in range(3)], ids=["a", "b", "c"])
+    assert ids == ["a", "b", "c"]
+
+    results = store.similarity_search_with_score("tim Borneo di Medan", k=3)
+    assert results[0][0].id == "b"
+    assert results[0][0].metadata == {"n": 1}
+    scores = [score for _, score in results]
+    assert scores == sorted(scores, reverse=True)
+    query = np.asarray(store.embedding.embed_query("tim Borneo di Medan"))
+    query /= np.linalg.norm(query)
+    for doc, score in results:
+        vector = np.asarray(store.embedding.embed_documents([doc.page_content])[0])
+        assert score == pytest.approx(float(vector @ query / np.linalg.norm(vector)), abs=1e-5)
+
+
+def test_upsert_same_id_replaces_document(store):
+    store.add_texts(["versi lama"], ids=["x"])
+    store.add_texts(["versi baru"], ids=["x"])
+    assert [doc.page_content for doc in store.get_by_ids(["x"])] == ["versi baru"]
+    assert [doc.id for doc in store.similarity_search("versi", k=5)] == ["x"]
+
+
+def test_delete_hides_rows_from_search(store):
+    store.add_texts(["apel merah", "apel hijau", "jeruk"], ids=["1", "2", "3"])
+    assert store.delete(["1", "tidak-ada"]) is True
+    assert store.delete(["tidak-ada"]) is False
+    found = [doc.id for doc in store.similarity_search("apel merah", k=3)]
+    assert "1" not in found
+    assert sorted(found) == ["2", "3"]
+    assert store.get_by_ids(["1", "2"])[0].id == "2"
+
+
+def test_reload_from_disk_and_other_instance(tmp_path):
+    directory = str(tmp_path / "index")
+    embedding = HashEmbeddings(dimension=64)
+    writer = NumpyVectorStore(persist_directory=directory, embedding=embedding)
+    writer.add_texts([f"dokumen nomor {i}" for i in range(50)], ids=[str(i) for i in range(50)])
+    writer.delete(["7"])
+
+    reader = NumpyVectorStore(persist_directory=directory, embedding=embedding, read_only=True)
+    assert [doc.id for doc in reader.similarity_search("dokumen nomor 3", k=1)] == ["3"]
+    assert reader.get_by_ids(["7"]) == []
+
+    # Data baru dari instance lain terlihat tanpa membuka ulang (deteksi lewat mtime)
+    writer.add_texts(["catatan rahasia zebra"], ids=["baru"])
+    assert reader.similarity_search("catatan rahasia zebra", k=1)[0].id == "baru"
+
+
+def test_batch_search_matches_single_search(store):
+    store.add_texts([f"laporan tim {name}" for name in ("Alpha", "Borneo", "Cendana", "Dahlia")],
+                    ids=["a", "b", "c", "d"])
+    queries = ["tim Borneo", "tim Dahlia"]
+    vectors = [store.embedding.embed_query(query) for query in queries]
+    batched = store.batch_similarity_search_by_vector(vectors, k=2)
+    for vector, results in zip(vectors, batched):
+        single = store.similarity_search_with_score_by_vector(vector, k=2)
+        assert [doc.id for doc, _ in results] == [doc.id for doc, _ in single]
+        assert [score for _, score in results] == pytest.approx([score for _, score in single])
+
+
+def test_ivf_partitions_keep_recall(tmp_path):
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(16, 32))
+    vectors = (centers[rng.integers(0, 16, 2000)] + 0.3 * rng.normal(size=(2000, 32))).astype(np.float32)
+    embedding = _TableEmbeddings(vectors)
+    store = NumpyVectorStore(persist_directory=str(tmp_path / "ivf"), embedding=embedding, n_probe=4)
+    store.add_texts([f"v{i}" for i in range(len(vectors))], ids=[str(i) for i in range(len(vectors))])
+
+    queries = vectors[rng.choice(len(vectors), 50, replace=False)]
+    exact = [[doc.id for doc in store.similarity_search_by_vector(query.tolist(), k=10)] for query in queries]
+    assert store.build_partitions(n_lists=16) == 16
+
+    # Vektor yang ditambahkan setelah partisi dibangun tetap bisa ditemukan
+    store.add_texts(["v0"], ids=["salinan-0"])
+    recall = []
+    for query, expected in zip(queries, exact):
+        found = [doc.id for doc in store.similarity_search_by_vector(query.tolist(), k=10)]
+        recall.append(len(set(found) & set(expected)) / len(expected))
+    assert np.mean(recall) >= 0.9
+    assert "salinan-0" in [doc.id for doc in store.similarity_search_by_vector(vectors[0].tolist(), k=2)]
+
+    # Partisi tersimpan di disk dan dipakai lagi setelah dibuka ulang
+    reopened = NumpyVectorStore(persist_directory=str(tmp_path / "ivf"), embedding=embedding, n_probe=4)
+    for query in queries[:10]:
+        assert ([doc.id for doc in reopened.similarity_search_by_vector(query.tolist(), k=10)]
+                == [doc.id for doc in store.similarity_search_by_vector(query.tolist(), k=10)])
@@ -0,0 +1,84 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+import pytest
+
+from myrag_chatbot.benchmark.fakes import register_fake_providers
+from myrag_chatbot.registry.registry import ComponentRegistry, EngineConfig
+
+
+@pytest.fixture
+def config(tmp_path):
+    register_fake_providers(llm_delay=0.0)
+    return EngineConfig(llm_model="fake", embedding_model="fake", vector_backend="numpy",
+                        persist_directory=str(tmp_path / "index"), embedding_batch_wait=None)
+
+
+def _write(path, text: str) -> str:
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_sessions_share_heavy_components(config):
+    registry = ComponentRegistry()
+    first, second = registry.session(config), registry.session(config)
+    assert first.engine is second.engine
+    assert registry.vectorstore(config) is registry.vectorstore(config)
+
+    # Engine lain di koleksi yang sama tetap memakai embeddings dan vectorstore yang sama
+    hotter = replace(config, temperature=0.9)
+    assert registry.engine(hotter) is not first.engine
+    assert registry.embeddings(hotter) is registry.embeddings(config)
+    assert registry.vectorstore(hotter) is registry.vectorstore(config)
+    assert registry.retriever(hotter) is registry.retriever(config)
+
+
+def test_concurrent_sessions_create_one_engine(config):
+    registry = ComponentRegistry()
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        engines = list(pool.map(lambda _: registry.engine(config), range(32)))
+    assert all(engine is engines[0] for engine in engines)
+
+
+def test_ingestion_is_visible_to_every_session(config, tmp_path):
+    registry = ComponentRegistry()
+    first, second = registry.session(config), registry.session(replace(config, temperature=0.9))
+    cache = second.engine.answer_cache
+    cache.put("siapa pemegang proyek?", {"answer": "belum tahu", "sources": []})
+    generation = cache.generation
+
+    path = _write(tmp_path / "catatan.txt", "Kode proyek ZX-4411 dipegang tim Garuda di Surabaya.")
+    assert first.ingest_file(path)["status"] == "indexed"
+
+    # Retriever baru terpasang di kedua engine, dan jawaban lama di engine lain dibuang
+    assert first.engine.retriever is second.engine.retriever
+    assert "ZX-4411" in second.engine.retriever.invoke("ZX-4411 Garuda")[0].page_content
+    assert cache.generation > generation
+    assert cache.get("siapa pemegang proyek?") is None
+
+
+def test_clearing_caches_while_engines_are_created(config):
+    registry = ComponentRegistry()
+    registry.engine(config)
+    stop = threading.Event()
+    errors = []
+
+    def _clear():
+        while not stop.is_set():
+            try:
+                registry.clear_answer_caches(config)
+            except Exception as error:  # pragma: no cover - hanya terjadi jika tabel komponen tidak terkunci
+                errors.append(error)
+                return
+
+    cleaner = threading.Thread(target=_clear)
+    cleaner.start()
+    try:
+        for index in range(200):
+            registry.engine(replace(config, temperature=index / 1000))
+    finally:
+        stop.set()
+        cleaner.join()
+    assert errors == []
+    assert len(registry._engines_for(config)) == 201
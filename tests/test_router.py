@@ -0,0 +1,129 @@
+import asyncio
+import sys
+import time
+import types
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from myrag_chatbot.benchmark.fakes import FakeLLM
+from myrag_chatbot.chatbot.llm_providers import create_llm
+from myrag_chatbot.chatbot.router import LLMBackendConfig, LLMRouter
+
+
+def _failing(message: str = "server mati") -> RunnableLambda:
+    def _raise(_):
+        raise RuntimeError(message)
+
+    return RunnableLambda(_raise)
+
+
+class _BrokenStream(RunnableLambda):
+    """Backend yang gagal saat stream dibuat, sebelum iterator pertama."""
+
+    def stream(self, input, config=None, **kwargs):
+        raise ConnectionError("koneksi ditolak")
+
+
+def _names(router: LLMRouter):
+    return [backend.name for backend in router.ranked_backends()]
+
+
+def test_initial_order_follows_configuration():
+    router = LLMRouter([("a", FakeLLM()), ("b", FakeLLM()), ("c", FakeLLM())])
+    assert _names(router) == ["a", "b", "c"]
+
+
+def test_ranking_prefers_lower_latency_and_fewer_in_flight():
+    router = LLMRouter([("lambat", FakeLLM()), ("cepat", FakeLLM()), ("baru", FakeLLM())])
+    slow, fast, new = (backend.stats for backend in router.backends)
+    for _ in range(3):
+        slow.record_latency(1.0)
+        fast.record_latency(0.1)
+    # Backend tanpa sampel memakai median backend lain (0.55), bukan dianggap 0 detik
+    assert _names(router) == ["cepat", "baru", "lambat"]
+
+    for _ in range(6):
+        fast.started()
+    assert _names(router)[0] == "baru"
+
+
+def test_error_rate_moves_backend_down():
+    router = LLMRouter([("rusak", FakeLLM()), ("sehat", FakeLLM())], failure_threshold=100)
+    broken, healthy = (backend.stats for backend in router.backends)
+    broken.record_latency(0.05)
+    healthy.record_latency(0.2)
+    assert _names(router) == ["rusak", "sehat"]
+    broken.record_failure()
+    broken.record_success()
+    broken.record_failure()
+    assert broken.error_rate > router.max_error_rate
+    assert _names(router) == ["sehat", "rusak"]
+
+
+def test_failover_to_next_backend():
+    router = LLMRouter([("rusak", _failing()), ("cadangan", FakeLLM(delay=0.0))], ttft_timeout=None)
+    answer = router.invoke("apa ibu kota Indonesia")
+    assert "Indonesia" in answer
+    stats = router.stats()
+    assert stats["rusak"]["error_rate"] == 1.0
+    assert stats["cadangan"]["error_rate"] == 0.0
+    assert _names(router) == ["cadangan", "rusak"]
+
+
+def test_all_backends_failing_raises():
+    router = LLMRouter([("a", _failing("a mati")), ("b", _failing("b mati"))], ttft_timeout=None)
+    with pytest.raises(RuntimeError, match="b mati"):
+        router.invoke("halo")
+
+
+def test_circuit_breaker_rests_backend():
+    router = LLMRouter([("rusak", _failing()), ("cadangan", FakeLLM(delay=0.0))], failure_threshold=1,
+                       cooldown_seconds=60.0, ttft_timeout=None)
+    router.invoke("halo")
+    assert not router.backends[0].stats.healthy
+    assert _names(router) == ["cadangan", "rusak"]
+
+
+def test_hedging_uses_first_backend_to_produce_a_token():
+    router = LLMRouter([("lambat", FakeLLM(delay=1.0)), ("cepat", FakeLLM(delay=0.0))], ttft_timeout=0.05)
+    start = time.perf_counter()
+    answer = router.invoke("pertanyaan hedging")
+    assert "hedging" in answer
+    assert time.perf_counter() - start < 0.8
+    # Backend yang melewati batas TTFT dicatat lambat, jadi permintaan berikutnya mulai dari backend cepat
+    assert _names(router)[0] == "cepat"
+
+
+def test_async_failover():
+    router = LLMRouter([("rusak", _failing()), ("cadangan", FakeLLM(delay=0.0))], ttft_timeout=None)
+    answer = asyncio.run(router.ainvoke("apa kabar"))
+    assert "kabar" in answer
+    assert router.stats()["rusak"]["error_rate"] == 1.0
+
+
+def test_failover_when_stream_creation_fails():
+    router = LLMRouter([("putus", _BrokenStream(lambda _: "")), ("cadangan", FakeLLM(delay=0.0))],
+                       ttft_timeout=None)
+    assert "dijawab" in router.invoke("tetap dijawab")
+    stats = router.stats()
+    assert stats["putus"]["error_rate"] == 1.0
+    assert stats["putus"]["in_flight"] == 0
+    assert stats["cadangan"]["in_flight"] == 0
+
+
+def test_gemini_backend_accepts_base_url(monkeypatch):
+    created = {}
+
+    class _FakeChatGoogle:
+        def __init__(self, **kwargs):
+            created.update(kwargs)
+
+    monkeypatch.setenv("GOOGLE_API_KEY", "kunci-uji")
+    monkeypatch.setitem(sys.modules, "langchain_google_genai",
+                        types.SimpleNamespace(ChatGoogleGenerativeAI=_FakeChatGoogle))
+    config = LLMBackendConfig(name="gemini-proxy", provider="gemini", model="gemini-pro",
+                              base_url="proxy.example.com")
+    create_llm(config.provider, 0.1, model=config.model, base_url=config.base_url)
+    assert created["client_options"] == {"api_endpoint": "proxy.example.com"}
+    assert created["model"] == "gemini-pro"
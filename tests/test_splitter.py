@@ -0,0 +1,90 @@
+import random
+
+from langchain_core.documents import Document
+
+from myrag_chatbot.splitter.splitter import SourceText, iter_chunk_refs
+
+
+def _pages(count: int, seed: int = 0, source: str = "buku.pdf"):
+    rng = random.Random(seed)
+    words = ["ikan", "laut", "kapal", "angin", "pulau", "pasir", "ombak", "karang"]
+    pages = []
+    for page in range(count):
+        paragraphs = [" ".join(rng.choice(words) for _ in range(rng.randint(5, 60))) for _ in range(rng.randint(1, 4))]
+        pages.append(Document(page_content="\n\n".join(paragraphs), metadata={"source": source, "page": page}))
+    return pages
+
+
+def _source_text(pages):
+    return SourceText.PAGE_SEPARATOR.join(page.page_content for page in pages)
+
+
+def test_offsets_round_trip_to_source_text():
+    for seed in range(20):
+        pages = _pages(6, seed=seed)
+        text = _source_text(pages)
+        refs = list(iter_chunk_refs(iter(pages), chunk_size=200, chunk_overlap=40))
+        assert refs
+        for ref in refs:
+            assert text[ref.start:ref.end] == ref.text
+            assert 0 < len(ref.text) <= 200
+            assert not ref.text[0].isspace() and not ref.text[-1].isspace()
+
+
+def test_chunks_cover_source_in_order():
+    pages = _pages(5, seed=3)
+    text = _source_text(pages)
+    refs = list(iter_chunk_refs(pages, chunk_size=150, chunk_overlap=30))
+    starts = [ref.start for ref in refs]
+    assert starts == sorted(starts)
+    covered = [False] * len(text)
+    for ref in refs:
+        for position in range(ref.start, ref.end):
+            covered[position] = True
+    # Setiap karakter non-spasi masuk ke minimal satu chunk
+    assert all(covered[index] for index, char in enumerate(text) if not char.isspace())
+
+
+def test_page_span_matches_offsets():
+    pages = _pages(8, seed=7)
+    text = _source_text(pages)
+    page_offsets = []
+    offset = 0
+    for page in pages:
+        page_offsets.append(offset)
+        offset += len(page.page_content) + len(SourceText.PAGE_SEPARATOR)
+
+    def _page_at(position):
+        return max(index for index, start in enumerate(page_offsets) if start <= position)
+
+    for ref in iter_chunk_refs(pages, chunk_size=120, chunk_overlap=20):
+        assert ref.page_start == _page_at(ref.start)
+        assert ref.page_end == _page_at(ref.end - 1)
+        document = ref.to_document()
+        assert document.page_content == text[ref.start:ref.end]
+        assert document.metadata["start_index"] == ref.start
+        assert "page" not in ref.source.metadata
+
+
+def test_sources_are_split_separately():
+    pages = _pages(2, seed=1, source="a.pdf") + _pages(2, seed=2, source="b.pdf")
+    refs = list(iter_chunk_refs(pages, chunk_size=100, chunk_overlap=10))
+    assert [ref.doc_id for ref in refs] == sorted(ref.doc_id for ref in refs)
+    by_source = {"a.pdf": _source_text(pages[:2]), "b.pdf": _source_text(pages[2:])}
+    for ref in refs:
+        assert by_source[ref.doc_id][ref.start:ref.end] == ref.text
+
+
+def test_pages_are_read_lazily():
+    pages = _pages(50, seed=5)
+    read = []
+
+    def _lazy():
+        for page in pages:
+            read.append(page.metadata["page"])
+            yield page
+
+    refs = iter_chunk_refs(_lazy(), chunk_size=200, chunk_overlap=20)
+    first = next(refs)
+    assert first.start == 0
+    assert len(read) < len(pages)
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from myrag_chatbot.chatbot import web_search
+from myrag_chatbot.chatbot.web_search import CachedWebSearch, StubSearchBackend, create_web_search
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class _BlockingBackend(StubSearchBackend):
+    """Backend yang menunggu `release` sebelum menjawab, untuk menahan pencarian tetap berjalan."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def search(self, query):
+        assert self.release.wait(timeout=5)
+        return super().search(query)
+
+
+@pytest.fixture
+def make_search():
+    created = []
+
+    def _make(backend, **kwargs):
+        search = CachedWebSearch(backend, **kwargs)
+        created.append(search)
+        return search
+
+    yield _make
+    for search in created:
+        search.close()
+
+
+def _wait_until_cached(search: CachedWebSearch) -> None:
+    deadline = time.monotonic() + 5
+    while search.stats()["entries"] == 0:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_results_are_cached_until_ttl(make_search, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(web_search.time, "monotonic", clock.monotonic)
+    backend = StubSearchBackend(results={"cuaca jakarta": [{"url": "u", "content": "cerah"}]})
+    search = make_search(backend, ttl_seconds=60.0, deadline_seconds=None)
+
+    assert search.search("Cuaca Jakarta?") == [{"url": "u", "content": "cerah"}]
+    clock.now += 59.0
+    assert search.search("cuaca   jakarta") == [{"url": "u", "content": "cerah"}]
+    assert backend.calls == 1
+    clock.now += 2.0
+    search.search("cuaca jakarta")
+    assert backend.calls == 2
+    assert (search.stats()["hits"], search.stats()["misses"]) == (1, 2)
+
+
+def test_slow_search_falls_back_at_deadline_and_fills_cache(make_search):
+    backend = StubSearchBackend(delay=0.3)
+    search = make_search(backend, deadline_seconds=0.05)
+
+    start = time.perf_counter()
+    assert search.search("berita hari ini") is None
+    assert time.perf_counter() - start < 0.25
+    assert search.stats()["timeouts"] == 1
+
+    # Pencarian tetap berjalan di latar; permintaan berikutnya memakai hasilnya
+    _wait_until_cached(search)
+    assert search.search("berita hari ini")[0]["content"] == "Hasil pencarian tiruan untuk: berita hari ini"
+    assert backend.calls == 1
+
+
+def test_async_search_respects_deadline(make_search):
+    backend = StubSearchBackend(delay=0.3)
+    search = make_search(backend, deadline_seconds=0.05)
+    assert asyncio.run(search.asearch("kurs rupiah")) is None
+    assert search.stats()["timeouts"] == 1
+    _wait_until_cached(search)
+    assert asyncio.run(search.asearch("kurs rupiah")) is not None
+
+
+def test_same_query_in_flight_is_sent_once(make_search):
+    backend = _BlockingBackend()
+    search = make_search(backend, deadline_seconds=5.0)
+    threads = [threading.Thread(target=search.search, args=("jadwal kereta",)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    backend.release.set()
+    for thread in threads:
+        thread.join()
+    assert backend.calls == 1
+
+
+def test_errors_are_not_cached(make_search):
+    backend = StubSearchBackend(fail=True)
+    search = make_search(backend, deadline_seconds=1.0)
+    assert search.search("harga emas") is None
+    assert search.search("harga emas") is None
+    assert backend.calls == 2
+    assert search.stats()["errors"] == 2
+    assert search.stats()["entries"] == 0
+
+
+def test_create_web_search(monkeypatch):
+    stub = create_web_search("stub", ttl_seconds=5.0, deadline_seconds=1.0)
+    try:
+        assert isinstance(stub.backend, StubSearchBackend)
+        assert (stub.ttl_seconds, stub.deadline_seconds) == (5.0, 1.0)
+    finally:
+        stub.close()
+    monkeypatch.delenv("TAVILY_API_KEY", raising=False)
+    assert create_web_search("tavily") is None
+    with pytest.raises(ValueError):
+        create_web_search("bing")